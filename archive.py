@@ -0,0 +1,174 @@
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from db import get_connection, run_transaction
+from reservation import ComputerReservation
+from schema import ensure_schema
+from timeslot import SLOT_FORMAT, format_slot, to_epoch
+
+
+@dataclass
+class ArchiveResult:
+    """
+    What one archive run moved and how long it held the write lock.
+
+    Attributes:
+        started (datetime): When the run began.
+        archived (int): Reservations moved to the history table.
+        chunks (int): Transactions the move was split into.
+        duration (float): Seconds the whole run took.
+        longest_hold (float): Seconds the longest chunk held the write lock, from BEGIN to COMMIT.
+    """
+    started: datetime
+    archived: int = 0
+    chunks: int = 0
+    duration: float = 0.0
+    longest_hold: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Reservations archived per second."""
+        return self.archived / self.duration if self.duration else 0.0
+
+
+class ReservationArchiver:
+    """
+    Moves expired reservations from `reservations` to the append-only
+    `reservation_history` table, so usage data is kept while the table every
+    kiosk writes to stays small.
+
+    The move is split into chunks of at most `chunk_size` reservations, each
+    its own short write transaction: an `INSERT ... SELECT` and a `DELETE` over
+    the same range of the (slot, computer id) primary key. Kiosks waiting to
+    book get the lock between chunks instead of after the whole backlog.
+    """
+
+    def __init__(self, database: str = None, chunk_size: int = 500, pause: float = 0.0):
+        """
+        Initializes a ReservationArchiver instance.
+
+        Args:
+            database (str, optional): The database file (default: `ComputerReservation.database`).
+            chunk_size (int, optional): Most reservations moved per transaction (default: 500).
+            pause (float, optional): Seconds to wait between chunks (default: 0).
+        """
+        self.database = database
+        self.chunk_size = chunk_size
+        self.pause = pause
+
+    def get_db(self):
+        """
+        Returns the calling thread's pooled connection to the archived database.
+
+        Returns:
+            sqlite3.Connection: A connection object for the SQLite database.
+        """
+        conn = get_connection(self.database or ComputerReservation.database)
+        ensure_schema(conn)
+        return conn
+
+    def run_once(self, before: datetime = None) -> ArchiveResult:
+        """
+        Archives every reservation whose time slot is before `before`.
+
+        Args:
+            before (datetime, optional): The cutoff (default: now).
+
+        Returns:
+            ArchiveResult: How much was moved, the throughput and the longest lock hold.
+
+        Raises:
+            DatabaseBusyError: If other kiosks kept the database locked through every retry of a chunk.
+                Chunks already committed stay archived.
+        """
+        result = ArchiveResult(started=ComputerReservation.clock())
+        cutoff = to_epoch(before or result.started)
+        conn = self.get_db()
+        begin = time.perf_counter()
+        locked = [0.0]
+
+        def move_chunk(conn):
+            locked[0] = time.perf_counter()
+            # the last key of the chunk; everything before the cutoff was moved by earlier chunks
+            last = conn.execute("""
+                SELECT slot, computer_id FROM reservations WHERE slot < ?
+                ORDER BY slot, computer_id LIMIT 1 OFFSET ?
+            """, (cutoff, self.chunk_size - 1)).fetchone()
+            if last is None:
+                # less than a whole chunk is left
+                where, params = "slot < ?", (cutoff,)
+            else:
+                where, params = "(slot, computer_id) <= (?, ?)", tuple(last)
+            conn.execute(f"""
+                INSERT INTO reservation_history (slot, computer_id, library_card_number, series_id)
+                SELECT slot, computer_id, library_card_number, series_id FROM reservations WHERE {where}
+            """, params)
+            return conn.execute(f"DELETE FROM reservations WHERE {where}", params).rowcount
+
+        try:
+            while True:
+                moved = run_transaction(conn, move_chunk)
+                result.longest_hold = max(result.longest_hold, time.perf_counter() - locked[0])
+                if not moved:
+                    break
+                result.archived += moved
+                result.chunks += 1
+                if moved < self.chunk_size:
+                    break
+                if self.pause:
+                    time.sleep(self.pause)
+        finally:
+            if result.archived:
+                ComputerReservation.cache.invalidate(self.database or ComputerReservation.database)
+        result.duration = time.perf_counter() - begin
+        return result
+
+    def iter_history(self, start: datetime, end: datetime, library_card_number: str = None, page_size: int = 500):
+        """
+        Streams archived reservations from `start` (inclusive) up to `end` (exclusive), a page at a time.
+
+        Args:
+            start (datetime): The beginning of the range.
+            end (datetime): The end of the range.
+            library_card_number (str, optional): Only this patron's reservations (default: everyone's).
+            page_size (int, optional): Rows fetched per query (default: 500).
+
+        Yields:
+            tuple: (time slot, computer id, library card number) in chronological order.
+        """
+        slot, computer_id, end = to_epoch(start), 0, to_epoch(end)
+        patron = "" if library_card_number is None else "AND library_card_number = :card"
+        while True:
+            rows = self.get_db().execute(f"""
+                SELECT slot, computer_id, library_card_number FROM reservation_history
+                WHERE (slot, computer_id) > (:slot, :computer) AND slot < :end {patron}
+                ORDER BY slot, computer_id
+                LIMIT :limit
+            """, {"slot": slot, "computer": computer_id, "end": end, "card": library_card_number,
+                  "limit": page_size}).fetchall()
+            for row in rows:
+                yield format_slot(row[0]), row[1], row[2]
+            if len(rows) < page_size:
+                return
+            slot, computer_id = rows[-1][0], rows[-1][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move expired computer reservations to the history table.")
+    parser.add_argument("--database", help="database file (default: LibraryMembers.db)")
+    parser.add_argument("--before", help="archive reservations before this time slot, 'MM/DD/YY HH:00' (default: now)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="most reservations moved per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to wait between chunks")
+    args = parser.parse_args()
+
+    archiver = ReservationArchiver(args.database, args.chunk_size, args.pause)
+    before = datetime.strptime(args.before, SLOT_FORMAT) if args.before else None
+    result = archiver.run_once(before)
+    print(f"{result.started:%m/%d/%y %H:%M:%S} archived {result.archived} reservation(s) in {result.chunks} chunk(s), "
+          f"{result.duration * 1000:.1f} ms ({result.rows_per_sec:.0f} rows/s), "
+          f"longest lock hold {result.longest_hold * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
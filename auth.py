@@ -0,0 +1,227 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+# scrypt cost parameters; raise SCRYPT_N as kiosk hardware allows. Stored
+# hashes record the parameters they were made with, so older hashes keep
+# verifying and are upgraded on the next successful login.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+
+
+def hash_pin(pin: str, n: int = None, r: int = None, p: int = None) -> str:
+    """
+    Hashes a PIN with a random salt using scrypt.
+
+    Args:
+        pin (str): The plaintext PIN.
+        n, r, p (int, optional): scrypt cost parameters (default: SCRYPT_N, SCRYPT_R, SCRYPT_P).
+
+    Returns:
+        str: 'scrypt$n$r$p$salt$hash', with salt and hash in hex.
+    """
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = os.urandom(SALT_BYTES)
+    digest = hashlib.scrypt(pin.encode('utf-8'), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024)
+    return f"scrypt${n}${r}${p}${salt.hex()}${digest.hex()}"
+
+
+def verify_pin(pin: str, stored: str) -> bool:
+    """
+    Checks a PIN against a stored hash, including unsalted SHA-256 hashes from
+    databases created before salted hashing.
+
+    Args:
+        pin (str): The plaintext PIN.
+        stored (str): The hash from the `all_members` table.
+
+    Returns:
+        bool: True if the PIN matches.
+    """
+    if stored.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, expected = stored.split("$")
+            n, r, p = int(n), int(r), int(p)
+        except ValueError:
+            return False
+        digest = hashlib.scrypt(pin.encode('utf-8'), salt=bytes.fromhex(salt), n=n, r=r, p=p,
+                                maxmem=256 * n * r + 1024 * 1024)
+        return hmac.compare_digest(digest.hex(), expected)
+    # legacy: unsalted SHA-256 hex digest
+    return hmac.compare_digest(hashlib.sha256(pin.encode('utf-8')).hexdigest(), stored)
+
+
+def needs_rehash(stored: str) -> bool:
+    """
+    Checks whether a stored hash is legacy SHA-256 or uses outdated scrypt parameters.
+
+    Args:
+        stored (str): The hash from the `all_members` table.
+
+    Returns:
+        bool: True if the hash should be replaced on the next successful login.
+    """
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+class VerificationCache:
+    """
+    Remembers recent successful PIN checks so that logging the same patron in
+    again skips both the database read and the deliberately slow scrypt hash.
+
+    Patrons are identified by any hashable key, typically (database, library
+    card number). PINs are never kept; entries hold an HMAC of the PIN under a
+    random per-process key. Entries expire after `ttl` seconds, and the least recently
+    used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10000):
+        """
+        Initializes a VerificationCache instance.
+
+        Args:
+            ttl (float, optional): Seconds a successful check is trusted (default: 300).
+            max_entries (int, optional): Patrons remembered at most (default: 10000).
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._key = secrets.token_bytes(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, member, pin: str) -> bytes:
+        return hmac.new(self._key, f"{member!r}\0{pin}".encode('utf-8'), hashlib.sha256).digest()
+
+    def get(self, member, pin: str) -> Optional[str]:
+        """
+        Looks up a recent successful check of this PIN.
+
+        Returns:
+            str or None: The stored hash if the PIN was verified within `ttl`, None otherwise.
+        """
+        digest = self._digest(member, pin)
+        with self._lock:
+            entry = self._entries.get(member)
+            if entry is None:
+                return None
+            cached_digest, stored, expires = entry
+            if expires < time.monotonic():
+                del self._entries[member]
+                return None
+            if not hmac.compare_digest(cached_digest, digest):
+                return None
+            self._entries.move_to_end(member)
+            return stored
+
+    def put(self, member, pin: str, stored: str):
+        """
+        Records a successful check of this PIN against the stored hash.
+        """
+        digest = self._digest(member, pin)
+        with self._lock:
+            self._entries[member] = (digest, stored, time.monotonic() + self.ttl)
+            self._entries.move_to_end(member)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, member=None):
+        """
+        Forgets one patron's cached check, or every cached check.
+        """
+        with self._lock:
+            if member is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(member, None)
+
+
+@dataclass(frozen=True)
+class Session:
+    """
+    A logged-in patron.
+
+    Attributes:
+        token (str): The opaque session token handed to the client.
+        library_card_number (str): The patron's library card number.
+        pin_hash (str): The patron's stored PIN hash.
+        expires (float): `time.monotonic()` value after which the session is invalid.
+    """
+    token: str
+    library_card_number: str
+    pin_hash: str
+    expires: float
+
+
+class SessionStore:
+    """
+    In-memory sessions, so that requests after login are resolved from a token
+    without touching the database. Sessions expire after `ttl` seconds of
+    inactivity, and the least recently used sessions are evicted beyond
+    `max_sessions`.
+    """
+
+    def __init__(self, ttl: float = 900.0, max_sessions: int = 1000):
+        """
+        Initializes a SessionStore instance.
+
+        Args:
+            ttl (float, optional): Seconds of inactivity before a session expires (default: 900).
+            max_sessions (int, optional): Sessions kept at most (default: 1000).
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, library_card_number: str, pin_hash: str) -> Session:
+        """
+        Starts a session for an authenticated patron.
+
+        Returns:
+            Session: The new session.
+        """
+        session = Session(secrets.token_urlsafe(24), library_card_number, pin_hash, time.monotonic() + self.ttl)
+        with self._lock:
+            self._sessions[session.token] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def resolve(self, token: str) -> Optional[Session]:
+        """
+        Looks up a session and extends it.
+
+        Returns:
+            Session or None: The session, or None if the token is unknown or expired.
+        """
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if session.expires < now:
+                del self._sessions[token]
+                return None
+            session = Session(session.token, session.library_card_number, session.pin_hash, now + self.ttl)
+            self._sessions[token] = session
+            self._sessions.move_to_end(token)
+            return session
+
+    def revoke(self, token: str):
+        """
+        Ends a session (logout).
+        """
+        with self._lock:
+            self._sessions.pop(token, None)
+
+
+verifications = VerificationCache()
+sessions = SessionStore()
@@ -0,0 +1,72 @@
+"""
+Measures how long ComputerReservation.allocate_computer() takes to claim a
+seat as the number of computers grows, against a database that already
+holds months of future bookings.
+
+Usage:
+    python benchmarks/bench_allocator.py [--seats 10 100 500 1000] [--days 90]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from common import summarize
+from db import manager
+from reservation import ComputerReservation
+from timeslot import HOUR, format_slot, to_epoch
+
+
+def build_database(path: str, seats: int, days: int, fill: float):
+    """
+    Creates a database with `seats` computers and `days` of bookings
+    (10:00-20:00 daily) with a `fill` fraction of the seats taken.
+    """
+    ComputerReservation.database = path
+    res = ComputerReservation("staff", "x")
+    conn = res.get_db()
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO computers (name) VALUES (?)", [(f"Computer {n}",) for n in range(2, seats + 1)])
+    conn.executemany("INSERT INTO all_members (library_card_number, pin) VALUES (?, 'x')",
+                     [(str(n),) for n in range(seats + 1)])
+    start = to_epoch(datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1))
+    booked = int(seats * fill)
+    rows = ((start + day * 24 * HOUR + hour * HOUR, seat, str(seat))
+            for day in range(days) for hour in range(10, 21) for seat in range(1, booked + 1))
+    conn.executemany("INSERT INTO reservations (slot, computer_id, library_card_number) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    return start
+
+
+def bench(seats: int, days: int, fill: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        start = build_database(path, seats, days, fill)
+        # claim every remaining seat in a booked hour that isn't prefilled
+        time_slot = format_slot(start + 9 * HOUR)
+        patrons = [ComputerReservation(str(n), "x") for n in range(1, seats + 1)]
+        timings = []
+        for patron in patrons:
+            begin = time.perf_counter()
+            patron.allocate_computer(time_slot)
+            timings.append(time.perf_counter() - begin)
+        manager.close_all()
+    return {"seats": seats, **summarize(timings)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seats", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--days", type=int, default=90, help="days of future bookings to prefill")
+    parser.add_argument("--fill", type=float, default=0.8, help="fraction of seats prefilled per booked hour")
+    args = parser.parse_args()
+
+    print(f"{'seats':>6} {'mean ms':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for seats in args.seats:
+        result = bench(seats, args.days, args.fill)
+        print(f"{result['seats']:>6} {result['mean_ms']:>10.3f} {result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
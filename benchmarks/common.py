@@ -0,0 +1,41 @@
+"""
+Helpers shared by the benchmark scripts. Importing this module also puts the
+repository root on sys.path so the scripts can be run as
+`python benchmarks/<script>.py` from anywhere.
+"""
+import os
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(timings: list) -> dict:
+    """
+    Throughput and latency percentiles for a list of per-operation timings in seconds.
+
+    Returns:
+        dict: count, ops_per_sec, mean/p50/p90/p99/max latency in milliseconds.
+    """
+    timings = sorted(timings)
+    total = sum(timings)
+    return {
+        "count": len(timings),
+        "ops_per_sec": len(timings) / total if total else 0.0,
+        "mean_ms": statistics.mean(timings) * 1000 if timings else 0.0,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p90_ms": percentile(timings, 0.90) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "max_ms": timings[-1] * 1000 if timings else 0.0,
+    }
@@ -0,0 +1,40 @@
+"""
+Compares two benchmark result files written by benchmarks/run.py.
+
+Usage:
+    python benchmarks/compare.py before.json after.json
+"""
+import argparse
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--metric", default="p50_ms", help="latency metric to compare (default: p50_ms)")
+    args = parser.parse_args()
+
+    with open(args.before) as handle:
+        before = json.load(handle)
+    with open(args.after) as handle:
+        after = json.load(handle)
+
+    print(f"{before['commit']} -> {after['commit']} ({args.metric}, lower is better)")
+    old_sizes = {entry["params"]["size"]: entry["operations"] for entry in before["sizes"]}
+    for entry in after["sizes"]:
+        size = entry["params"]["size"]
+        old = old_sizes.get(size)
+        if old is None:
+            continue
+        print(f"size {size}:")
+        for operation, summary in entry["operations"].items():
+            if operation not in old:
+                continue
+            was, now = old[operation][args.metric], summary[args.metric]
+            change = (now / was - 1) * 100 if was else 0.0
+            print(f"  {operation:<26} {was:>10.3f} -> {now:>10.3f}  {change:+6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Contention simulator: several kiosk processes open the same database file
+directly, the way kiosks did before the reservation service, and keep
+reserving, listing and cancelling until the time is up. Every write competes
+for SQLite's single write lock, so this measures the write path under
+contention: throughput, latency percentiles, how often a write had to back
+off and retry, and how often it gave up with DatabaseBusyError.
+
+Try a short busy timeout, or --attempts 1 to turn retrying off, to see how
+much the retries absorb.
+
+Usage:
+    python benchmarks/kiosks.py [--kiosks 8] [--duration 10] [--busy-timeout 5] [--attempts 5] [--members 10000]
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from common import summarize
+import db
+import metrics
+from db import DatabaseBusyError, RetryPolicy, get_connection, transaction
+from reservation import ComputerReservation
+from schedule import DEFAULT_SCHEDULE
+from synth import card_number, generate
+from timeslot import format_slot
+
+
+def kiosk(path: str, card: str, deadline: float, busy_timeout: float, attempts: int, seed: int) -> dict:
+    """
+    One simulated kiosk process: reserve a random slot, list, and cancel what was reserved.
+
+    Returns:
+        dict: Latencies per operation, outcome counts, and the number of retries.
+    """
+    db.manager.busy_timeout = busy_timeout
+    ComputerReservation.database = path
+    ComputerReservation.retry = RetryPolicy(attempts=attempts)
+    metrics.enable()
+    rng = random.Random(seed)
+    today = date.today()
+    slots = [format_slot(slot) for slot in DEFAULT_SCHEDULE.open_slots(today + timedelta(days=1), today + timedelta(days=30))]
+    reservation = ComputerReservation(card, None)
+    started = time.time()
+    timings = {"reserve": [], "list": [], "cancel": []}
+    outcomes = {"ok": 0, "refused": 0, "busy": 0, "failed": 0}
+
+    def timed(name, fn, *args):
+        begin = time.perf_counter()
+        try:
+            result = fn(*args)
+            outcomes["ok"] += 1
+            return result
+        except DatabaseBusyError:
+            outcomes["busy"] += 1
+        except (IndexError, ValueError):
+            outcomes["refused"] += 1
+        except Exception:
+            outcomes["failed"] += 1
+        finally:
+            timings[name].append(time.perf_counter() - begin)
+
+    # User() announces itself on stdout, which would drown the results
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        while time.time() < deadline:
+            time_slot = rng.choice(slots)
+            # reserve_computer raises when refused, so a result means it was reserved
+            reserved = timed("reserve", reservation.reserve_computer, time_slot) is not None
+            timed("list", reservation.held_slots)
+            if reserved:
+                timed("cancel", reservation.cancel_reservation, time_slot)
+    retries = sum(h["count"] for h in metrics.registry.snapshot().get("lock_retry", {}).values())
+    return {"timings": timings, "outcomes": outcomes, "retries": retries, "started": started}
+
+
+def run(path: str, kiosks: int, duration: float, busy_timeout: float, attempts: int, first_card: int) -> dict:
+    """
+    Runs `kiosks` kiosk processes against the database for `duration` seconds.
+
+    Returns:
+        dict: A latency summary per operation, operations per second, and the retry and lock-failure counts.
+    """
+    # spawned rather than forked, so no process inherits another's open connections
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(kiosks) as pool:
+        # wall-clock time, so every process stops together; starting them up eats into it
+        deadline = time.time() + duration
+        jobs = [pool.apply_async(kiosk, (path, card_number(first_card + i), deadline, busy_timeout, attempts, i))
+                for i in range(kiosks)]
+        reports = [job.get() for job in jobs]
+
+    timings = {"reserve": [], "list": [], "cancel": []}
+    outcomes = {"ok": 0, "refused": 0, "busy": 0, "failed": 0}
+    for report in reports:
+        for name, values in report["timings"].items():
+            timings[name].extend(values)
+        for name, count in report["outcomes"].items():
+            outcomes[name] += count
+    results = {name: summarize(values) for name, values in timings.items()}
+    operations = sum(outcomes.values())
+    elapsed = deadline - min(report["started"] for report in reports)
+    return {
+        "operations": results,
+        "ops_per_sec": operations / elapsed if elapsed > 0 else 0.0,
+        "outcomes": outcomes,
+        "retries": sum(report["retries"] for report in reports),
+        "lock_failure_rate": outcomes["busy"] / operations if operations else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate kiosk processes sharing one database file.")
+    parser.add_argument("--kiosks", type=int, default=8, help="kiosk processes")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--busy-timeout", type=float, default=5.0, help="seconds SQLite waits on a locked database")
+    parser.add_argument("--attempts", type=int, default=5, help="tries per write when the database is locked (1: no retry)")
+    parser.add_argument("--members", type=int, default=10000, help="members in the synthetic database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "kiosks.db")
+        # the kiosks use the last members, who hold no reservations yet
+        generate(path, members=args.members + args.kiosks, reservations=args.members)
+        # synth packs the reservations onto as few computers as fit, so add free ones to book
+        conn = get_connection(path)
+        with transaction(conn):
+            conn.executemany("INSERT INTO computers (name) VALUES (?)",
+                             ((f"Spare {n}",) for n in range(args.kiosks)))
+        db.manager.close_all()
+        results = run(path, args.kiosks, args.duration, args.busy_timeout, args.attempts, args.members)
+
+    print(f"{args.kiosks} kiosk processes, {args.duration:.0f} s, busy timeout {args.busy_timeout:g} s, "
+          f"{args.attempts} attempts: {results['ops_per_sec']:.0f} operations/s")
+    for name, summary in results["operations"].items():
+        print(f"  {name:<8} {summary['count']:>7}  p50 {summary['p50_ms']:7.2f} ms  "
+              f"p99 {summary['p99_ms']:7.2f} ms  max {summary['max_ms']:7.2f} ms")
+    outcomes = results["outcomes"]
+    print(f"  {outcomes['ok']} succeeded, {outcomes['refused']} refused, {outcomes['busy']} gave up on the lock, "
+          f"{outcomes['failed']} failed; {results['retries']} retries")
+    print(f"  lock failure rate {results['lock_failure_rate']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
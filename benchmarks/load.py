@@ -0,0 +1,143 @@
+"""
+Load generator for the reservation service. Simulated kiosks log in as
+different patrons and keep reserving, listing and cancelling until the time
+is up; the script then reports latency per request type, overall throughput,
+and how many writes the service grouped into each commit.
+
+By default it generates a synthetic database and runs the service in-process
+on a free localhost port. Pass --url to load an already running service
+instead (its database needs the synthetic members, see synth.py).
+
+Usage:
+    python benchmarks/load.py [--kiosks 16] [--duration 10] [--members 10000] [--url http://127.0.0.1:8420]
+"""
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from common import summarize
+from client import ReservationClient, ServiceError
+from db import get_connection, transaction
+from schedule import DEFAULT_SCHEDULE
+from service import ReservationService
+from synth import BENCH_PIN, card_number, generate
+from timeslot import format_slot
+
+
+def kiosk(client: ReservationClient, card: str, slots: list, deadline: float, seed: int, timings: dict):
+    """
+    One simulated kiosk: reserve a random slot, list, cancel, and now and then load the calendar.
+    """
+    rng = random.Random(seed)
+    user = client.login(card, BENCH_PIN)
+    today = date.today()
+    local = {name: [] for name in timings}
+    n = 0
+    while time.perf_counter() < deadline:
+        time_slot = rng.choice(slots)
+        begin = time.perf_counter()
+        try:
+            user.reservation.reserve_computer(time_slot)
+            reserved = True
+        except (IndexError, ValueError, TypeError):
+            # fully booked or over the quota still counts as a served request
+            reserved = False
+        local["reserve"].append(time.perf_counter() - begin)
+
+        begin = time.perf_counter()
+        user.list_reservations()
+        local["list"].append(time.perf_counter() - begin)
+
+        if reserved:
+            begin = time.perf_counter()
+            user.reservation.cancel_reservation(time_slot)
+            local["cancel"].append(time.perf_counter() - begin)
+
+        n += 1
+        if n % 10 == 0:
+            begin = time.perf_counter()
+            user.reservation.availability(today, today + timedelta(days=60))
+            local["availability"].append(time.perf_counter() - begin)
+    user.logout()
+    for name, values in local.items():
+        timings[name].extend(values)
+
+
+def run(url: str, kiosks: int, duration: float, first_card: int) -> dict:
+    """
+    Runs `kiosks` simulated kiosks against the service for `duration` seconds.
+
+    Returns:
+        dict: A latency summary per request type, and the overall requests per second.
+    """
+    client = ReservationClient(url)
+    today = date.today()
+    slots = [format_slot(slot) for slot in DEFAULT_SCHEDULE.open_slots(today + timedelta(days=1), today + timedelta(days=30))]
+    timings = {"reserve": [], "list": [], "cancel": [], "availability": []}
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=kiosk, args=(client, card_number(first_card + i), slots, deadline, i, timings))
+               for i in range(kiosks)]
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - begin
+
+    results = {name: summarize(values) for name, values in timings.items()}
+    results["requests_per_sec"] = sum(len(values) for values in timings.values()) / elapsed
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the reservation service with simulated kiosks.")
+    parser.add_argument("--url", help="service to load (default: start one on a synthetic database)")
+    parser.add_argument("--kiosks", type=int, default=16, help="simulated kiosks")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--members", type=int, default=10000, help="members in the synthetic database")
+    parser.add_argument("--readers", type=int, default=4, help="reader threads of the in-process service")
+    args = parser.parse_args()
+
+    service = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            url = args.url
+        else:
+            path = os.path.join(tmp, "load.db")
+            # the kiosks log in as the last members, who hold no reservations yet
+            generate(path, members=args.members + args.kiosks, reservations=args.members)
+            # synth packs the reservations onto as few computers as fit, so add free ones to book
+            conn = get_connection(path)
+            with transaction(conn):
+                conn.executemany("INSERT INTO computers (name) VALUES (?)",
+                                 ((f"Spare {n}",) for n in range(args.kiosks)))
+            service = ReservationService(path, readers=args.readers)
+            url = service.start_in_thread()
+        try:
+            # User() announces itself on stdout, which would drown the results
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                results = run(url, args.kiosks, args.duration, args.members)
+            stats = ReservationClient(url).request("GET", "/stats")
+        except ServiceError as e:
+            print(e)
+            return
+        finally:
+            if service is not None:
+                service.stop_thread()
+
+    print(f"{args.kiosks} kiosks, {args.duration:.0f} s: {results.pop('requests_per_sec'):.0f} requests/s")
+    for name, summary in results.items():
+        print(f"  {name:<14} {summary['count']:>7}  p50 {summary['p50_ms']:7.2f} ms  "
+              f"p99 {summary['p99_ms']:7.2f} ms  max {summary['max_ms']:7.2f} ms")
+    if stats["commits"]:
+        print(f"  {stats['writes']} writes in {stats['commits']} commits "
+              f"({stats['writes'] / stats['commits']:.1f} writes per commit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark suite for the reservation engine. For each size it generates a
+synthetic database, then measures throughput and latency percentiles of the
+main operations, and writes everything as JSON so runs can be compared
+between commits with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/run.py [--sizes 1000 10000 100000] [--iterations 200] [--output bench.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from common import ROOT, summarize
+import auth
+from db import manager
+from reservation import ComputerReservation
+from synth import BENCH_PIN, card_number, generate
+from timeslot import DAY, to_epoch
+from user import User
+
+
+def timed(fn, *args) -> float:
+    begin = time.perf_counter()
+    try:
+        fn(*args)
+    except (IndexError, ValueError, TypeError):
+        # refusals (fully booked, quota) are normal outcomes and still timed
+        pass
+    return time.perf_counter() - begin
+
+
+def bench_size(size: int, iterations: int, login_iterations: int, seed: int) -> dict:
+    """
+    Generates a database with `size` members and `size` reservations and times each operation.
+
+    Returns:
+        dict: The generation parameters and a summary per operation.
+    """
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        params = generate(path, members=size + iterations, reservations=size, seed=seed)
+        params["size"] = size
+        ComputerReservation.database = path
+        # the last `iterations` members hold no reservations, so the quota never gets in the way
+        fresh = [card_number(n) for n in range(size, size + iterations)]
+        members = [card_number(rng.randrange(size)) for _ in range(iterations)]
+
+        auth.verifications.invalidate()
+        results["login_cold"] = summarize([timed(User, card, BENCH_PIN) for card in members[:login_iterations]])
+        for card in members:
+            User(card, BENCH_PIN)
+        results["login_cached"] = summarize([timed(User, card, BENCH_PIN) for card in members])
+
+        patrons = [ComputerReservation(card, None) for card in fresh]
+        open_slots = patrons[0].available_slots(date.today() + timedelta(days=1), date.today() + timedelta(days=30))
+        booked = [(patron, rng.choice(open_slots)) for patron in patrons]
+        results["reserve_computer"] = summarize([timed(patron.reserve_computer, slot) for patron, slot in booked])
+
+        users = [User(card, BENCH_PIN) for card in members]
+        results["list_reservations"] = summarize([timed(user.list_reservations) for user in users])
+
+        results["cancel_reservation"] = summarize([timed(patron.cancel_reservation, slot) for patron, slot in booked])
+
+        # each call removes a fresh batch of 100 expired reservations
+        conn = sqlite3.connect(path)
+        past = to_epoch(datetime.now()) - 30 * DAY
+        timings = []
+        for n in range(max(1, iterations // 10)):
+            start = past + n * 3600
+            conn.executemany("INSERT OR IGNORE INTO reservations (slot, computer_id, library_card_number) VALUES (?, 1, ?)",
+                             [(start - i * DAY, members[0]) for i in range(100)])
+            conn.commit()
+            timings.append(timed(patrons[0].remove_past_reservations))
+        conn.close()
+        results["remove_past_reservations"] = summarize(timings)
+        manager.close_all()
+    return {"params": params, "operations": results}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="members (and reservations) per generated database")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per operation")
+    parser.add_argument("--login-iterations", type=int, default=20,
+                        help="timed cold logins per size (each one runs scrypt)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench.json", help="where to write the JSON results")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "iterations": args.iterations,
+        "sizes": [],
+    }
+    for size in args.sizes:
+        # User() announces itself on stdout, which would drown the results
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = bench_size(size, args.iterations, args.login_iterations, args.seed)
+        report["sizes"].append(result)
+        print(f"size {size}:")
+        for operation, summary in result["operations"].items():
+            print(f"  {operation:<26} {summary['ops_per_sec']:>10.0f} ops/s  p50 {summary['p50_ms']:.3f} ms"
+                  f"  p99 {summary['p99_ms']:.3f} ms")
+
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
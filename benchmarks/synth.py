@@ -0,0 +1,87 @@
+"""
+Generates synthetic reservation databases of a given size for benchmarking.
+
+Usage:
+    python benchmarks/synth.py out.db --members 100000 --reservations 100000 [--days 90] [--seed 0]
+"""
+import argparse
+import math
+import random
+from datetime import date, timedelta
+
+from common import ROOT  # noqa: F401  (puts the repository on sys.path)
+from auth import hash_pin
+from db import get_connection, transaction
+from schedule import DEFAULT_SCHEDULE
+from schema import migrate
+
+BENCH_PIN = "0000"
+
+
+def card_number(n: int) -> str:
+    """
+    The synthetic library card number of member `n`.
+    """
+    return f"{n:014d}"
+
+
+def generate(path: str, members: int, reservations: int, days: int = 90, past_days: int = 7,
+             computers: int = None, seed: int = 0) -> dict:
+    """
+    Fills a new database with `members` members and `reservations` reservations spread
+    over the opening hours from `past_days` ago to `days` from now, so both upcoming and
+    expired bookings exist. Every member's PIN is BENCH_PIN; it is hashed once and the
+    hash reused, since hashing millions of PINs would dominate generation time.
+
+    Args:
+        path (str): The database file to create.
+        members (int): Members to create.
+        reservations (int): Reservations to create.
+        days (int, optional): Days of future bookings (default: 90).
+        past_days (int, optional): Days of already expired bookings (default: 7).
+        computers (int, optional): Computers to create (default: just enough to hold the reservations).
+        seed (int, optional): Random seed, so runs are reproducible (default: 0).
+
+    Returns:
+        dict: The parameters the database was generated with.
+    """
+    rng = random.Random(seed)
+    conn = get_connection(path)
+    migrate(conn)
+    today = date.today()
+    slots = list(DEFAULT_SCHEDULE.open_slots(today - timedelta(days=past_days), today + timedelta(days=days)))
+    computers = computers or max(1, math.ceil(reservations / len(slots)))
+    if members < computers and reservations:
+        raise ValueError("need at least as many members as computers per slot")
+    pin = hash_pin(BENCH_PIN)
+
+    with transaction(conn):
+        conn.executemany("INSERT OR IGNORE INTO computers (computer_id, name) VALUES (?, ?)",
+                         ((n, f"Computer {n}") for n in range(1, computers + 1)))
+        conn.executemany("INSERT INTO all_members (library_card_number, pin) VALUES (?, ?)",
+                         ((card_number(n), pin) for n in range(members)))
+        # fill slot by slot, computer by computer; within a slot every booking
+        # belongs to a different member, as the (card, slot) index requires
+        offset = rng.randrange(members)
+        rows = ((slots[i % len(slots)], i // len(slots) + 1,
+                 card_number((offset + i // len(slots) + (i % len(slots)) * computers) % members))
+                for i in range(reservations))
+        conn.executemany("INSERT OR IGNORE INTO reservations (slot, computer_id, library_card_number) VALUES (?, ?, ?)", rows)
+    return {"members": members, "reservations": reservations, "computers": computers,
+            "days": days, "past_days": past_days, "seed": seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="database file to create")
+    parser.add_argument("--members", type=int, default=10000)
+    parser.add_argument("--reservations", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--computers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(generate(args.path, args.members, args.reservations, args.days, computers=args.computers, seed=args.seed))
+
+
+if __name__ == "__main__":
+    main()
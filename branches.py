@@ -0,0 +1,212 @@
+import argparse
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from db import manager
+from reservation import ComputerReservation, ReserveResult, ReserveStatus
+from timeslot import format_slot, parse_slot
+
+
+def use_branch(database: str, members: str):
+    """
+    Points this process at one branch: reservations in the branch's own database,
+    library members in the database shared by every branch.
+
+    Args:
+        database (str): The branch's database file.
+        members (str): The shared member database file.
+    """
+    manager.configure(database, foreign_keys=False)
+    ComputerReservation.database = database
+    ComputerReservation.members_database = members
+
+
+class BranchNetwork:
+    """
+    Several library branches, each with its own database of computers and
+    reservations, sharing one database of library members.
+
+    Questions about every branch, such as a patron's reservations anywhere or
+    the first free computer at any branch, are asked of all branch databases at
+    once on a thread pool (each worker thread has its own pooled connection to
+    every branch) and the answers merged, so they take as long as the slowest
+    branch rather than the sum of all of them.
+    """
+
+    def __init__(self, branches: dict, members: str, workers: int = None):
+        """
+        Initializes a BranchNetwork instance.
+
+        Args:
+            branches (dict): Each branch name mapped to its database file, in order of preference.
+            members (str): The shared member database file.
+            workers (int, optional): Threads querying branches (default: one per branch).
+        """
+        self.branches = dict(branches)
+        self.members = members
+        self._classes = {}
+        for name, database in self.branches.items():
+            # branch reservations refer to members kept in another file
+            manager.configure(database, foreign_keys=False)
+            self._classes[name] = ComputerReservation.bind(database, members)
+        self._pool = ThreadPoolExecutor(max_workers=workers or len(self.branches) or 1,
+                                        thread_name_prefix="branch")
+
+    def reservation(self, branch: str, library_card_number: str, pin: str = None) -> ComputerReservation:
+        """
+        Returns a ComputerReservation for a patron at one branch.
+
+        Args:
+            branch (str): The branch name.
+            library_card_number (str): The patron.
+            pin (str, optional): The patron's encrypted PIN.
+
+        Raises:
+            KeyError: If there is no such branch.
+        """
+        return self._classes[branch](library_card_number, pin)
+
+    def fan_out(self, fn) -> dict:
+        """
+        Calls `fn(branch name, ComputerReservation class of the branch)` for every branch in parallel.
+
+        Returns:
+            dict: Each branch name mapped to what `fn` returned, in order of preference.
+
+        Raises:
+            Exception: The first error any branch raised, after every branch has finished.
+        """
+        futures = {name: self._pool.submit(fn, name, cls) for name, cls in self._classes.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+    def reservations(self, library_card_number: str) -> list:
+        """
+        Lists a patron's reservations at every branch.
+
+        Args:
+            library_card_number (str): The patron.
+
+        Returns:
+            list: (time slot, branch name, computer id) tuples in chronological order.
+        """
+        def held(name, cls):
+            slots = cls(library_card_number, None).held_slots()
+            return [(slot, name, slots[slot]) for slot in sorted(slots)]
+
+        return [(format_slot(slot), name, computer_id)
+                for slot, name, computer_id in heapq.merge(*self.fan_out(held).values())]
+
+    def free_computers(self, time_slot: str) -> list:
+        """
+        Finds a free computer at the time slot at every branch that is open and has one.
+
+        Args:
+            time_slot (str): The time slot in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            list: (branch name, computer id) tuples in order of preference.
+        """
+        slot = parse_slot(time_slot)
+
+        def first_free(name, cls):
+            if not cls.schedule.is_open(slot):
+                return None
+            row = cls.get_db().execute("""
+                SELECT c.computer_id FROM computers c
+                WHERE c.in_service
+                  AND NOT EXISTS (SELECT 1 FROM reservations r WHERE r.slot = ? AND r.computer_id = c.computer_id)
+                ORDER BY c.computer_id
+                LIMIT 1
+            """, (slot,)).fetchone()
+            return None if row is None else row[0]
+
+        return [(name, computer_id) for name, computer_id in self.fan_out(first_free).items()
+                if computer_id is not None]
+
+    def first_free(self, time_slot: str) -> Optional[tuple]:
+        """
+        Finds the first branch, in order of preference, with a free computer at the time slot.
+
+        Args:
+            time_slot (str): The time slot in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            tuple or None: (branch name, computer id), or None if every branch is full or closed.
+        """
+        free = self.free_computers(time_slot)
+        return free[0] if free else None
+
+    def reserve_anywhere(self, library_card_number: str, time_slot: str) -> tuple:
+        """
+        Reserves a computer for the patron at the first branch that has one free, moving on
+        to the next branch if another kiosk took the last computer in the meantime.
+        `max_reservations` applies per branch.
+
+        Args:
+            library_card_number (str): The patron.
+            time_slot (str): The desired time slot in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            tuple: (branch name, ReserveResult), or (None, the last refusal) if nothing was reserved.
+
+        Raises:
+            TypeError: If no branch is open at that time slot.
+            ValueError: If the time slot is in the past.
+        """
+        if not any(cls.schedule.is_valid(time_slot) for cls in self._classes.values()):
+            raise TypeError("Library is not open that day and time.")
+        if ComputerReservation.is_past_time_slot(time_slot):
+            raise ValueError("Cannot reserve a time slot in the past.")
+        result = ReserveResult(ReserveStatus.FULLY_BOOKED, time_slot)
+        for name, _ in self.free_computers(time_slot):
+            result = self.reservation(name, library_card_number).try_reserve(time_slot)
+            if result.ok:
+                return name, result
+        return None, result
+
+    def close(self):
+        """
+        Stops the worker threads.
+        """
+        self._pool.shutdown(wait=True)
+
+
+def branch_argument(value: str) -> tuple:
+    """
+    Reads a NAME=DATABASE command line argument.
+
+    Returns:
+        tuple: (branch name, database file).
+    """
+    name, sep, database = value.partition("=")
+    if not sep or not name or not database:
+        raise argparse.ArgumentTypeError(f"expected NAME=DATABASE, got {value!r}")
+    return name, database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask every library branch at once.")
+    parser.add_argument("--members", required=True, help="shared member database file")
+    parser.add_argument("--branch", type=branch_argument, action="append", required=True,
+                        help="a branch as NAME=DATABASE; repeat for each branch, most preferred first")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("reservations", help="list a patron's reservations at every branch")
+    listing.add_argument("library_card_number")
+    free = commands.add_parser("free", help="find the first branch with a free computer")
+    free.add_argument("time_slot", help="'MM/DD/YY HH:00'")
+    args = parser.parse_args()
+
+    network = BranchNetwork(dict(args.branch), args.members)
+    try:
+        if args.command == "reservations":
+            for time_slot, branch, computer_id in network.reservations(args.library_card_number):
+                print(f"{time_slot}  {branch:<16} computer {computer_id}")
+        else:
+            found = network.first_free(args.time_slot)
+            print("No free computer at any branch." if found is None else f"{found[0]}: computer {found[1]}")
+    finally:
+        network.close()
+
+
+if __name__ == "__main__":
+    main()
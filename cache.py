@@ -0,0 +1,219 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from timeslot import DAY
+
+
+class _DatabaseCache:
+    """
+    What is cached for one database file.
+
+    The maps are never changed in place, only replaced, so a reader can keep
+    using a map it was handed while a writer updates the cache.
+    """
+
+    def __init__(self):
+        self.days = OrderedDict()       # day number -> {slot: {computer id: library card number}}
+        self.patrons = OrderedDict()    # library card number -> {slot: computer id}
+        self.seats = None               # computers in service
+        self.generation = 0             # bumped by every change, so slower loads don't overwrite newer data
+        self.seen = weakref.WeakKeyDictionary()  # connection -> (data_version, when it was read)
+
+    def clear(self):
+        self.days.clear()
+        self.patrons.clear()
+        self.seats = None
+        self.generation += 1
+
+
+class ReservationCache:
+    """
+    Reservations per day and per patron, kept in memory so that listing a
+    patron's reservations, checking whether they already hold a slot, and
+    drawing the availability calendar don't query the database every time.
+
+    Reservations and cancellations made through ComputerReservation update the
+    cache as they commit (write-through). Writes from anywhere else, such as
+    another kiosk process or the sweeper, are noticed through SQLite's
+    `PRAGMA data_version`, which changes on a connection whenever another
+    connection commits. Each connection reads it at most once per `staleness`
+    seconds, and the whole cache for that database is dropped when it changed.
+    Reads in between are answered from memory without touching SQLite, so data
+    written elsewhere can be up to `staleness` seconds old; bookings themselves
+    are still decided by the database.
+
+    Memory is bounded: the least recently used days and patrons are evicted
+    beyond `max_days` and `max_patrons`.
+    """
+
+    def __init__(self, max_days: int = 120, max_patrons: int = 1000, staleness: float = 1.0):
+        """
+        Initializes a ReservationCache instance.
+
+        Args:
+            max_days (int, optional): Days of reservations kept per database (default: 120).
+            max_patrons (int, optional): Patrons' reservations kept per database (default: 1000).
+            staleness (float, optional): Seconds between checks for writes from other connections (default: 1.0).
+        """
+        self.max_days = max_days
+        self.max_patrons = max_patrons
+        self.staleness = staleness
+        self._databases = {}
+        self._lock = threading.Lock()
+
+    def _sync(self, conn, database: str) -> _DatabaseCache:
+        # called with the lock held
+        state = self._databases.get(database)
+        if state is None:
+            state = self._databases[database] = _DatabaseCache()
+        now = time.monotonic()
+        seen = state.seen.get(conn)
+        if seen is not None and now - seen[1] < self.staleness:
+            return state
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        # a connection seen for the first time has no earlier version to compare
+        # with, so anything cached before it showed up can't be trusted
+        if seen is None or seen[0] != version:
+            state.clear()
+        state.seen[conn] = (version, now)
+        return state
+
+    @staticmethod
+    def _put(entries: OrderedDict, key, value, limit: int):
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > limit:
+            entries.popitem(last=False)
+
+    def patron(self, conn, database: str, library_card_number: str) -> dict:
+        """
+        Returns one patron's reservations.
+
+        Args:
+            conn (sqlite3.Connection): The calling thread's connection, used on a miss.
+            database (str): The database file the connection belongs to.
+            library_card_number (str): The patron.
+
+        Returns:
+            dict: Each reserved slot mapped to its computer id. Must not be modified.
+        """
+        with self._lock:
+            state = self._sync(conn, database)
+            held = state.patrons.get(library_card_number)
+            if held is not None:
+                state.patrons.move_to_end(library_card_number)
+                return held
+            generation = state.generation
+        held = dict(conn.execute("SELECT slot, computer_id FROM reservations WHERE library_card_number = ?",
+                                 (library_card_number,)))
+        with self._lock:
+            if state.generation == generation:
+                self._put(state.patrons, library_card_number, held, self.max_patrons)
+        return held
+
+    def days(self, conn, database: str, first: int, last: int) -> dict:
+        """
+        Returns every reservation on the days numbered `first` up to (not including) `last`,
+        loading the days that aren't cached with one range query.
+
+        Args:
+            conn (sqlite3.Connection): The calling thread's connection, used on a miss.
+            database (str): The database file the connection belongs to.
+            first (int): The first day, as days since 1970-01-01.
+            last (int): The day after the last day.
+
+        Returns:
+            dict: Each day number mapped to {slot: {computer id: library card number}}. Must not be modified.
+        """
+        with self._lock:
+            state = self._sync(conn, database)
+            result = {}
+            missing = []
+            for number in range(first, last):
+                day = state.days.get(number)
+                if day is None:
+                    missing.append(number)
+                else:
+                    state.days.move_to_end(number)
+                    result[number] = day
+            generation = state.generation
+        if not missing:
+            return result
+
+        loaded = {number: {} for number in range(missing[0], missing[-1] + 1)}
+        for slot, computer_id, library_card_number in conn.execute(
+                "SELECT slot, computer_id, library_card_number FROM reservations WHERE slot >= ? AND slot < ?",
+                (missing[0] * DAY, (missing[-1] + 1) * DAY)):
+            loaded[slot // DAY].setdefault(slot, {})[computer_id] = library_card_number
+        with self._lock:
+            if state.generation == generation:
+                for number in missing:
+                    self._put(state.days, number, loaded[number], self.max_days)
+        result.update((number, loaded[number]) for number in missing)
+        return result
+
+    def seats(self, conn, database: str) -> int:
+        """
+        Returns the number of computers in service.
+
+        Args:
+            conn (sqlite3.Connection): The calling thread's connection, used on a miss.
+            database (str): The database file the connection belongs to.
+        """
+        with self._lock:
+            state = self._sync(conn, database)
+            if state.seats is not None:
+                return state.seats
+            generation = state.generation
+        seats = conn.execute("SELECT COUNT(*) FROM computers WHERE in_service").fetchone()[0]
+        with self._lock:
+            if state.generation == generation:
+                state.seats = seats
+        return seats
+
+    def reserved(self, database: str, slot: int, computer_id: int, library_card_number: str):
+        """
+        Records a committed reservation.
+        """
+        with self._lock:
+            state = self._databases.get(database)
+            if state is None:
+                return
+            state.generation += 1
+            held = state.patrons.get(library_card_number)
+            if held is not None:
+                state.patrons[library_card_number] = {**held, slot: computer_id}
+            day = state.days.get(slot // DAY)
+            if day is not None:
+                state.days[slot // DAY] = {**day, slot: {**day.get(slot, {}), computer_id: library_card_number}}
+
+    def cancelled(self, database: str, slot: int, library_card_number: str):
+        """
+        Records a committed cancellation.
+        """
+        with self._lock:
+            state = self._databases.get(database)
+            if state is None:
+                return
+            state.generation += 1
+            held = state.patrons.get(library_card_number)
+            if held is not None and slot in held:
+                state.patrons[library_card_number] = {s: c for s, c in held.items() if s != slot}
+            day = state.days.get(slot // DAY)
+            if day is not None and slot in day:
+                computers = {c: card for c, card in day[slot].items() if card != library_card_number}
+                day = {s: reserved for s, reserved in day.items() if s != slot}
+                if computers:
+                    day[slot] = computers
+                state.days[slot // DAY] = day
+
+    def invalidate(self, database: str = None):
+        """
+        Drops everything cached for one database, or for all of them.
+        """
+        with self._lock:
+            states = self._databases.values() if database is None else [self._databases.get(database)]
+            for state in states:
+                if state is not None:
+                    state.clear()
@@ -0,0 +1,187 @@
+import http.client
+import json
+import threading
+from datetime import date
+from urllib.parse import urlencode, urlsplit
+from reservation import ComputerReservation, QuotaExceededError, ReserveResult, ReserveStatus, SeriesReport
+
+DEFAULT_URL = "http://127.0.0.1:8420"
+
+
+class ServiceError(Exception):
+    """
+    The reservation service could not be reached or failed to handle a request.
+    """
+
+
+# error names sent by the service, raised as the same exceptions the local classes raise
+_ERRORS = {
+    "TypeError": TypeError,
+    "ValueError": ValueError,
+    "KeyError": ValueError,
+    "IndexError": IndexError,
+    "QuotaExceededError": QuotaExceededError,
+    "PermissionError": PermissionError,
+}
+
+
+class ReservationClient:
+    """
+    Talks to a ReservationService (see service.py) instead of opening the database,
+    for kiosks that share one service. Each thread keeps its own keep-alive connection.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 10.0):
+        """
+        Initializes a ReservationClient instance.
+
+        Args:
+            url (str, optional): The service URL (default: 'http://127.0.0.1:8420').
+            timeout (float, optional): Seconds to wait for a response (default: 10).
+        """
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(self, method: str, path: str, params: dict = None, token: str = None) -> dict:
+        """
+        Sends one request. GET parameters go in the query string, POST parameters in a JSON body.
+
+        Returns:
+            dict: The decoded response.
+
+        Raises:
+            TypeError, ValueError, IndexError, QuotaExceededError, PermissionError: As raised by the service.
+            ServiceError: If the service is unreachable or failed.
+        """
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        body = None
+        if params and method == "GET":
+            path = f"{path}?{urlencode(params)}"
+        elif params:
+            body = json.dumps(params)
+
+        conn = self._connection()
+        try:
+            conn.request(method, path, body, headers)
+            response = conn.getresponse()
+            payload = json.loads(response.read() or b"{}")
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            # requests aren't retried: a reservation may have gone through before the failure
+            conn.close()
+            self._local.conn = None
+            raise ServiceError(f"Reservation service unavailable: {e}") from e
+        if response.status != 200:
+            raise _ERRORS.get(payload.get("error"), ServiceError)(payload.get("message", "Request failed"))
+        return payload
+
+    def login(self, library_card_number: str, pin: str) -> "RemoteUser":
+        """
+        Logs a patron in, like `User.login`.
+
+        Returns:
+            RemoteUser: The logged in patron.
+
+        Raises:
+            TypeError: If the library card number does not exist.
+            ValueError: If the PIN is incorrect.
+        """
+        payload = self.request("POST", "/login", {"library_card_number": library_card_number, "pin": pin})
+        return RemoteUser(self, payload["library_card_number"], payload["token"])
+
+
+class RemoteReservation:
+    """
+    The parts of ComputerReservation a kiosk uses, carried out by the service.
+    """
+
+    # opening hours are configuration shipped with the kiosk
+    schedule = ComputerReservation.schedule
+
+    def __init__(self, client: ReservationClient, library_card_number: str, token: str):
+        self.client = client
+        self.library_card_number = library_card_number
+        self.token = token
+
+    def availability(self, start: date, end: date) -> dict:
+        """
+        Free hours per day; see `ComputerReservation.availability`.
+        """
+        payload = self.client.request("GET", "/availability", {"start": start.isoformat(), "end": end.isoformat()})
+        return {date.fromisoformat(day): mask for day, mask in payload["availability"].items()}
+
+    def reserve_computer(self, time_slot: str) -> ReserveResult:
+        """
+        Reserves a computer; see `ComputerReservation.reserve_computer`.
+        """
+        payload = self.client.request("POST", "/reserve", {"time_slot": time_slot}, self.token)
+        return ReserveResult(ReserveStatus[payload["status"]], payload["time_slot"], payload["computer_id"])
+
+    def cancel_reservation(self, time_slot: str):
+        """
+        Cancels a reservation; see `ComputerReservation.cancel_reservation`.
+        """
+        self.client.request("POST", "/cancel", {"time_slot": time_slot}, self.token)
+
+    def reserve_series(self, time_slot: str, weeks: int) -> SeriesReport:
+        """
+        Reserves the same hour every week; see `ComputerReservation.reserve_series`.
+        """
+        payload = self.client.request("POST", "/series", {"time_slot": time_slot, "weeks": weeks}, self.token)
+        return SeriesReport(payload["applied"], payload["conflicts"], series_id=payload["series_id"])
+
+    def cancel_series(self, series_id: int) -> int:
+        """
+        Cancels a series; see `ComputerReservation.cancel_series`.
+        """
+        return self.client.request("POST", "/cancel_series", {"series_id": series_id}, self.token)["cancelled"]
+
+
+class RemoteUser:
+    """
+    The parts of User a kiosk uses, carried out by the service.
+    """
+
+    def __init__(self, client: ReservationClient, library_card_number: str, token: str):
+        self.client = client
+        self.library_card_number = library_card_number
+        self.token = token
+        self.reservation = RemoteReservation(client, library_card_number, token)
+
+    def list_reservations(self) -> list:
+        """
+        Lists the user's (time slot, computer id) reservations; see `User.list_reservations`.
+        """
+        payload = self.client.request("GET", "/reservations", token=self.token)
+        return [tuple(row) for row in payload["reservations"]]
+
+    def iter_reservations(self, after: str = None, page_size: int = 100):
+        """
+        Streams the user's reservations a page per request; see `User.iter_reservations`.
+        """
+        while True:
+            params = {"limit": page_size}
+            if after is not None:
+                params["after"] = after
+            page = self.client.request("GET", "/reservations", params, self.token)["reservations"]
+            for row in page:
+                yield tuple(row)
+            if len(page) < page_size:
+                return
+            after = page[-1][0]
+
+    def logout(self):
+        """
+        Ends the user's session.
+        """
+        self.client.request("POST", "/logout", token=self.token)
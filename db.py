@@ -0,0 +1,414 @@
+import atexit
+import random
+import secrets
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from metrics import registry, statement_name
+
+DEFAULT_DB_PATH = 'LibraryMembers.db'
+
+# sqlite3 error codes for a database another connection holds locked
+_SQLITE_BUSY = 5
+_SQLITE_LOCKED = 6
+
+
+class DatabaseBusyError(sqlite3.OperationalError):
+    """
+    The database stayed locked by other writers through every retry, so nothing was written.
+    """
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often a write is retried when the database is locked, on top of the
+    connection's busy timeout.
+
+    Attributes:
+        attempts (int): Tries in total, 1 for no retries.
+        base_delay (float): Seconds to back off after the first failure; doubles with every retry.
+        max_delay (float): Longest back-off in seconds.
+    """
+    attempts: int = 5
+    base_delay: float = 0.02
+    max_delay: float = 1.0
+
+    def delay(self, attempt: int) -> float:
+        """
+        A random back-off before retry number `attempt` (from 0), so writers that collided don't collide again.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+DEFAULT_RETRY = RetryPolicy()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    A cursor that times its statements into `metrics.registry` while metrics are enabled.
+    SELECT timings cover executing the statement and producing the first row.
+    """
+
+    def execute(self, sql, parameters=()):
+        if not registry.enabled:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            registry.observe("statement", statement_name(sql), time.perf_counter() - start, max(self.rowcount, 0))
+
+    def executemany(self, sql, seq_of_parameters):
+        if not registry.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            registry.observe("statement", statement_name(sql), time.perf_counter() - start, max(self.rowcount, 0))
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    The connection class handed out by ConnectionManager. It tracks how deeply
+    `transaction` blocks are nested, and times statements and commits into
+    `metrics.registry` while metrics are enabled. The C implementations of
+    `execute` and of the context manager don't go through `cursor()` and
+    `commit()`, so those are wrapped as well.
+    """
+
+    transaction_depth = 0
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        if not registry.enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not registry.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        if not registry.enabled:
+            return super().commit()
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            registry.observe("commit", "commit", time.perf_counter() - start)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not registry.enabled or exc_type is not None or not self.in_transaction:
+            return super().__exit__(exc_type, exc_value, traceback)
+        start = time.perf_counter()
+        try:
+            return super().__exit__(exc_type, exc_value, traceback)
+        finally:
+            registry.observe("commit", "commit", time.perf_counter() - start)
+
+
+def _close_connections(connections: dict):
+    for conn in list(connections.values()):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    connections.clear()
+
+
+class _ThreadConnections:
+    """
+    One thread's connections, by database path. The thread's local storage holds
+    the only strong reference, so when the thread exits its connections are closed.
+    """
+
+    def __init__(self):
+        self.connections = {}
+        weakref.finalize(self, _close_connections, self.connections)
+
+
+class ConnectionManager:
+    """
+    Hands out long-lived SQLite connections, one per thread per database file.
+
+    Opening a connection is comparatively expensive (file open, schema parse,
+    pragma setup), so instead of calling `sqlite3.connect()` for every
+    operation each thread keeps its connection open and reuses it. Every
+    connection is tuned once when it is opened:
+    - WAL journaling so readers never block the writer.
+    - A busy timeout so a locked database is waited on instead of failing.
+    - A large prepared statement cache so repeated queries skip compilation.
+    - Statement and commit timing (see `metrics`), off unless metrics are enabled.
+
+    A thread's connections are closed when the thread exits, so short-lived
+    worker threads don't leave connections open behind them.
+    """
+
+    def __init__(self, busy_timeout: float = 5.0, cached_statements: int = 256):
+        """
+        Initializes a ConnectionManager instance.
+
+        Args:
+            busy_timeout (float, optional): Seconds to wait on a locked database (default: 5.0).
+                Changing `busy_timeout` later applies to connections opened afterwards.
+            cached_statements (int, optional): Prepared statements cached per connection (default: 256).
+        """
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self._foreign_keys = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = weakref.WeakSet()
+
+    def get(self, path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+        """
+        Returns the calling thread's connection to the database, opening it on first use.
+
+        Args:
+            path (str, optional): The database file, or a 'file:' URI such as one from
+                `memory_database` (default: 'LibraryMembers.db').
+
+        Returns:
+            sqlite3.Connection: A persistent connection owned by the calling thread.
+        """
+        connections = self._thread_connections()
+        conn = connections.get(path)
+        if conn is None:
+            conn = self._open(path)
+            with self._lock:
+                connections[path] = conn
+        return conn
+
+    def configure(self, path: str, foreign_keys: bool = True):
+        """
+        Sets options for one database file, applied to connections opened afterwards.
+
+        Args:
+            path (str): The database file.
+            foreign_keys (bool, optional): Whether SQLite enforces foreign keys (default: True).
+                A branch database whose members are kept in another file must turn them off,
+                since its reservations refer to members it doesn't have.
+        """
+        self._foreign_keys[path] = foreign_keys
+
+    def _thread_connections(self) -> dict:
+        owner = getattr(self._local, 'owner', None)
+        if owner is None:
+            owner = self._local.owner = _ThreadConnections()
+            with self._lock:
+                self._threads.add(owner)
+        return owner.connections
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        # check_same_thread is disabled only so close_path() and close_all() can close
+        # other threads' connections; each connection is otherwise used by its owner.
+        conn = sqlite3.connect(
+            path,
+            uri=path.startswith("file:"),
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}')
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if self._foreign_keys.get(path, True) else 'OFF'}")
+        return conn
+
+    def close(self, path: str = None):
+        """
+        Closes the calling thread's connections.
+
+        Args:
+            path (str, optional): Only close the connection to this database (default: all of them).
+        """
+        connections = self._thread_connections()
+        with self._lock:
+            closing = [connections.pop(p) for p in (list(connections) if path is None else [path]) if p in connections]
+        for conn in closing:
+            conn.close()
+
+    def close_path(self, path: str):
+        """
+        Closes every thread's connection to one database, e.g. when a branch or a test
+        database is done with. Threads that use it again get a new connection.
+
+        Args:
+            path (str): The database file.
+        """
+        with self._lock:
+            closing = [owner.connections.pop(path) for owner in self._threads if path in owner.connections]
+        for conn in closing:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self):
+        """
+        Closes every connection opened by this manager, across all threads.
+        Threads that use the manager again get new connections.
+        """
+        with self._lock:
+            owners = list(self._threads)
+        for owner in owners:
+            with self._lock:
+                connections = dict(owner.connections)
+                owner.connections.clear()
+            _close_connections(connections)
+
+
+manager = ConnectionManager()
+atexit.register(manager.close_all)
+
+
+def get_connection(path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """
+    Returns the calling thread's pooled connection to the database.
+
+    Args:
+        path (str, optional): The database file (default: 'LibraryMembers.db').
+
+    Returns:
+        sqlite3.Connection: A persistent connection owned by the calling thread.
+    """
+    return manager.get(path)
+
+
+def memory_database(name: str = None) -> str:
+    """
+    Names a private in-memory database that every connection in this process
+    opening the name shares, e.g. for tests. It is dropped once the last
+    connection to it closes.
+
+    It uses SQLite's memdb VFS rather than a shared-cache ':memory:' database:
+    connections lock it like a file and wait out each other's writes through
+    the busy timeout, where shared-cache readers fail with 'table is locked'.
+    Without WAL, reads wait for a write in progress to commit.
+
+    Args:
+        name (str, optional): The database name (default: a new random one).
+
+    Returns:
+        str: A 'file:' URI to use wherever a database file is expected.
+    """
+    return f"file:/{name or 'memory-' + secrets.token_hex(8)}?vfs=memdb"
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """
+    Runs the enclosed statements as one write transaction, committing on
+    success and rolling back if anything raises. The write lock is taken
+    up front (BEGIN IMMEDIATE) so reads inside the block see a stable
+    database that no other writer can change before the commit.
+
+    On a pooled connection, a transaction opened inside another one becomes
+    a savepoint: on error only its own statements are rolled back, and its
+    changes are committed with the outer transaction. This lets a caller
+    group several operations into one commit.
+
+    Args:
+        conn (sqlite3.Connection): The connection to run the transaction on.
+    """
+    depth = getattr(conn, "transaction_depth", 0)
+    if depth:
+        savepoint = f"nested_{depth}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        conn.transaction_depth += 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+        finally:
+            conn.transaction_depth -= 1
+        return
+
+    if conn.in_transaction:
+        conn.commit()
+    if registry.enabled:
+        start = time.perf_counter()
+        conn.execute('BEGIN IMMEDIATE')
+        registry.observe("lock_wait", "BEGIN IMMEDIATE", time.perf_counter() - start)
+    else:
+        conn.execute('BEGIN IMMEDIATE')
+    nested = isinstance(conn, PooledConnection)
+    if nested:
+        conn.transaction_depth = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        if nested:
+            conn.transaction_depth = 0
+
+
+def is_locked(error: Exception) -> bool:
+    """
+    Checks whether an error means another connection held the database locked.
+
+    Args:
+        error (Exception): The error raised by a statement.
+
+    Returns:
+        bool: True for SQLITE_BUSY and SQLITE_LOCKED errors.
+    """
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff in (_SQLITE_BUSY, _SQLITE_LOCKED)
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def run_transaction(conn: sqlite3.Connection, fn, retry: RetryPolicy = DEFAULT_RETRY):
+    """
+    Runs `fn(conn)` in a write transaction (see `transaction`), and runs it again in a
+    fresh transaction when the database is still locked after the busy timeout, backing
+    off for a random, growing delay in between. Inside another transaction the write
+    lock is already held, so `fn` just runs once in a savepoint.
+
+    Args:
+        conn (sqlite3.Connection): The connection to write on.
+        fn (callable): The statements to run; may be called more than once.
+        retry (RetryPolicy, optional): How often to retry (default: DEFAULT_RETRY).
+
+    Returns:
+        The return value of `fn`.
+
+    Raises:
+        DatabaseBusyError: If the database was locked on every attempt.
+    """
+    if getattr(conn, 'transaction_depth', 0):
+        with transaction(conn):
+            return fn(conn)
+    for attempt in range(retry.attempts):
+        try:
+            with transaction(conn):
+                return fn(conn)
+        except sqlite3.OperationalError as e:
+            if not is_locked(e):
+                raise
+            if attempt == retry.attempts - 1:
+                raise DatabaseBusyError("The reservation system is busy, please try again.") from e
+            delay = retry.delay(attempt)
+            if registry.enabled:
+                registry.observe("lock_retry", getattr(fn, '__qualname__', 'write'), delay)
+            time.sleep(delay)
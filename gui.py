@@ -1,42 +1,113 @@
+import argparse
 import tkinter as tk
+from datetime import date, datetime, timedelta
+from itertools import islice
 from tkinter import ttk
 from tkinter import messagebox
-from tkcalendar import Calendar
+from reservation import ComputerReservation
+from schedule import mask_hours
+from sweeper import ReservationSweeper
 from user import User
+from worker import TkWorker
+
+# how far ahead patrons can book
+AVAILABILITY_DAYS = 60
+# reservations fetched per page of the reservation list
+LIST_PAGE = 50
+# longest weekly series a patron can book from the reserve screen
+MAX_SERIES_WEEKS = 12
 
 class GUI:
     """
     A GUI-based system for a computer reservation system.
+
+    Each screen is a frame built the first time it is shown and kept afterwards;
+    showing it again raises the frame and refreshes its data in place, so
+    navigating doesn't rebuild widgets (or the calendar) on slow kiosk hardware.
     """
-    def __init__(self, root) -> None:
+    def __init__(self, root, authenticate=User.login) -> None:
         """
         Initialize the GUI application with the root window, setting up
         the title, geometry, and default login screen.
 
         Args:
             root (tk.Tk): The root window for the application.
+            authenticate (callable, optional): Logs a patron in from their library card number and PIN
+                (default: `User.login`, which uses the database directly).
         """
         self.root = root
+        self.authenticate = authenticate
+        self.user = None
         root.title("Computer Reservation System")
         root.geometry("800x600")
         root.configure(bg="#ffffff")
         self.large_font = ('Helvetica', 20)
 
+        # the screens are stacked in one cell of the container and raised in turn
+        self.container = tk.Frame(root)
+        self.container.pack(fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+        self.frames = {}
+        self.buttons = []
+        # paging state of the reservation list
+        self.list_after = None
+        self.list_complete = True
+        self.list_loading = False
+
+        # database calls run off the Tk thread; the status line shows while one is in flight
+        self.status = tk.Label(self.root, text="", fg="gray")
+        self.worker = TkWorker(root, on_busy=self.set_busy)
+
         self.create_login_screen()
 
-    def create_login_screen(self):
+    def show_screen(self, name: str) -> tk.Frame:
+        """
+        Raise a screen, building it with `build_<name>_screen` the first time.
+
+        Args:
+            name (str): The screen: 'login', 'main', 'reserve', 'cancel' or 'list'.
+
+        Returns:
+            tk.Frame: The screen's frame.
         """
-        Create and display the login screen with input fields for library card number and pin.
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = self.frames[name] = tk.Frame(self.container)
+            frame.grid(row=0, column=0, sticky="nsew")
+            getattr(self, f"build_{name}_screen")(frame)
+        frame.tkraise()
+        return frame
+
+    def add_button(self, parent, **options) -> tk.Button:
+        """
+        Create a button that is disabled while a database call is in flight.
+        """
+        button = tk.Button(parent, **options)
+        self.buttons.append(button)
+        return button
+
+    def build_login_screen(self, frame):
         """
-        self.clear_screen()
-        tk.Label(self.root, text="Library Card Number", font=self.large_font).pack(pady=10)
-        self.lcn_entry = tk.Entry(self.root, font=self.large_font)
+        Build the login screen with input fields for library card number and pin.
+        """
+        tk.Label(frame, text="Library Card Number", font=self.large_font).pack(pady=10)
+        self.lcn_entry = tk.Entry(frame, font=self.large_font)
         self.lcn_entry.pack()
-        tk.Label(self.root, text="Pin", font=self.large_font).pack(pady=5)
-        self.pin_entry = tk.Entry(self.root, show="*", font=self.large_font)
+        tk.Label(frame, text="Pin", font=self.large_font).pack(pady=5)
+        self.pin_entry = tk.Entry(frame, show="*", font=self.large_font)
         self.pin_entry.pack()
 
-        tk.Button(self.root, text="Login", command=self.login, font=self.large_font).pack(pady=10)
+        self.add_button(frame, text="Login", command=self.login, font=self.large_font).pack(pady=10)
+
+    def create_login_screen(self):
+        """
+        Display the login screen with empty input fields.
+        """
+        self.show_screen("login")
+        self.lcn_entry.delete(0, tk.END)
+        self.pin_entry.delete(0, tk.END)
+        self.lcn_entry.focus_set()
 
     def login(self):
         """
@@ -49,56 +120,132 @@ class GUI:
         if lcn == "" or pin == "":
             messagebox.showerror("Input Error", "Input Error: there is no input in one or more entries")
             return
-        try:
-            self.user = User(lcn, pin)
+        self.worker.submit(self.authenticate, lcn, pin, on_success=self.logged_in, on_error=self.show_error)
 
-        except TypeError as e:
-            # library card number doesn't exist
-            messagebox.showerror("Error", f"{e}")
-            return
+    def logged_in(self, user):
+        """
+        Keep the authenticated user and show the main screen.
 
-        except ValueError as e:
-            # wrong pin
-            messagebox.showerror("Error", f"{e}")
-            return
-        
+        Args:
+            user (User): The user returned by a successful login.
+        """
+        self.user = user
+        self.create_main_screen()
+
+    def show_error(self, error):
+        """
+        Show an error raised by a background database call.
+        The user and reservation classes report problems as TypeError (library card number
+        doesn't exist, library isn't open), ValueError (wrong pin, time slot in the past,
+        reservation doesn't exist) or IndexError (time slot already reserved, too many reservations).
+
+        Args:
+            error (Exception): The exception raised by the call.
+        """
+        messagebox.showerror("Error", f"{error}")
+
+    def set_busy(self, busy: bool):
+        """
+        Show or hide the busy indicator and block the buttons while a database call is in flight.
+
+        Args:
+            busy (bool): True when a call starts, False when it finishes.
+        """
+        self.root.configure(cursor="watch" if busy else "")
+        if busy:
+            self.status.configure(text="Working...")
+            self.status.place(relx=0.5, rely=1.0, anchor="s")
+            self.status.lift()
         else:
-            self.create_main_screen()
-    
-    def create_main_screen(self):
+            self.status.place_forget()
+        for button in self.buttons:
+            button.configure(state=tk.DISABLED if busy else tk.NORMAL)
+
+    def build_main_screen(self, frame):
         """
-        Display the main screen with options to manage reservations.
+        Build the main screen with options to manage reservations.
         """
-        self.clear_screen()
-        self.user.reservation.remove_past_reservations()
-        
-        tk.Label(self.root, text=f"Logged in as Library Card Number: {self.user.library_card_number}", font=self.large_font).pack(pady=5)
+        self.user_label = tk.Label(frame, font=self.large_font)
+        self.user_label.pack(pady=5)
 
-        self.reserve_computer_button = tk.Button(self.root, text="Reserve Computer", command=self.create_reserve_computer_screen, font=self.large_font).pack(pady=5)
-        self.cancel_reservation_button = tk.Button(self.root, text="Cancel Computer Reservation", command=self.cancel_computer_reservation_screen, font=self.large_font).pack(pady=5)
-        self.list_reservations_button = tk.Button(self.root, text="List Reservations", command=self.list_reservations_screen, font=self.large_font).pack(pady=5)
-        self.logout_button = tk.Button(self.root, text="Logout", command=self.logout, font=self.large_font).pack(pady=5)
+        self.add_button(frame, text="Reserve Computer", command=self.create_reserve_computer_screen, font=self.large_font).pack(pady=5)
+        self.add_button(frame, text="Cancel Computer Reservation", command=self.cancel_computer_reservation_screen, font=self.large_font).pack(pady=5)
+        self.add_button(frame, text="List Reservations", command=self.list_reservations_screen, font=self.large_font).pack(pady=5)
+        self.add_button(frame, text="Logout", command=self.logout, font=self.large_font).pack(pady=5)
+
+    def create_main_screen(self):
+        """
+        Display the main screen for the logged in user.
+        """
+        self.show_screen("main")
+        self.user_label.configure(text=f"Logged in as Library Card Number: {self.user.library_card_number}")
 
     def create_reserve_computer_screen(self):
         """
-        Create and display the screen for reserving a computer.
+        Load the availability and then show the screen for reserving a computer.
         Allows the user to select a date and time for the reservation.
+        Days with nothing left to book are shaded, and only free hours are offered.
+        """
+        today = date.today()
+        # one range query covers every day the calendar can show
+        self.worker.submit(self.user.reservation.availability, today, today + timedelta(days=AVAILABILITY_DAYS),
+                           on_success=self.show_reserve_computer_screen, on_error=self.show_error)
+
+    def build_reserve_screen(self, frame):
+        """
+        Build the reserve screen and its calendar, once.
         """
-        self.clear_screen()
+        # imported here rather than at startup, since only this screen needs it
+        from tkcalendar import Calendar
 
-        tk.Label(self.root, text="Reserve Computer", font=self.large_font).pack(pady=5)
-        self.cal = Calendar(root, selectmode='day', date_pattern='mm/dd/yy')
+        tk.Label(frame, text="Reserve Computer", font=self.large_font).pack(pady=5)
+        self.cal = Calendar(frame, selectmode='day', date_pattern='mm/dd/yy')
+        self.cal.tag_config('full', background='gray', foreground='white')
+        self.cal.bind('<<CalendarSelected>>', self.update_time_options)
         self.cal.pack(pady=10)
 
-        tk.Label(root, text="Select Time:").pack()
-        time_options = [f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(0, 60, 60)]  
-        self.time_combobox = ttk.Combobox(root, values=time_options, state="readonly")
-        self.time_combobox.set("12:00") # default
+        tk.Label(frame, text="Select Time:").pack()
+        self.time_combobox = ttk.Combobox(frame, state="readonly")
         self.time_combobox.pack(pady=5)
-        tk.Button(root, text="Create Reservation", command=self.create_reservation).pack(pady=5)
+        tk.Label(frame, text="Repeat Weekly For (weeks):").pack()
+        self.weeks_spinbox = ttk.Spinbox(frame, from_=1, to=MAX_SERIES_WEEKS, width=5, state="readonly")
+        self.weeks_spinbox.set(1)
+        self.weeks_spinbox.pack(pady=5)
+        self.add_button(frame, text="Create Reservation", command=self.create_reservation).pack(pady=5)
+
+        self.add_button(frame, text="Back", command=self.create_main_screen).pack(pady=5)
+
+    def show_reserve_computer_screen(self, availability: dict):
+        """
+        Show the reserve screen once the availability has been loaded, refreshing the
+        calendar's range and shading in place.
+
+        Args:
+            availability (dict): Each bookable day mapped to its bit mask of free hours.
+        """
+        self.show_screen("reserve")
+        self.availability = availability
+        today = date.today()
+
+        self.cal.configure(mindate=today, maxdate=today + timedelta(days=AVAILABILITY_DAYS - 1))
+        selected = self.cal.selection_get()
+        if selected is None or selected < today:
+            self.cal.selection_set(today)
+        self.cal.calevent_remove('all')
+        for day, mask in self.availability.items():
+            if mask == 0 and self.user.reservation.schedule.day_mask(day):
+                self.cal.calevent_create(day, 'Fully booked', 'full')
+        self.update_time_options()
+
+    def update_time_options(self, event=None):
+        """
+        Offer only the hours that are still free on the selected day.
+        """
+        selected_date = datetime.strptime(self.cal.get_date(), '%m/%d/%y').date()
+        time_options = [f"{hour:02d}:00" for hour in mask_hours(self.availability.get(selected_date, 0))]
+        self.time_combobox.configure(values=time_options)
+        self.time_combobox.set(time_options[0] if time_options else "")
 
-        tk.Button(root, text="Back", command=self.create_main_screen).pack(pady=5)
-    
     def create_reservation(self):
         """
         Attempt to create a reservation for a selected date and time.
@@ -107,51 +254,75 @@ class GUI:
         """
         selected_date = self.cal.get_date()  # Get selected date from calendar
         selected_time = self.time_combobox.get()  # Get selected time from combobox
+        if selected_time == "":
+            messagebox.showerror("Error", "There are no free computers on that day.")
+            return
         date_time_string = selected_date + " " + selected_time
-        current_reservations = len(self.user.list_reservations())
-
-        if current_reservations >= 3:
-            messagebox.showerror("Error", f"You have {current_reservations}, you can't have any more")
+        weeks = int(self.weeks_spinbox.get())
+        if weeks > 1:
+            self.worker.submit(self.user.reservation.reserve_series, date_time_string, weeks,
+                               on_success=self.series_created, on_error=self.show_error)
             return
-        
-        try:
-            self.user.reservation.reserve_computer(date_time_string)
+        # the reservation limit is enforced by reserve_computer() in the same statement as the booking
+        self.worker.submit(self.user.reservation.reserve_computer, date_time_string,
+                           on_success=self.reservation_created, on_error=self.show_error)
 
-        except TypeError as e:
-            # Library isn't open
-            messagebox.showerror("Error", f"{e}")
-            return
+    def reservation_created(self, result):
+        """
+        Confirm a successful reservation and return to the main screen.
 
-        except ValueError as e:
-            # time slot is in the past
-            messagebox.showerror("Error", f"{e}")
-            return
-        
-        except IndexError as e:
-            # time slot is already reserved
-            messagebox.showerror("Error", f"{e}")
+        Args:
+            result (ReserveResult): The reservation that was made.
+        """
+        messagebox.showinfo("Reservation Success", f"Reservation for {result.time_slot} on computer {result.computer_id} successful!")
+        self.create_main_screen()
+
+    def series_created(self, report):
+        """
+        Report which weeks of a series were booked and return to the main screen.
+
+        Args:
+            report (SeriesReport): The booked and skipped occurrences.
+        """
+        if not report.applied:
+            messagebox.showerror("Error", "None of those weeks could be reserved.")
             return
-        
-        else:
-            messagebox.showinfo("Reservation Success", f"Reservation for {date_time_string} successful!")
-            self.create_main_screen()
-    
+        message = f"Reserved {len(report.applied)} weeks starting {next(iter(report.applied))}."
+        if report.conflicts:
+            message += "\n\nNot reserved:\n" + "\n".join(f"{slot}: {reason}" for slot, reason in sorted(report.conflicts.items()))
+        messagebox.showinfo("Reservation Success", message)
+        self.weeks_spinbox.set(1)
+        self.create_main_screen()
+
     def cancel_computer_reservation_screen(self):
         """
-        Display the screen for canceling an existing computer reservation.
+        Load the user's reservations and then show the screen for canceling one.
         """
-        self.clear_screen()
+        self.worker.submit(self.user.list_reservations, on_success=self.show_cancel_screen, on_error=self.show_error)
 
-        tk.Label(self.root, text="Cancel Reservation", font=self.large_font).pack(pady=5)
-        reservations = self.user.list_reservations()
-        reservations = [r[0] for r in reservations]
-        tk.Label(root, text="Select Reservation:").pack()
-        self.reservation_combobox = ttk.Combobox(root, values=reservations, state="readonly")
+    def build_cancel_screen(self, frame):
+        """
+        Build the cancel screen, once.
+        """
+        tk.Label(frame, text="Cancel Reservation", font=self.large_font).pack(pady=5)
+        tk.Label(frame, text="Select Reservation:").pack()
+        self.reservation_combobox = ttk.Combobox(frame, state="readonly")
         self.reservation_combobox.pack(pady=5)
 
-        tk.Button(root, text="Cancel Reservation", command=self.cancel_reservation).pack(pady=5)
+        self.add_button(frame, text="Cancel Reservation", command=self.cancel_reservation).pack(pady=5)
 
-        tk.Button(root, text="Back", command=self.create_main_screen).pack(pady=5)
+        self.add_button(frame, text="Back", command=self.create_main_screen).pack(pady=5)
+
+    def show_cancel_screen(self, reservations: list):
+        """
+        Show the cancel screen once the user's reservations have been loaded.
+
+        Args:
+            reservations (list): The user's (time slot, computer id) reservations.
+        """
+        self.show_screen("cancel")
+        self.reservation_combobox.configure(values=[r[0] for r in reservations])
+        self.reservation_combobox.set("")
 
     def cancel_reservation(self):
         """
@@ -160,43 +331,128 @@ class GUI:
         Raises error messages if the reservation cannot be canceled.
         """
         reservation = self.reservation_combobox.get()
-        try:
-            self.user.reservation.cancel_reservation(reservation)  
-        except ValueError as e:
-            # reservation doesn't exist
-            messagebox.showerror("Error", f"{e}")
-            return
-        else:
-            messagebox.showinfo("Cancelation Success", f"Canceled reservation for {reservation}!")
-            self.create_main_screen()
+        self.worker.submit(self.user.reservation.cancel_reservation, reservation,
+                           on_success=lambda _: self.reservation_canceled(reservation),
+                           on_error=self.show_error)
+
+    def reservation_canceled(self, reservation: str):
+        """
+        Confirm a successful cancellation and return to the main screen.
+        """
+        messagebox.showinfo("Cancelation Success", f"Canceled reservation for {reservation}!")
+        self.create_main_screen()
+
+    def build_list_screen(self, frame):
+        """
+        Build the reservation list, once. The Treeview only draws the rows in view,
+        and rows are fetched a page at a time as the list is scrolled.
+        """
+        tk.Label(frame, text="Reservations:", font=self.large_font).pack(pady=5)
+        body = tk.Frame(frame)
+        body.pack(fill="both", expand=True, padx=20)
+        self.reservation_tree = ttk.Treeview(body, columns=("time_slot", "computer"), show="headings", height=15)
+        self.reservation_tree.heading("time_slot", text="Time slot")
+        self.reservation_tree.heading("computer", text="Computer")
+        scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.reservation_tree.yview)
+
+        def scrolled(first, last):
+            scrollbar.set(first, last)
+            self.list_scrolled(last)
+
+        self.reservation_tree.configure(yscrollcommand=scrolled)
+        self.reservation_tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.add_button(frame, text="Back", command=self.create_main_screen).pack(pady=5)
 
     def list_reservations_screen(self):
         """
-        Display a list of current reservations made by the user.
+        Display a list of current reservations made by the user, starting with the first page.
+        """
+        self.show_screen("list")
+        self.reservation_tree.delete(*self.reservation_tree.get_children())
+        self.list_after = None
+        self.list_complete = False
+        self.list_loading = False
+        self.load_reservation_page()
+
+    def load_reservation_page(self):
+        """
+        Fetch the next page of the user's reservations in the background.
         """
-        self.clear_screen()
-        tk.Label(self.root, text="Reservations:", font=self.large_font).pack(pady=5)
-        reservations = self.user.list_reservations()
-        for reservation in reservations:
-            tk.Label(self.root, text=f"{reservation[0]}").pack(pady=5)
-        tk.Button(root, text="Back", command=self.create_main_screen).pack(pady=5)
+        user, after = self.user, self.list_after
+
+        def page():
+            return list(islice(user.iter_reservations(after, LIST_PAGE), LIST_PAGE))
+
+        def failed(error):
+            self.list_loading = False
+            self.show_error(error)
+
+        # refused while another call is in flight; the next scroll asks again
+        self.list_loading = self.worker.submit(page, on_success=self.show_reservations, on_error=failed)
+
+    def show_reservations(self, reservations: list):
+        """
+        Append a page of reservations to the list.
+
+        Args:
+            reservations (list): Up to LIST_PAGE (time slot, computer id) reservations.
+        """
+        self.list_loading = False
+        for time_slot, computer_id in reservations:
+            self.reservation_tree.insert("", tk.END, values=(time_slot, f"Computer {computer_id}"))
+        if reservations:
+            self.list_after = reservations[-1][0]
+        self.list_complete = len(reservations) < LIST_PAGE
+
+    def list_scrolled(self, last):
+        """
+        Fetch another page when the list is scrolled near its end.
+
+        Args:
+            last (str): The fraction of the list above the bottom of the view, from the scroll command.
+        """
+        if float(last) >= 0.9 and not self.list_complete and not self.list_loading:
+            self.load_reservation_page()
 
     def logout(self):
         """
         Log out the current user and return to the login screen.
         """
+        # a remote logout is a request to the service, so it must not block the window
+        self.worker.run_in_background(self.user.logout)
         self.user = None
+        # the retained screens must not show the last user's reservations
+        if "list" in self.frames:
+            self.reservation_tree.delete(*self.reservation_tree.get_children())
+        if "cancel" in self.frames:
+            self.reservation_combobox.configure(values=[])
+            self.reservation_combobox.set("")
         self.create_login_screen()
 
-    def clear_screen(self):
-        """
-        Clear all widgets from the root window.
-        """
-        for widget in self.root.winfo_children():
-            widget.destroy()
-    
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Computer reservation kiosk.")
+    parser.add_argument("--server", help="use the reservation service at this URL instead of the database")
+    parser.add_argument("--database", help="this branch's database file (default: LibraryMembers.db)")
+    parser.add_argument("--members", help="member database shared by several branches (default: the database file)")
+    args = parser.parse_args()
+    if args.members:
+        from branches import use_branch
+        use_branch(args.database or ComputerReservation.database, args.members)
+    elif args.database:
+        ComputerReservation.database = args.database
+
     root = tk.Tk()
-    app = GUI(root)
-    root.mainloop()
\ No newline at end of file
+    if args.server:
+        # the service owns the database and expires past reservations itself
+        from client import ReservationClient
+        app = GUI(root, ReservationClient(args.server).login)
+        root.mainloop()
+    else:
+        app = GUI(root)
+        # past reservations are expired on a timer, not on every screen render
+        sweeper = ReservationSweeper()
+        sweeper.start()
+        root.mainloop()
+        sweeper.stop()
\ No newline at end of file
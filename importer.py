@@ -0,0 +1,154 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from auth import hash_pin
+from db import get_connection, transaction
+from reservation import ComputerReservation
+from schema import migrate
+
+
+@dataclass
+class ImportReport:
+    """
+    Totals for one import run.
+
+    Attributes:
+        read (int): Rows read from the input.
+        inserted (int): Members added (or updated, with `update=True`).
+        skipped (int): Rows whose library card number was already a member.
+        seconds (float): Wall-clock time of the run.
+    """
+    read: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Average import throughput."""
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def read_csv(path: str):
+    """
+    Streams (library card number, PIN) pairs from a CSV file without loading it into memory.
+    A header row starting with 'library_card_number' is skipped.
+
+    Args:
+        path (str): The CSV file, or '-' for standard input.
+
+    Yields:
+        tuple: (library card number, PIN) pairs.
+    """
+    handle = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        for number, row in enumerate(csv.reader(handle)):
+            if not row or (number == 0 and row[0].strip().lower() == "library_card_number"):
+                continue
+            yield row[0].strip(), row[1].strip()
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _batches(rows, size: int):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_members(rows, database: str = None, batch_size: int = 5000, workers: int = None,
+                   update: bool = False, progress=None) -> ImportReport:
+    """
+    Adds members in bulk. PINs are hashed in a process pool, and each batch is
+    written with one `executemany` in its own transaction. Duplicate card numbers
+    are resolved by the database (`ON CONFLICT`) rather than by catching errors,
+    and, unless updating, existing members are filtered out before their PINs are
+    hashed so that re-running an import is cheap.
+
+    Args:
+        rows (iterable): (library card number, plaintext PIN) pairs.
+        database (str, optional): The database file (default: `ComputerReservation.members_database`,
+            or `ComputerReservation.database` if members aren't kept separately).
+        batch_size (int, optional): Rows per transaction (default: 5000).
+        workers (int, optional): Hashing processes; 1 hashes in-process (default: CPU count).
+        update (bool, optional): Replace the PIN of existing members instead of skipping them (default: False).
+        progress (callable, optional): Called with the running ImportReport after each batch.
+
+    Returns:
+        ImportReport: How many rows were read, inserted and skipped.
+    """
+    conn = get_connection(database or ComputerReservation.members_database or ComputerReservation.database)
+    migrate(conn)
+    if update:
+        statement = "INSERT INTO all_members (library_card_number, pin) VALUES (?, ?) ON CONFLICT(library_card_number) DO UPDATE SET pin = excluded.pin"
+    else:
+        statement = "INSERT INTO all_members (library_card_number, pin) VALUES (?, ?) ON CONFLICT(library_card_number) DO NOTHING"
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    report = ImportReport()
+    start = time.perf_counter()
+    try:
+        for batch in _batches(rows, batch_size):
+            report.read += len(batch)
+            batch = list(dict(batch).items())  # last PIN wins for repeated cards within a batch
+            if not update:
+                existing = set()
+                for i in range(0, len(batch), 500):
+                    cards = [card for card, _ in batch[i:i + 500]]
+                    placeholders = ",".join("?" * len(cards))
+                    existing.update(row[0] for row in conn.execute(
+                        f"SELECT library_card_number FROM all_members WHERE library_card_number IN ({placeholders})", cards))
+                batch = [(card, pin) for card, pin in batch if card not in existing]
+
+            pins = [pin for _, pin in batch]
+            if pool is not None:
+                hashes = list(pool.map(hash_pin, pins, chunksize=max(1, len(pins) // (workers * 4))))
+            else:
+                hashes = [hash_pin(pin) for pin in pins]
+
+            with transaction(conn):
+                before = conn.total_changes
+                conn.executemany(statement, [(card, pin_hash) for (card, _), pin_hash in zip(batch, hashes)])
+                inserted = conn.total_changes - before
+            report.inserted += inserted
+            report.skipped = report.read - report.inserted
+            report.seconds = time.perf_counter() - start
+            if progress is not None:
+                progress(report)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import library members from a CSV of card numbers and PINs.")
+    parser.add_argument("csv", help="CSV file with library_card_number,pin rows ('-' for stdin)")
+    parser.add_argument("--database", help="database file (default: LibraryMembers.db)")
+    parser.add_argument("--batch", type=int, default=5000, help="rows per transaction")
+    parser.add_argument("--workers", type=int, default=None, help="PIN hashing processes (default: CPU count)")
+    parser.add_argument("--update", action="store_true", help="replace PINs of existing members")
+    args = parser.parse_args()
+
+    def progress(report):
+        print(f"{report.read} read, {report.inserted} imported, {report.skipped} skipped, "
+              f"{report.rows_per_second:.0f} rows/s", flush=True)
+
+    report = import_members(read_csv(args.csv), args.database, args.batch, args.workers, args.update, progress)
+    print(f"Done: {report.inserted} of {report.read} rows imported in {report.seconds:.1f} s "
+          f"({report.rows_per_second:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
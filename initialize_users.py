@@ -1,11 +1,7 @@
-from user import User
-import sqlite3
+from importer import import_members
 
 # initializes users in the database for testing. All with the same password
 def initialize_users():
     people = ["0", "1", "2", "3", "4"]
-    for person in people:
-        try:
-            User(person*14, "0000", 1)
-        except sqlite3.IntegrityError:
-            pass
\ No newline at end of file
+    # existing members are skipped, so this is safe to run more than once
+    import_members([(person*14, "0000") for person in people], workers=1)
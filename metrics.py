@@ -0,0 +1,263 @@
+import argparse
+import atexit
+import functools
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds in seconds: 1 microsecond doubling up to ~17 seconds.
+BUCKETS = tuple(1e-6 * 2 ** i for i in range(25))
+
+# Set to 1 to collect metrics, or to a file path to also write them there at exit.
+ENV_VAR = "LIBRARY_METRICS"
+
+
+class Histogram:
+    """
+    Latency distribution with logarithmic buckets, so recording a value is a
+    bisect and two additions no matter how many values have been recorded.
+
+    Attributes:
+        count (int): Values recorded.
+        total (float): Sum of the recorded values, in seconds.
+        max (float): Largest recorded value, in seconds.
+        rows (int): Rows touched, for statements.
+        buckets (list): Values recorded per bucket of BUCKETS (the last counts everything larger).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def record(self, seconds: float, rows: int = 0):
+        """
+        Records one value.
+
+        Args:
+            seconds (float): The duration.
+            rows (int, optional): Rows touched (default: 0).
+        """
+        self.count += 1
+        self.total += seconds
+        self.rows += rows
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def percentile(self, p: float) -> float:
+        """
+        Estimates a percentile as the upper bound of the bucket it falls in.
+
+        Args:
+            p (float): The percentile, 0 to 100.
+
+        Returns:
+            float: The estimate in seconds, never more than the largest recorded value.
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (self.max,), self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total": self.total, "max": self.max, "rows": self.rows,
+                "buckets": self.buckets}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls()
+        histogram.count, histogram.total, histogram.max = data["count"], data["total"], data["max"]
+        histogram.rows, histogram.buckets = data["rows"], list(data["buckets"])
+        return histogram
+
+
+class Metrics:
+    """
+    In-process latency histograms, grouped by kind:
+    - 'operation': calls to instrumented ComputerReservation and User methods.
+    - 'statement': SQL statements, keyed by their normalized text.
+    - 'lock_wait': time spent in BEGIN IMMEDIATE waiting for the write lock.
+    - 'lock_retry': back-off delays before retrying a write that found the database locked.
+    - 'commit': time spent committing.
+    - 'error': exceptions raised by operations (count only).
+
+    Collection is off by default. While disabled every hook returns after a
+    single attribute check, so the instrumentation can stay in production code.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        Initializes a Metrics instance.
+
+        Args:
+            enabled (bool, optional): Whether to start collecting right away (default: False).
+        """
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, name: str, seconds: float, rows: int = 0):
+        """
+        Records one duration.
+
+        Args:
+            kind (str): The group, e.g. 'operation' or 'statement'.
+            name (str): What was timed.
+            seconds (float): How long it took.
+            rows (int, optional): Rows touched (default: 0).
+        """
+        with self._lock:
+            histogram = self._histograms.get((kind, name))
+            if histogram is None:
+                histogram = self._histograms[(kind, name)] = Histogram()
+            histogram.record(seconds, rows)
+
+    def snapshot(self) -> dict:
+        """
+        Copies the collected histograms.
+
+        Returns:
+            dict: {kind: {name: histogram dict}}, suitable for JSON.
+        """
+        with self._lock:
+            items = [(key, histogram.to_dict()) for key, histogram in self._histograms.items()]
+        data = {}
+        for (kind, name), histogram in sorted(items):
+            data.setdefault(kind, {})[name] = histogram
+        return data
+
+    def reset(self):
+        """
+        Discards everything collected so far.
+        """
+        with self._lock:
+            self._histograms.clear()
+
+    def dump(self, path: str):
+        """
+        Writes a snapshot to a JSON file that `python metrics.py` can print.
+
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=1)
+
+
+registry = Metrics()
+
+
+def enable():
+    """Starts collecting metrics."""
+    registry.enabled = True
+
+
+def disable():
+    """Stops collecting metrics; what was collected is kept."""
+    registry.enabled = False
+
+
+def instrumented(name: str):
+    """
+    Decorator that records each call of a function as an 'operation', and each
+    exception it raises as an 'error'.
+
+    Args:
+        name (str): The operation name, e.g. 'reservation.reserve_computer'.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException as e:
+                registry.observe("error", f"{name}: {type(e).__name__}", 0.0)
+                raise
+            finally:
+                registry.observe("operation", name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_name(sql: str) -> str:
+    """
+    Normalizes a statement for use as a histogram name.
+
+    Args:
+        sql (str): The SQL text.
+
+    Returns:
+        str: The statement with whitespace collapsed, shortened to 100 characters.
+    """
+    sql = re.sub(r"\s+", " ", sql).strip()
+    return sql if len(sql) <= 100 else sql[:97] + "..."
+
+
+def format_report(data: dict) -> str:
+    """
+    Formats a snapshot as a table, slowest total time first within each kind.
+
+    Args:
+        data (dict): A snapshot from `Metrics.snapshot` or a dump file.
+
+    Returns:
+        str: The report.
+    """
+    lines = []
+    for kind in sorted(data):
+        lines.append(f"{kind}:")
+        histograms = [(name, Histogram.from_dict(h)) for name, h in data[kind].items()]
+        histograms.sort(key=lambda item: item[1].total, reverse=True)
+        for name, h in histograms:
+            if kind == "error":
+                lines.append(f"  {h.count:>8}  {name}")
+                continue
+            lines.append(f"  {h.count:>8}x  total {h.total * 1000:>9.1f} ms  p50 {h.percentile(50) * 1000:>8.3f}"
+                         f"  p99 {h.percentile(99) * 1000:>8.3f}  max {h.max * 1000:>8.3f} ms"
+                         f"{f'  rows {h.rows}' if h.rows else ''}  {name}")
+    return "\n".join(lines)
+
+
+def _configure_from_environment():
+    setting = os.environ.get(ENV_VAR)
+    if not setting or setting == "0":
+        return
+    enable()
+    if setting != "1":
+        atexit.register(registry.dump, setting)
+
+
+_configure_from_environment()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Print database metrics written by a run with {ENV_VAR}=<file>.")
+    parser.add_argument("dump", help="metrics file")
+    parser.add_argument("--kind", help="only show this kind (operation, statement, lock_wait, lock_retry, commit, error)")
+    args = parser.parse_args()
+
+    with open(args.dump, encoding="utf-8") as f:
+        data = json.load(f)
+    if args.kind:
+        data = {args.kind: data.get(args.kind, {})}
+    print(format_report(data))
+
+
+if __name__ == "__main__":
+    main()
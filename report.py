@@ -0,0 +1,158 @@
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+from branches import branch_argument
+from db import get_connection
+from reservation import ComputerReservation
+from schedule import DATE_FORMAT, WEEKDAYS
+from schema import ensure_schema
+from timeslot import EPOCH
+
+HOURLY_COLUMNS = ["branch", "date", "hour", "bookings", "cancellations", "reserved", "computers", "utilization"]
+WEEKDAY_COLUMNS = ["branch", "weekday", "hour", "bookings", "cancellations", "days", "average_reserved",
+                   "computers", "utilization"]
+
+
+def _day_number(day: date) -> int:
+    return (day - EPOCH.date()).days
+
+
+def _connect(database: str):
+    conn = get_connection(database)
+    ensure_schema(conn)
+    return conn
+
+
+def _computers(conn) -> int:
+    return conn.execute("SELECT COUNT(*) FROM computers WHERE in_service").fetchone()[0]
+
+
+def iter_hourly(branch: str, database: str, start: date, end: date):
+    """
+    Streams bookings and cancellations per hour from the `occupancy` totals, which the
+    database keeps up to date as reservations are made and cancelled. Each hour is one
+    row of a primary key range scan, however many reservations there have been.
+
+    Args:
+        branch (str): The branch name to put in each row.
+        database (str): The branch's database file.
+        start (date): The first day.
+        end (date): The day after the last day.
+
+    Yields:
+        dict: One row per hour with any activity, keyed by HOURLY_COLUMNS plus a '_key' to sort by,
+            in chronological order.
+    """
+    conn = _connect(database)
+    computers = _computers(conn)
+    for day, hour, bookings, cancellations in conn.execute("""
+        SELECT day, hour, bookings, cancellations FROM occupancy
+        WHERE day >= ? AND day < ?
+        ORDER BY day, hour
+    """, (_day_number(start), _day_number(end))):
+        reserved = bookings - cancellations
+        yield {"branch": branch, "date": (EPOCH + timedelta(days=day)).strftime(DATE_FORMAT), "hour": hour,
+               "bookings": bookings, "cancellations": cancellations, "reserved": reserved,
+               "computers": computers, "utilization": round(reserved / computers, 4) if computers else None,
+               "_key": (day, hour)}
+
+
+def iter_weekday(branch: str, database: str):
+    """
+    Streams bookings and cancellations per weekday and hour over all recorded history,
+    from the `occupancy_weekday` totals, with the average number of computers reserved
+    on each such day.
+
+    Args:
+        branch (str): The branch name to put in each row.
+        database (str): The branch's database file.
+
+    Yields:
+        dict: One row per weekday and hour with any activity, keyed by WEEKDAY_COLUMNS plus a '_key'
+            to sort by, Monday first.
+    """
+    conn = _connect(database)
+    computers = _computers(conn)
+    first, last = conn.execute("SELECT MIN(day), MAX(day) FROM occupancy").fetchone()
+    if first is None:
+        return
+    for weekday, hour, bookings, cancellations in conn.execute("""
+        SELECT weekday, hour, bookings, cancellations FROM occupancy_weekday ORDER BY weekday, hour
+    """):
+        # how many of this weekday fall between the first and last recorded day
+        offset = (weekday - (first + 3)) % 7
+        days = (last - first - offset) // 7 + 1 if last - first >= offset else 0
+        average = (bookings - cancellations) / days if days else 0.0
+        yield {"branch": branch, "weekday": WEEKDAYS[weekday], "hour": hour, "bookings": bookings,
+               "cancellations": cancellations, "days": days, "average_reserved": round(average, 4),
+               "computers": computers, "utilization": round(average / computers, 4) if computers else None,
+               "_key": (weekday, hour)}
+
+
+def merge_branches(streams: list):
+    """
+    Merges per-branch report streams into one, in bucket order, holding one row per branch at a time.
+
+    Args:
+        streams (list): Row generators from `iter_hourly` or `iter_weekday`, one per branch.
+
+    Yields:
+        dict: The rows of every branch, ordered by bucket and then by branch.
+    """
+    for row in heapq.merge(*streams, key=lambda row: (row["_key"], row["branch"])):
+        del row["_key"]
+        yield row
+
+
+def write_csv(rows, columns: list, out):
+    """
+    Writes report rows as CSV with a header, one row at a time.
+    """
+    writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+
+
+def write_json(rows, columns: list, out):
+    """
+    Writes report rows as a JSON array of objects, one row at a time.
+    """
+    out.write("[")
+    separator = "\n"
+    for row in rows:
+        out.write(separator + json.dumps({column: row[column] for column in columns}))
+        separator = ",\n"
+    out.write("\n]\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export computer utilization per hour or per weekday.")
+    parser.add_argument("report", choices=["hourly", "weekday"], help="per date and hour, or per weekday and hour")
+    parser.add_argument("--from", dest="start", help="first day, MM/DD/YY (hourly; default: 30 days ago)")
+    parser.add_argument("--days", type=int, default=30, help="number of days (hourly)")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv", help="output format")
+    parser.add_argument("--database", help="database file (default: LibraryMembers.db)")
+    parser.add_argument("--branch", type=branch_argument, action="append",
+                        help="a branch as NAME=DATABASE; repeat to report several branches together")
+    args = parser.parse_args()
+
+    database = args.database or ComputerReservation.database
+    branches = args.branch or [(os.path.splitext(os.path.basename(database))[0], database)]
+    if args.report == "hourly":
+        start = datetime.strptime(args.start, DATE_FORMAT).date() if args.start else date.today() - timedelta(days=args.days)
+        streams = [iter_hourly(name, path, start, start + timedelta(days=args.days)) for name, path in branches]
+        columns = HOURLY_COLUMNS
+    else:
+        streams = [iter_weekday(name, path) for name, path in branches]
+        columns = WEEKDAY_COLUMNS
+    write = write_csv if args.format == "csv" else write_json
+    write(merge_branches(streams), columns, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,91 @@
-import sqlite3
-from datetime import datetime
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from enum import Enum
+from itertools import repeat
+from typing import Optional
+from cache import ReservationCache
+from db import DEFAULT_DB_PATH, DEFAULT_RETRY, get_connection, run_transaction, transaction
+from metrics import instrumented
+from schedule import DEFAULT_SCHEDULE, mask_hours
+from schema import ensure_schema, migrate
+from series import SeriesRule
+from timeslot import DAY, EPOCH, HOUR, format_slot, parse_slot, to_epoch
+
+# Keeps IN (...) lists well under SQLite's bound parameter limit.
+_IN_CHUNK = 500
+
+
+def _chunks(items: list, size: int = _IN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@dataclass
+class BatchReport:
+    """
+    The per-slot outcome of `reserve_many` or `cancel_many`.
+
+    Attributes:
+        applied (dict): Time slots that were booked or cancelled, mapped to their computer id.
+        conflicts (dict): Time slots that were not applied, mapped to the reason why.
+        committed (bool): False if an all-or-nothing batch was rolled back.
+    """
+    applied: dict = field(default_factory=dict)
+    conflicts: dict = field(default_factory=dict)
+    committed: bool = True
+
+    @property
+    def ok(self) -> bool:
+        """True if every requested time slot was applied."""
+        return self.committed and not self.conflicts
+
+
+@dataclass
+class SeriesReport(BatchReport):
+    """
+    The outcome of `reserve_series`: a `BatchReport` of its occurrences, and the series they belong to.
+
+    Attributes:
+        series_id (int): The new series, or None if no occurrence was booked.
+    """
+    series_id: Optional[int] = None
+
+
+class ReserveStatus(Enum):
+    """
+    The outcome of a reservation attempt.
+    """
+    RESERVED = "reserved"
+    FULLY_BOOKED = "fully booked"
+    ALREADY_BOOKED = "already booked"
+    QUOTA_EXCEEDED = "quota exceeded"
+
+
+class QuotaExceededError(IndexError):
+    """
+    Raised when the user already has the maximum number of upcoming reservations.
+    """
+
+
+@dataclass(frozen=True)
+class ReserveResult:
+    """
+    The outcome of `try_reserve` or `reserve_computer`.
+
+    Attributes:
+        status (ReserveStatus): Whether the computer was reserved, and if not, why.
+        time_slot (str): The requested time slot in 'MM/DD/YY HH:00' format.
+        computer_id (int): The reserved computer, or None if nothing was reserved.
+    """
+    status: ReserveStatus
+    time_slot: str
+    computer_id: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if a computer was reserved."""
+        return self.status is ReserveStatus.RESERVED
 
 
 class ComputerReservation:
@@ -8,29 +94,86 @@ class ComputerReservation:
     database setup, and time slot reservations.
     """
 
+    database = DEFAULT_DB_PATH
+    # where library members are kept when several branches share them; None keeps them in `database`
+    members_database = None
+    schedule = DEFAULT_SCHEDULE
+    # upcoming reservations a patron may hold at once
+    max_reservations = 3
+    # reservations read recently, shared by every instance in the process
+    cache = ReservationCache()
+    # how reserving and cancelling retry when other kiosks hold the database locked
+    retry = DEFAULT_RETRY
+    # the current local time; tests swap in a fake clock
+    clock = staticmethod(datetime.now)
+    # subclasses made by `bind`, per (database, members database)
+    _bound = {}
+
     def __init__(self, library_card_number: str, pin: str):
         """
-        Initializes a ComputerReservation instance.
+        Initializes a ComputerReservation instance. The database is set up when
+        it is first used, not here, so constructing one is cheap.
 
         Args:
             library_card_number (str): The library card number of the user.
             pin (str): The user's encrypted PIN.
         """
-        self.create_tables()
         self.library_card_number = library_card_number
         self.pin = pin
 
-    @staticmethod
-    def get_db():
+    @classmethod
+    def bind(cls, database: str, members_database: str = None) -> type:
+        """
+        Returns a subclass that keeps its reservations in `database` (and its members in
+        `members_database`, if given) instead of the configured database, so one process
+        can work with several databases, e.g. a branch each or a private one per test.
+
+        Args:
+            database (str): A database file, or a 'file:' URI such as one from `db.memory_database`.
+            members_database (str, optional): Where the members are kept (default: as configured on this class).
+
+        Returns:
+            type: The subclass; the same one for the same arguments.
+        """
+        key = (cls, database, members_database)
+        bound = cls._bound.get(key)
+        if bound is None:
+            attributes = {"database": database}
+            if members_database is not None:
+                attributes["members_database"] = members_database
+            bound = cls._bound[key] = type(cls.__name__, (cls,), attributes)
+        return bound
+
+    @classmethod
+    def get_db(cls):
+        """
+        Returns the calling thread's pooled connection to the database, setting up
+        the schema on the connection's first use.
+        The connection stays open between calls and must not be closed by the caller.
+
+        Returns:
+            sqlite3.Connection: A connection object for the SQLite database.
+        """
+        conn = get_connection(cls.database)
+        ensure_schema(conn)
+        return conn
+
+    @classmethod
+    def get_members_db(cls):
         """
-        Creates a connection to the database.
+        Returns the calling thread's pooled connection to the database holding the library members:
+        `members_database` if set, otherwise the same database as the reservations.
 
         Returns:
             sqlite3.Connection: A connection object for the SQLite database.
         """
-        conn = sqlite3.connect('LibraryMembers.db')
+        if cls.members_database is None:
+            return cls.get_db()
+        conn = get_connection(cls.members_database)
+        ensure_schema(conn)
         return conn
 
+    @instrumented("reservation.user_exists")
     def user_exists(self) -> int:
         """
         Checks if the user exists in the database using their library card number.
@@ -38,14 +181,14 @@ class ComputerReservation:
         Returns:
             int: 1 if the user exists, 0 otherwise.
         """
-        conn = self.get_db()
+        conn = self.get_members_db()
         cursor = conn.cursor()
         cursor.execute("SELECT EXISTS(SELECT 1 FROM all_members WHERE library_card_number = ?)", (self.library_card_number,))
         exists = cursor.fetchone()[0]
         cursor.close()
-        conn.close()
         return exists
 
+    @instrumented("reservation.add_self")
     def add_self(self):
         """
         Adds the current user to the database. Primarily for testing purposes.
@@ -53,49 +196,116 @@ class ComputerReservation:
         Raises:
             sqlite3.IntegrityError: If the library card number already exists in the database.
         """
-        with self.get_db() as conn:
+        with self.get_members_db() as conn:
             cursor = conn.cursor()
             cursor.execute('INSERT INTO all_members (library_card_number, pin) VALUES (?, ?)', (self.library_card_number, self.pin))
             conn.commit()
 
     def create_tables(self):
         """
-        Sets up the database tables if they do not already exist:
+        Sets up the database tables if they do not already exist, migrating older databases in place:
         - `all_members`: Stores library card numbers and encrypted PINs.
-        - `reservations`: Stores time slot reservations and associated library card numbers.
+        - `computers`: Stores the bookable computers.
+        - `reservations`: Stores reserved (time slot, computer) pairs, with slots as sortable epoch seconds,
+          and the associated library card numbers.
+        """
+        migrate(self.get_db())
+
+    @instrumented("reservation.add_computer")
+    def add_computer(self, name: str) -> int:
+        """
+        Adds a bookable computer to the inventory.
+
+        Args:
+            name (str): A unique label for the computer, e.g. 'Computer 2'.
+
+        Returns:
+            int: The new computer's id.
+
+        Raises:
+            sqlite3.IntegrityError: If a computer with that name already exists.
         """
         with self.get_db() as conn:
             cursor = conn.cursor()
-            
-            # Enable foreign key constraints for this session
-            cursor.execute('PRAGMA foreign_keys = ON;')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS all_members (
-                    library_card_number TEXT PRIMARY KEY,
-                    pin TEXT NOT NULL
-                )
-            ''')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS reservations (
-                    time_slot TEXT PRIMARY KEY,
-                    library_card_number TEXT,
-                    FOREIGN KEY(library_card_number) REFERENCES all_members(library_card_number)
-                )
-            ''')
+            cursor.execute("INSERT INTO computers (name) VALUES (?)", (name,))
             conn.commit()
+        self.cache.invalidate(self.database)
+        return cursor.lastrowid
+
+    def computer_count(self) -> int:
+        """
+        Counts the computers that are in service.
+
+        Returns:
+            int: The number of bookable computers.
+        """
+        return self.get_db().execute("SELECT COUNT(*) FROM computers WHERE in_service").fetchone()[0]
+
+    def held_slots(self) -> dict:
+        """
+        Returns the user's reservations, from the reservation cache when possible.
+
+        Returns:
+            dict: Each reserved slot (seconds since 1970-01-01 00:00 local time) mapped to its computer id.
+        """
+        return self.cache.patron(self.get_db(), self.database, self.library_card_number)
 
-    def reserve_computer(self, time_slot: str):
+    @instrumented("reservation.allocate_computer")
+    def allocate_computer(self, time_slot: str) -> Optional[int]:
         """
-        Reserves a computer for the user at the specified time slot.
+        Finds a free computer at the time slot and claims it for the user in one indexed statement.
+        Does not check opening hours; use `reserve_computer` for patron bookings.
 
         Args:
             time_slot (str): The desired time slot in 'MM/DD/YY HH:00' format.
 
+        Returns:
+            int or None: The claimed computer's id, or None if every computer is taken.
+
+        Raises:
+            sqlite3.IntegrityError: If the user already has a computer at that time slot.
+        """
+        slot = parse_slot(time_slot)
+        with self.get_db() as conn:
+            cursor = conn.cursor()
+            # each NOT EXISTS probe is a primary key lookup on (slot, computer_id)
+            cursor.execute("""
+                INSERT INTO reservations (slot, computer_id, library_card_number)
+                SELECT ?, c.computer_id, ? FROM computers c
+                WHERE c.in_service
+                  AND NOT EXISTS (SELECT 1 FROM reservations r WHERE r.slot = ? AND r.computer_id = c.computer_id)
+                ORDER BY c.computer_id
+                LIMIT 1
+                RETURNING computer_id
+            """, (slot, self.library_card_number, slot))
+            row = cursor.fetchone()
+            cursor.close()
+            conn.commit()
+        if row is None:
+            return None
+        self.cache.reserved(self.database, slot, row[0], self.library_card_number)
+        return row[0]
+
+    @instrumented("reservation.try_reserve")
+    def try_reserve(self, time_slot: str) -> ReserveResult:
+        """
+        Reserves a free computer for the user at the time slot, unless the slot is fully booked,
+        the user already holds it, or the user has reached `max_reservations` upcoming reservations.
+        The quota check, the conflict check and the insert are a single guarded statement, so
+        parallel kiosks can't double-book a computer or push a patron past the limit. The reason
+        for a refusal is only looked up when nothing was inserted. A patron who already holds the
+        slot or is at the limit according to the reservation cache is refused without a write.
+
+        Args:
+            time_slot (str): The desired time slot in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            ReserveResult: The reserved computer, or why nothing was reserved.
+
         Raises:
             TypeError: If the time slot doesn't work.
             ValueError: If the time slot is in the past.
-            IndexError: If the time slot is already reserved.
+            DatabaseBusyError: If other kiosks kept the database locked through every retry.
         """
         if not self.is_valid_time_slot(time_slot):
             raise TypeError("Library is not open that day and time.")
@@ -103,18 +313,81 @@ class ComputerReservation:
         if self.is_past_time_slot(time_slot):
             raise ValueError("Cannot reserve a time slot in the past.")
 
-        with self.get_db() as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("SELECT EXISTS(SELECT 1 FROM reservations WHERE time_slot = ?)", (time_slot,))
-                if cursor.fetchone()[0]:
-                    raise IndexError("Time slot is already reserved.")
+        params = {
+            "slot": parse_slot(time_slot),
+            "card": self.library_card_number,
+            "now": to_epoch(self.clock()),
+            "quota": self.max_reservations,
+        }
+        cached = self.held_slots()
+        if params["slot"] in cached:
+            return ReserveResult(ReserveStatus.ALREADY_BOOKED, time_slot)
+        if sum(slot >= params["now"] for slot in cached) >= self.max_reservations:
+            return ReserveResult(ReserveStatus.QUOTA_EXCEEDED, time_slot)
+
+        def insert(conn):
+            row = conn.execute("""
+                INSERT INTO reservations (slot, computer_id, library_card_number)
+                SELECT :slot, c.computer_id, :card FROM computers c
+                WHERE c.in_service
+                  AND NOT EXISTS (SELECT 1 FROM reservations r WHERE r.slot = :slot AND r.computer_id = c.computer_id)
+                  AND (SELECT COUNT(*) FROM reservations q WHERE q.library_card_number = :card AND q.slot >= :now) < :quota
+                ORDER BY c.computer_id
+                LIMIT 1
+                ON CONFLICT DO NOTHING
+                RETURNING computer_id
+            """, params).fetchone()
+            if row is not None:
+                return row[0], None, None
+            held, upcoming = conn.execute("""
+                SELECT EXISTS(SELECT 1 FROM reservations WHERE library_card_number = :card AND slot = :slot),
+                       (SELECT COUNT(*) FROM reservations WHERE library_card_number = :card AND slot >= :now)
+            """, params).fetchone()
+            return None, held, upcoming
 
-                cursor.execute("INSERT INTO reservations (time_slot, library_card_number) VALUES (?, ?)", (time_slot, self.library_card_number))
-                conn.commit()
-            except sqlite3.Error as e:
-                print(f"Failed to reserve computer: {e}")
+        computer_id, held, upcoming = run_transaction(self.get_db(), insert, self.retry)
+        if computer_id is not None:
+            self.cache.reserved(self.database, params["slot"], computer_id, self.library_card_number)
+            return ReserveResult(ReserveStatus.RESERVED, time_slot, computer_id)
+        if held or upcoming >= self.max_reservations:
+            # the cache missed a booking made elsewhere
+            self.cache.invalidate(self.database)
+        if held:
+            return ReserveResult(ReserveStatus.ALREADY_BOOKED, time_slot)
+        if upcoming >= self.max_reservations:
+            return ReserveResult(ReserveStatus.QUOTA_EXCEEDED, time_slot)
+        return ReserveResult(ReserveStatus.FULLY_BOOKED, time_slot)
 
+    @instrumented("reservation.reserve_computer")
+    def reserve_computer(self, time_slot: str) -> ReserveResult:
+        """
+        Reserves a free computer for the user at the specified time slot.
+
+        Args:
+            time_slot (str): The desired time slot in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            ReserveResult: The reservation, including the id of the reserved computer.
+
+        Raises:
+            TypeError: If the time slot doesn't work.
+            ValueError: If the time slot is in the past.
+            IndexError: If every computer is already reserved at that time slot,
+                or the user already has one.
+            QuotaExceededError: If the user already has `max_reservations` upcoming reservations.
+            DatabaseBusyError: If other kiosks kept the database locked through every retry.
+            sqlite3.Error: If the database failed otherwise; nothing was reserved.
+        """
+        result = self.try_reserve(time_slot)
+        if result.status is ReserveStatus.ALREADY_BOOKED:
+            raise IndexError("You already have a computer reserved at that time slot.")
+        if result.status is ReserveStatus.QUOTA_EXCEEDED:
+            raise QuotaExceededError(f"You have {self.max_reservations} reservations, you can't have any more")
+        if result.status is ReserveStatus.FULLY_BOOKED:
+            raise IndexError("Time slot is already reserved.")
+        return result
+
+    @instrumented("reservation.cancel_reservation")
     def cancel_reservation(self, time_slot: str):
         """
         Cancels a reservation for the specified time slot.
@@ -124,22 +397,284 @@ class ComputerReservation:
 
         Raises:
             ValueError: If no reservation exists for the given time slot.
+            DatabaseBusyError: If other kiosks kept the database locked through every retry.
+            sqlite3.Error: If the database failed otherwise; nothing was canceled.
         """
-        with self.get_db() as conn:
-            cursor = conn.cursor()
+        try:
+            slot = parse_slot(time_slot)
+        except ValueError:
+            raise ValueError("No reservation found for this time slot.")
+
+        def delete(conn):
+            cursor = conn.execute("DELETE FROM reservations WHERE slot = ? AND library_card_number = ?",
+                                  (slot, self.library_card_number))
+            if cursor.rowcount == 0:
+                raise ValueError("No reservation found for this time slot.")
+
+        run_transaction(self.get_db(), delete, self.retry)
+        self.cache.cancelled(self.database, slot, self.library_card_number)
+
+    @instrumented("reservation.reserve_many")
+    def reserve_many(self, time_slots: list, atomic: bool = False) -> BatchReport:
+        """
+        Reserves a computer for the user at each of the time slots in a single transaction.
+        All slots are validated before anything is written, then every free slot is booked
+        with one `executemany`.
+
+        Args:
+            time_slots (list): Time slots in 'MM/DD/YY HH:00' format.
+            atomic (bool, optional): If True, book nothing unless every slot can be booked (default: False).
+
+        Returns:
+            BatchReport: The computer booked for each slot, and the reason any slot was skipped.
+        """
+        report = BatchReport()
+        wanted = {}
+        time_slots = list(dict.fromkeys(time_slots))
+        for time_slot, valid in zip(time_slots, self.validate_time_slots(time_slots)):
+            if not valid:
+                report.conflicts[time_slot] = "Library is not open that day and time."
+            elif self.is_past_time_slot(time_slot):
+                report.conflicts[time_slot] = "Cannot reserve a time slot in the past."
+            else:
+                wanted[parse_slot(time_slot)] = time_slot
+        if atomic and report.conflicts:
+            report.committed = False
+            return report
+
+        with transaction(self.get_db()) as conn:
+            computers = [row[0] for row in conn.execute("SELECT computer_id FROM computers WHERE in_service ORDER BY computer_id")]
+            taken = {slot: set() for slot in wanted}
+            held = set()
+            for chunk in _chunks(list(wanted)):
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT slot, computer_id, library_card_number FROM reservations WHERE slot IN ({placeholders})", chunk)
+                for slot, computer_id, library_card_number in rows:
+                    taken[slot].add(computer_id)
+                    if library_card_number == self.library_card_number:
+                        held.add(slot)
+
+            rows = []
+            for slot, time_slot in wanted.items():
+                if slot in held:
+                    report.conflicts[time_slot] = "You already have a computer reserved at that time slot."
+                    continue
+                computer_id = next((c for c in computers if c not in taken[slot]), None)
+                if computer_id is None:
+                    report.conflicts[time_slot] = "Time slot is already reserved."
+                    continue
+                rows.append((slot, computer_id, self.library_card_number))
+                report.applied[time_slot] = computer_id
+
+            if atomic and report.conflicts:
+                report.applied.clear()
+                report.committed = False
+                return report
+            conn.executemany("INSERT INTO reservations (slot, computer_id, library_card_number) VALUES (?, ?, ?)", rows)
+        for slot, computer_id, library_card_number in rows:
+            self.cache.reserved(self.database, slot, computer_id, library_card_number)
+        return report
+
+    @instrumented("reservation.cancel_many")
+    def cancel_many(self, time_slots: list, atomic: bool = False) -> BatchReport:
+        """
+        Cancels the user's reservations at each of the time slots in a single transaction.
+
+        Args:
+            time_slots (list): Time slots in 'MM/DD/YY HH:00' format.
+            atomic (bool, optional): If True, cancel nothing unless every slot is reserved by the user (default: False).
+
+        Returns:
+            BatchReport: The computer freed for each slot, and the reason any slot was skipped.
+        """
+        report = BatchReport()
+        wanted = {}
+        for time_slot in dict.fromkeys(time_slots):
             try:
-                cursor.execute("DELETE FROM reservations WHERE time_slot = ? AND library_card_number = ?",
-                               (time_slot, self.library_card_number))
-                conn.commit()
-                if cursor.rowcount > 0:
-                    return
+                wanted[parse_slot(time_slot)] = time_slot
+            except ValueError:
+                report.conflicts[time_slot] = "No reservation found for this time slot."
+        if atomic and report.conflicts:
+            report.committed = False
+            return report
+
+        with transaction(self.get_db()) as conn:
+            held = {}
+            for chunk in _chunks(list(wanted)):
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT slot, computer_id FROM reservations WHERE library_card_number = ? AND slot IN ({placeholders})",
+                                    [self.library_card_number, *chunk])
+                held.update(rows)
+
+            for slot, time_slot in wanted.items():
+                if slot in held:
+                    report.applied[time_slot] = held[slot]
                 else:
-                    raise ValueError("No reservation found for this time slot.")
-            except sqlite3.Error as e:
-                print(f"Failed to cancel reservation: {e}")
+                    report.conflicts[time_slot] = "No reservation found for this time slot."
+
+            if atomic and report.conflicts:
+                report.applied.clear()
+                report.committed = False
+                return report
+            conn.executemany("DELETE FROM reservations WHERE slot = ? AND library_card_number = ?",
+                             [(slot, self.library_card_number) for slot in held])
+        for slot in held:
+            self.cache.cancelled(self.database, slot, self.library_card_number)
+        return report
+
+    @instrumented("reservation.reserve_series")
+    def reserve_series(self, time_slot: str, weeks: int, atomic: bool = False) -> SeriesReport:
+        """
+        Reserves a computer for the user at the same hour every week, starting at `time_slot`.
+        Every occurrence is checked against the opening hours first, then against the existing
+        reservations with a single query that expands the rule in SQL, and the free ones are booked
+        with one `executemany`. The same computer is used for every occurrence when one is free
+        throughout. Like `reserve_many`, a series is not limited by `max_reservations`.
+
+        Args:
+            time_slot (str): The first occurrence in 'MM/DD/YY HH:00' format.
+            weeks (int): How many weeks in a row.
+            atomic (bool, optional): If True, book nothing unless every occurrence can be booked (default: False).
+
+        Returns:
+            SeriesReport: The computer booked for each occurrence, the reason any occurrence was skipped,
+                and the new series id.
+
+        Raises:
+            ValueError: If the time slot can't be read or `weeks` is less than 1.
+            DatabaseBusyError: If other kiosks kept the database locked through every retry.
+        """
+        rule = SeriesRule.weekly(time_slot, weeks)
+        report = SeriesReport()
+        now = to_epoch(self.clock())
+        wanted = []
+        for slot in rule.occurrences():
+            if not self.schedule.is_open(slot):
+                report.conflicts[format_slot(slot)] = "Library is not open that day and time."
+            elif slot < now:
+                report.conflicts[format_slot(slot)] = "Cannot reserve a time slot in the past."
+            else:
+                wanted.append(slot)
+        if atomic and report.conflicts:
+            report.committed = False
+            return report
+        if not wanted:
+            return report
+
+        def book(conn):
+            computers = [row[0] for row in conn.execute("SELECT computer_id FROM computers WHERE in_service ORDER BY computer_id")]
+            taken = {slot: set() for slot in wanted}
+            conflicts = {}
+            # the occurrences are generated by a recursive CTE and joined to the slot index,
+            # so the whole series is checked in one query rather than one per week
+            for slot, computer_id, library_card_number in conn.execute("""
+                WITH RECURSIVE occurrence(n, slot) AS (
+                    SELECT 0, :first
+                    UNION ALL
+                    SELECT n + 1, slot + :interval FROM occurrence WHERE n + 1 < :count
+                )
+                SELECT r.slot, r.computer_id, r.library_card_number
+                FROM occurrence o JOIN reservations r ON r.slot = o.slot
+            """, {"first": rule.first_slot, "interval": rule.interval, "count": rule.count}):
+                if slot not in taken:
+                    continue
+                if library_card_number == self.library_card_number:
+                    conflicts[slot] = "You already have a computer reserved at that time slot."
+                taken[slot].add(computer_id)
+
+            free = [slot for slot in wanted if slot not in conflicts]
+            same = next((c for c in computers if all(c not in taken[slot] for slot in free)), None)
+            rows = []
+            for slot in free:
+                computer_id = same if same is not None else next((c for c in computers if c not in taken[slot]), None)
+                if computer_id is None:
+                    conflicts[slot] = "Time slot is already reserved."
+                else:
+                    rows.append((slot, computer_id))
+            if not rows or (atomic and conflicts):
+                return None, [], conflicts
+            series_id = conn.execute("""
+                INSERT INTO reservation_series (library_card_number, first_slot, count, interval_days)
+                VALUES (?, ?, ?, ?) RETURNING series_id
+            """, (self.library_card_number, rule.first_slot, rule.count, rule.interval_days)).fetchone()[0]
+            conn.executemany("INSERT INTO reservations (slot, computer_id, library_card_number, series_id) VALUES (?, ?, ?, ?)",
+                             [(slot, computer_id, self.library_card_number, series_id) for slot, computer_id in rows])
+            return series_id, rows, conflicts
+
+        series_id, rows, conflicts = run_transaction(self.get_db(), book, self.retry)
+        report.series_id = series_id
+        report.conflicts.update((format_slot(slot), reason) for slot, reason in conflicts.items())
+        if atomic and report.conflicts:
+            report.committed = False
+            return report
+        for slot, computer_id in rows:
+            report.applied[format_slot(slot)] = computer_id
+            self.cache.reserved(self.database, slot, computer_id, self.library_card_number)
+        return report
+
+    @instrumented("reservation.cancel_series")
+    def cancel_series(self, series_id: int) -> int:
+        """
+        Cancels the user's series and every upcoming occurrence of it with a single delete;
+        past occurrences are left for the sweeper.
+
+        Args:
+            series_id (int): The series to cancel.
+
+        Returns:
+            int: The number of occurrences cancelled.
+
+        Raises:
+            ValueError: If the user has no such series.
+            DatabaseBusyError: If other kiosks kept the database locked through every retry.
+        """
+        def delete(conn):
+            # counted the way the series_cancelled trigger picks the occurrences it deletes
+            upcoming = conn.execute("""
+                SELECT COUNT(*) FROM reservations
+                WHERE series_id = ? AND slot >= CAST(strftime('%s', 'now', 'localtime') AS INTEGER)
+            """, (series_id,)).fetchone()[0]
+            cursor = conn.execute("DELETE FROM reservation_series WHERE series_id = ? AND library_card_number = ?",
+                                  (series_id, self.library_card_number))
+            if cursor.rowcount == 0:
+                raise ValueError("No series found.")
+            return upcoming
+
+        cancelled = run_transaction(self.get_db(), delete, self.retry)
+        self.cache.invalidate(self.database)
+        return cancelled
+
+    def list_series(self) -> dict:
+        """
+        Returns the user's recurring reservations.
+
+        Returns:
+            dict: Each series id mapped to its SeriesRule.
+        """
+        return {series_id: SeriesRule(first_slot, count, interval_days)
+                for series_id, first_slot, count, interval_days in self.get_db().execute(
+                    "SELECT series_id, first_slot, count, interval_days FROM reservation_series "
+                    "WHERE library_card_number = ? ORDER BY series_id", (self.library_card_number,))}
+
+    def iter_series_between(self, start: datetime, end: datetime):
+        """
+        Streams the occurrences of the user's series from `start` (inclusive) up to `end` (exclusive),
+        expanding each rule only over that range.
 
-    @staticmethod
-    def is_valid_time_slot(time_slot: str) -> bool:
+        Args:
+            start (datetime): The beginning of the range.
+            end (datetime): The end of the range.
+
+        Yields:
+            tuple: (time slot, series id) in chronological order.
+        """
+        start, end = to_epoch(start), to_epoch(end)
+        streams = [zip(rule.occurrences(start, end), repeat(series_id))
+                   for series_id, rule in self.list_series().items()]
+        for slot, series_id in heapq.merge(*streams):
+            yield format_slot(slot), series_id
+
+    def is_valid_time_slot(self, time_slot: str) -> bool:
         """
         Validates if the time slot is within the library's working hours.
 
@@ -149,32 +684,24 @@ class ComputerReservation:
         Returns:
             bool: True if the time slot is valid, False otherwise.
         """
-        try:
-            dt = datetime.strptime(time_slot, '%m/%d/%y %H:%M')
-            # Ensure the time is on the hour
-            if dt.minute != 0:
-                return False
-            weekday = dt.weekday()
-            if weekday == 6:  # Sunday
-                print("Invalid time slot: closed on Sunday")
-                return False
-            if weekday in [4, 5]:  # Friday and Saturday
-                if dt.hour < 10 or dt.hour > 17:  # Open 10 AM - 6 PM
-                    print("Invalid time slot: open between 10 AM-6 PM")
-                    return False
-            if weekday in [0, 1, 2, 3]:  # Monday - Thursday
-                if dt.hour < 10 or dt.hour > 20:  # Open 10 AM - 9 PM
-                    print("Invalid time slot: open between 10 AM-9 PM")
-                    return False
-            return True
-        except ValueError:
-            print("Invalid time slot format. Please use 'MM/DD/YY HH:00'.")
-            return False
+        return self.schedule.is_valid(time_slot)
+
+    def validate_time_slots(self, time_slots) -> list:
+        """
+        Validates many time slots against the library's working hours in one call.
+
+        Args:
+            time_slots (iterable): Time slots in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            list: One bool per time slot, True if it is valid.
+        """
+        return self.schedule.validate_many(time_slots)
 
-    @staticmethod
-    def is_past_time_slot(time_slot: str) -> bool:
+    @classmethod
+    def is_past_time_slot(cls, time_slot: str) -> bool:
         """
-        Checks if the time slot is in the past.
+        Checks if the time slot is in the past, by `clock`.
 
         Args:
             time_slot (str): The time slot in 'MM/DD/YY HH:00' format.
@@ -182,20 +709,146 @@ class ComputerReservation:
         Returns:
             bool: True if the time slot is in the past, False otherwise.
         """
-        dt = datetime.strptime(time_slot, '%m/%d/%y %H:%M')
-        return dt < datetime.now()
+        return parse_slot(time_slot) < to_epoch(cls.clock())
 
-    def remove_past_reservations(self):
+    @instrumented("reservation.remove_past_reservations")
+    def remove_past_reservations(self) -> int:
         """
-        Removes all reservations that have already passed.
+        Removes all reservations that have already passed, as a single range delete on the slot index.
+
+        Returns:
+            int: The number of reservations removed.
         """
-        now = datetime.now()
         with self.get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT time_slot FROM reservations")
-            reservations = cursor.fetchall()
-            for reservation in reservations:
-                reservation = datetime.strptime(reservation[0], '%m/%d/%y %H:%M')
-                if reservation < now:
-                    cursor.execute("DELETE FROM reservations WHERE time_slot = ?", (reservation,))
+            cursor.execute("DELETE FROM reservations WHERE slot < ?", (to_epoch(self.clock()),))
             conn.commit()
+        self.cache.invalidate(self.database)
+        return cursor.rowcount
+
+    def iter_reservations_between(self, start: datetime, end: datetime, page_size: int = 500):
+        """
+        Streams every patron's reservations from `start` (inclusive) up to `end` (exclusive).
+        Rows are read a page at a time with keyset pagination on the (slot, computer id) primary
+        key, so each page is an index range scan that starts where the last one stopped, memory
+        stays at one page however many rows match, and no read transaction stays open between pages.
+
+        Args:
+            start (datetime): The beginning of the range.
+            end (datetime): The end of the range.
+            page_size (int, optional): Rows fetched per query (default: 500).
+
+        Yields:
+            tuple: (time slot, computer id, library card number) in chronological order.
+        """
+        # computer ids start at 1, so (start, 0) is before every reservation at `start`
+        slot, computer_id, end = to_epoch(start), 0, to_epoch(end)
+        while True:
+            rows = self.get_db().execute("""
+                SELECT slot, computer_id, library_card_number FROM reservations
+                WHERE (slot, computer_id) > (?, ?) AND slot < ?
+                ORDER BY slot, computer_id
+                LIMIT ?
+            """, (slot, computer_id, end, page_size)).fetchall()
+            for row in rows:
+                yield format_slot(row[0]), row[1], row[2]
+            if len(rows) < page_size:
+                return
+            slot, computer_id = rows[-1][0], rows[-1][1]
+
+    def iter_held(self, after: str = None, page_size: int = 100):
+        """
+        Streams the user's reservations in chronological order, a page at a time, using keyset
+        pagination on the (library card number, slot) index.
+
+        Args:
+            after (str, optional): Only list reservations after this time slot in 'MM/DD/YY HH:00' format,
+                e.g. the last one shown, to continue a listing (default: from the first one).
+            page_size (int, optional): Rows fetched per query (default: 100).
+
+        Yields:
+            tuple: (time slot, computer id).
+        """
+        slot = parse_slot(after) if after is not None else -1
+        while True:
+            rows = self.get_db().execute("""
+                SELECT slot, computer_id FROM reservations
+                WHERE library_card_number = ? AND slot > ?
+                ORDER BY slot
+                LIMIT ?
+            """, (self.library_card_number, slot, page_size)).fetchall()
+            for row in rows:
+                yield format_slot(row[0]), row[1]
+            if len(rows) < page_size:
+                return
+            slot = rows[-1][0]
+
+    @instrumented("reservation.reservations_between")
+    def reservations_between(self, start: datetime, end: datetime) -> list:
+        """
+        Lists every patron's reservations from `start` (inclusive) up to `end` (exclusive).
+
+        Args:
+            start (datetime): The beginning of the range.
+            end (datetime): The end of the range.
+
+        Returns:
+            list: (time slot, computer id, library card number) tuples in chronological order.
+        """
+        return list(self.iter_reservations_between(start, end))
+
+    @instrumented("reservation.availability")
+    def availability(self, start: date, end: date) -> dict:
+        """
+        Computes which hours the user could still book on each day from `start` up to (not including) `end`,
+        from the reservations of those days (via the reservation cache) and the opening hours.
+
+        Args:
+            start (date): The first day.
+            end (date): The day after the last day.
+
+        Returns:
+            dict: Each day mapped to a bit mask with bit h set if a computer is free for the user at hour h.
+        """
+        first = (start - EPOCH.date()).days
+        last = (end - EPOCH.date()).days
+        conn = self.get_db()
+        seats = self.cache.seats(conn, self.database)
+        # hours that are fully booked, or that the user already holds, per day number
+        unavailable = {}
+        for number, day in self.cache.days(conn, self.database, first, last).items():
+            for slot, computers in day.items():
+                if len(computers) >= seats or self.library_card_number in computers.values():
+                    unavailable[number] = unavailable.get(number, 0) | 1 << (slot % DAY // HOUR)
+
+        now = to_epoch(self.clock())
+        today, seconds = divmod(now, DAY)
+        # hours that have already started today
+        started = (1 << (seconds // HOUR + 1)) - 1
+
+        result = {}
+        for number in range(first, last):
+            if number < today:
+                mask = 0
+            else:
+                mask = self.schedule.day_mask(start + timedelta(days=number - first)) & ~unavailable.get(number, 0)
+                if number == today:
+                    mask &= ~started
+            result[start + timedelta(days=number - first)] = mask
+        return result
+
+    @instrumented("reservation.available_slots")
+    def available_slots(self, start: date, end: date) -> list:
+        """
+        Lists every time slot the user could still book from `start` up to (not including) `end`.
+
+        Args:
+            start (date): The first day.
+            end (date): The day after the last day.
+
+        Returns:
+            list: Time slots in 'MM/DD/YY HH:00' format, in chronological order.
+        """
+        return [f"{day:%m/%d/%y} {hour:02d}:00"
+                for day, mask in self.availability(start, end).items()
+                for hour in mask_hours(mask)]
@@ -0,0 +1,181 @@
+from datetime import date, datetime
+from timeslot import DAY, EPOCH, HOUR, parse_slot
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DATE_FORMAT = '%m/%d/%y'
+
+# 1970-01-01, day 0 of the slot encoding, was a Thursday.
+_EPOCH_WEEKDAY = EPOCH.weekday()
+
+# Opening hours are (opening, closing) times; the last bookable slot starts
+# an hour before closing. Days left out are closed all day.
+DEFAULT_CONFIG = {
+    "hours": {
+        "monday": ("10:00", "21:00"),
+        "tuesday": ("10:00", "21:00"),
+        "wednesday": ("10:00", "21:00"),
+        "thursday": ("10:00", "21:00"),
+        "friday": ("10:00", "18:00"),
+        "saturday": ("10:00", "18:00"),
+    },
+    # 'MM/DD/YY' dates the library is closed all day
+    "holidays": [],
+    # one-off closures: {"date": "MM/DD/YY", "from": "HH:00", "to": "HH:00"}
+    "closures": [],
+}
+
+
+def _hour(value: str) -> int:
+    return datetime.strptime(value, '%H:%M').hour
+
+
+def _hour_mask(opening: int, closing: int) -> int:
+    # bit h is set when the slot starting at hour h is bookable
+    return ((1 << closing) - 1) & ~((1 << opening) - 1)
+
+
+def _day_number(day: date) -> int:
+    return (day - EPOCH.date()).days
+
+
+class Schedule:
+    """
+    The library's opening hours, compiled into a lookup table of bookable hour slots.
+
+    Each weekday is reduced to a 24-bit mask of open hours, and holidays and
+    one-off closures to per-day masks that override it, so checking a slot is
+    a couple of integer operations instead of date parsing and branching.
+    """
+
+    def __init__(self, config: dict = None):
+        """
+        Initializes a Schedule instance.
+
+        Args:
+            config (dict, optional): Opening hours, holidays and closures in the
+                shape of `DEFAULT_CONFIG` (default: `DEFAULT_CONFIG`).
+
+        Raises:
+            ValueError: If a weekday, date or time in the configuration can't be read.
+        """
+        config = DEFAULT_CONFIG if config is None else config
+        self.weekly = [0] * 7
+        for weekday, (opening, closing) in config.get("hours", {}).items():
+            self.weekly[WEEKDAYS.index(weekday.lower())] = _hour_mask(_hour(opening), _hour(closing))
+
+        self.overrides = {}
+        for holiday in config.get("holidays", []):
+            self.overrides[_day_number(datetime.strptime(holiday, DATE_FORMAT).date())] = 0
+        for closure in config.get("closures", []):
+            day = datetime.strptime(closure["date"], DATE_FORMAT).date()
+            number = _day_number(day)
+            closed = _hour_mask(_hour(closure["from"]), _hour(closure["to"]))
+            self.overrides[number] = self.day_mask(day) & ~closed
+
+    def day_mask(self, day: date) -> int:
+        """
+        Looks up the bookable hours of a day.
+
+        Args:
+            day (date): The day to look up.
+
+        Returns:
+            int: A bit mask with bit h set if the slot starting at hour h is bookable.
+        """
+        return self._mask(_day_number(day))
+
+    def _mask(self, number: int) -> int:
+        mask = self.overrides.get(number)
+        if mask is None:
+            mask = self.weekly[(number + _EPOCH_WEEKDAY) % 7]
+        return mask
+
+    def is_open(self, slot: int) -> bool:
+        """
+        Checks a stored slot value against the opening hours.
+
+        Args:
+            slot (int): Seconds since 1970-01-01 00:00 local time.
+
+        Returns:
+            bool: True if the library is open for the whole hour starting at `slot`.
+        """
+        if slot % HOUR:
+            return False
+        number, seconds = divmod(slot, DAY)
+        return bool(self._mask(number) >> (seconds // HOUR) & 1)
+
+    def is_valid(self, time_slot: str) -> bool:
+        """
+        Validates a time slot string against the opening hours.
+
+        Args:
+            time_slot (str): The time slot in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            bool: True if the library is open at that time, False if it is closed
+                or the time slot can't be read.
+        """
+        try:
+            return self.is_open(parse_slot(time_slot))
+        except (TypeError, ValueError):
+            return False
+
+    def validate_many(self, time_slots) -> list:
+        """
+        Validates many time slot strings in one call.
+
+        Args:
+            time_slots (iterable): Time slots in 'MM/DD/YY HH:00' format.
+
+        Returns:
+            list: One bool per time slot, in the same order.
+        """
+        results = []
+        append = results.append
+        mask_of = self._mask
+        for time_slot in time_slots:
+            try:
+                slot = parse_slot(time_slot)
+            except (TypeError, ValueError):
+                append(False)
+                continue
+            number, seconds = divmod(slot, DAY)
+            append(not seconds % HOUR and bool(mask_of(number) >> (seconds // HOUR) & 1))
+        return results
+
+    def open_slots(self, start: date, end: date):
+        """
+        Generates every bookable slot from the start of `start` up to (not including) `end`.
+
+        Args:
+            start (date): The first day.
+            end (date): The day after the last day.
+
+        Yields:
+            int: Bookable slots as seconds since 1970-01-01 00:00 local time, in order.
+        """
+        for number in range(_day_number(start), _day_number(end)):
+            mask = self._mask(number)
+            hour = 0
+            while mask:
+                if mask & 1:
+                    yield number * DAY + hour * HOUR
+                mask >>= 1
+                hour += 1
+
+
+def mask_hours(mask: int) -> list:
+    """
+    Lists the hours set in a day's bit mask.
+
+    Args:
+        mask (int): A bit mask with bit h set for hour h.
+
+    Returns:
+        list: The set hours, in order.
+    """
+    return [hour for hour in range(24) if mask >> hour & 1]
+
+
+DEFAULT_SCHEDULE = Schedule()
@@ -0,0 +1,254 @@
+import sqlite3
+from datetime import datetime
+from timeslot import SLOT_FORMAT, to_epoch
+
+
+def _create_initial_tables(conn: sqlite3.Connection):
+    """
+    Version 1: the original schema, keyed by 'MM/DD/YY HH:00' text slots.
+    Databases created before schema versioning already have these tables.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS all_members (
+            library_card_number TEXT PRIMARY KEY,
+            pin TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS reservations (
+            time_slot TEXT PRIMARY KEY,
+            library_card_number TEXT,
+            FOREIGN KEY(library_card_number) REFERENCES all_members(library_card_number)
+        )
+    ''')
+
+
+def _use_epoch_slots(conn: sqlite3.Connection):
+    """
+    Version 2: stores slots as sortable integer seconds and indexes card numbers.
+    """
+    conn.execute('''
+        CREATE TABLE reservations_v2 (
+            slot INTEGER PRIMARY KEY,
+            library_card_number TEXT,
+            FOREIGN KEY(library_card_number) REFERENCES all_members(library_card_number)
+        )
+    ''')
+    rows = []
+    for time_slot, library_card_number in conn.execute('SELECT time_slot, library_card_number FROM reservations'):
+        try:
+            rows.append((to_epoch(datetime.strptime(time_slot, SLOT_FORMAT)), library_card_number))
+        except (TypeError, ValueError):
+            # unreadable slots could never be matched or cancelled, so they are dropped
+            continue
+    conn.executemany('INSERT OR IGNORE INTO reservations_v2 (slot, library_card_number) VALUES (?, ?)', rows)
+    conn.execute('DROP TABLE reservations')
+    conn.execute('ALTER TABLE reservations_v2 RENAME TO reservations')
+    conn.execute('CREATE INDEX idx_reservations_card ON reservations (library_card_number, slot)')
+
+
+def _add_computers(conn: sqlite3.Connection):
+    """
+    Version 3: adds a `computers` inventory and keys reservations by (slot, computer_id),
+    so each hour can be booked once per computer. Existing bookings move to computer 1.
+    """
+    conn.execute('''
+        CREATE TABLE computers (
+            computer_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            in_service INTEGER NOT NULL DEFAULT 1
+        )
+    ''')
+    conn.execute("INSERT INTO computers (computer_id, name) VALUES (1, 'Computer 1')")
+    conn.execute('''
+        CREATE TABLE reservations_v3 (
+            slot INTEGER NOT NULL,
+            computer_id INTEGER NOT NULL,
+            library_card_number TEXT,
+            PRIMARY KEY (slot, computer_id),
+            FOREIGN KEY(computer_id) REFERENCES computers(computer_id),
+            FOREIGN KEY(library_card_number) REFERENCES all_members(library_card_number)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        INSERT INTO reservations_v3 (slot, computer_id, library_card_number)
+        SELECT slot, 1, library_card_number FROM reservations
+    ''')
+    conn.execute('DROP TABLE reservations')
+    conn.execute('ALTER TABLE reservations_v3 RENAME TO reservations')
+    # one computer per patron per hour; also serves as the card number index
+    conn.execute('CREATE UNIQUE INDEX idx_reservations_card ON reservations (library_card_number, slot)')
+
+
+def _add_series(conn: sqlite3.Connection):
+    """
+    Version 4: adds recurring reservations. A `reservation_series` row holds the rule,
+    and each booked occurrence is a reservation carrying its `series_id`. Deleting a
+    series cancels its upcoming occurrences; past ones are left for the sweeper.
+    """
+    # AUTOINCREMENT so a new series never reuses the id still on a cancelled series' past occurrences
+    conn.execute('''
+        CREATE TABLE reservation_series (
+            series_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            library_card_number TEXT NOT NULL,
+            first_slot INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            interval_days INTEGER NOT NULL DEFAULT 7,
+            FOREIGN KEY(library_card_number) REFERENCES all_members(library_card_number)
+        )
+    ''')
+    conn.execute('CREATE INDEX idx_series_card ON reservation_series (library_card_number)')
+    conn.execute('ALTER TABLE reservations ADD COLUMN series_id INTEGER')
+    conn.execute('CREATE INDEX idx_reservations_series ON reservations (series_id, slot) WHERE series_id IS NOT NULL')
+    conn.execute('''
+        CREATE TRIGGER series_cancelled AFTER DELETE ON reservation_series
+        BEGIN
+            DELETE FROM reservations
+            WHERE series_id = OLD.series_id AND slot >= CAST(strftime('%s', 'now', 'localtime') AS INTEGER);
+        END
+    ''')
+
+
+def _add_history(conn: sqlite3.Connection):
+    """
+    Version 5: adds `reservation_history`, where expired reservations are archived
+    instead of deleted. Rows are only ever appended.
+    """
+    conn.execute('''
+        CREATE TABLE reservation_history (
+            slot INTEGER NOT NULL,
+            computer_id INTEGER NOT NULL,
+            library_card_number TEXT,
+            series_id INTEGER,
+            PRIMARY KEY (slot, computer_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX idx_history_card ON reservation_history (library_card_number, slot)')
+    for action in ('UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER history_no_{action.lower()} BEFORE {action} ON reservation_history
+            BEGIN
+                SELECT RAISE(ABORT, 'reservation history is append-only');
+            END
+        ''')
+
+
+def _add_occupancy(conn: sqlite3.Connection):
+    """
+    Version 6: adds running totals of bookings and cancellations per (day, hour) and per
+    (weekday, hour), kept up to date by triggers in the same transaction as every insert
+    into and delete from `reservations`, so utilization reports never scan reservations.
+    Deleting a reservation counts as a cancellation only while its slot is still ahead;
+    expiring or archiving past reservations leaves the totals alone. Existing and archived
+    reservations are counted as bookings.
+    """
+    conn.execute('''
+        CREATE TABLE occupancy (
+            day INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            bookings INTEGER NOT NULL DEFAULT 0,
+            cancellations INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, hour)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE occupancy_weekday (
+            weekday INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            bookings INTEGER NOT NULL DEFAULT 0,
+            cancellations INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (weekday, hour)
+        ) WITHOUT ROWID
+    ''')
+    # day 0, 1970-01-01, was a Thursday, so (day + 3) % 7 numbers weekdays from Monday = 0
+    for table, key in (('occupancy', 'day'), ('occupancy_weekday', 'weekday')):
+        bucket = {'day': '{0}.slot / 86400', 'weekday': '({0}.slot / 86400 + 3) % 7'}[key]
+        conn.execute(f'''
+            CREATE TRIGGER {table}_booked AFTER INSERT ON reservations
+            BEGIN
+                INSERT INTO {table} ({key}, hour, bookings)
+                VALUES ({bucket.format('NEW')}, NEW.slot % 86400 / 3600, 1)
+                ON CONFLICT ({key}, hour) DO UPDATE SET bookings = bookings + 1;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER {table}_cancelled AFTER DELETE ON reservations
+            WHEN OLD.slot >= CAST(strftime('%s', 'now', 'localtime') AS INTEGER)
+            BEGIN
+                INSERT INTO {table} ({key}, hour, cancellations)
+                VALUES ({bucket.format('OLD')}, OLD.slot % 86400 / 3600, 1)
+                ON CONFLICT ({key}, hour) DO UPDATE SET cancellations = cancellations + 1;
+            END
+        ''')
+        conn.execute(f'''
+            INSERT INTO {table} ({key}, hour, bookings)
+            SELECT {bucket.format('r')}, r.slot % 86400 / 3600, COUNT(*)
+            FROM (SELECT slot FROM reservations UNION ALL SELECT slot FROM reservation_history) r
+            GROUP BY 1, 2
+        ''')
+
+
+# Ordered list of migrations; migration N brings the database to user_version N.
+# Never edit or reorder an entry once released, only append new ones.
+MIGRATIONS = [
+    _create_initial_tables,
+    _use_epoch_slots,
+    _add_computers,
+    _add_series,
+    _add_history,
+    _add_occupancy,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Brings the database schema up to date, applying each pending migration
+    in its own transaction and recording progress in `PRAGMA user_version`.
+
+    Args:
+        conn (sqlite3.Connection): The connection to migrate.
+
+    Returns:
+        int: The schema version of the database after migrating.
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return version
+    if conn.in_transaction:
+        conn.commit()
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # another process may have migrated while we waited for the lock
+            current = conn.execute('PRAGMA user_version').fetchone()[0]
+            if current < number:
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return SCHEMA_VERSION
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    """
+    Migrates the database the first time a pooled connection is used, and
+    does nothing afterwards, so the schema check costs one `PRAGMA user_version`
+    per connection instead of one per ComputerReservation. Connections are
+    remembered rather than file names, so an in-memory or recreated database
+    is still set up.
+
+    Args:
+        conn (sqlite3.Connection): The connection about to be used.
+    """
+    if getattr(conn, 'schema_version', None) == SCHEMA_VERSION:
+        return
+    migrate(conn)
+    try:
+        conn.schema_version = SCHEMA_VERSION
+    except AttributeError:
+        # plain sqlite3 connections can't carry the flag; they are checked every time
+        pass
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from timeslot import DAY, format_slot, parse_slot
+
+
+@dataclass(frozen=True)
+class SeriesRule:
+    """
+    A recurring reservation, such as every Tuesday 14:00 for 12 weeks, kept as
+    a rule instead of a list of slots. Occurrences are computed from the rule
+    only for the range that is asked for.
+
+    Attributes:
+        first_slot (int): The first occurrence, in seconds since 1970-01-01 00:00 local time.
+        count (int): How many occurrences there are.
+        interval_days (int): Days between occurrences (default: 7, weekly).
+    """
+    first_slot: int
+    count: int
+    interval_days: int = 7
+
+    @classmethod
+    def weekly(cls, time_slot: str, weeks: int) -> "SeriesRule":
+        """
+        Makes a rule for the same hour on the same weekday every week.
+
+        Args:
+            time_slot (str): The first occurrence in 'MM/DD/YY HH:00' format.
+            weeks (int): How many weeks in a row.
+
+        Returns:
+            SeriesRule: The rule.
+
+        Raises:
+            ValueError: If the time slot can't be read or `weeks` is less than 1.
+        """
+        if weeks < 1:
+            raise ValueError("A series needs at least one occurrence.")
+        return cls(parse_slot(time_slot), weeks)
+
+    @property
+    def interval(self) -> int:
+        """Seconds between occurrences."""
+        return self.interval_days * DAY
+
+    @property
+    def last_slot(self) -> int:
+        """The last occurrence."""
+        return self.first_slot + (self.count - 1) * self.interval
+
+    def occurrences(self, start: int = None, end: int = None):
+        """
+        Generates the occurrences from `start` (inclusive) up to `end` (exclusive),
+        jumping straight to the first one in range.
+
+        Args:
+            start (int, optional): Seconds since 1970-01-01 00:00 local time (default: from the first occurrence).
+            end (int, optional): Seconds since 1970-01-01 00:00 local time (default: through the last occurrence).
+
+        Yields:
+            int: Occurrences in chronological order.
+        """
+        n = 0
+        if start is not None and start > self.first_slot:
+            n = -(-(start - self.first_slot) // self.interval)
+        while n < self.count:
+            slot = self.first_slot + n * self.interval
+            if end is not None and slot >= end:
+                return
+            yield slot
+            n += 1
+
+    def time_slots(self, start: int = None, end: int = None):
+        """
+        Generates the occurrences like `occurrences`, in 'MM/DD/YY HH:00' format.
+        """
+        for slot in self.occurrences(start, end):
+            yield format_slot(slot)
@@ -0,0 +1,354 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+import auth
+from branches import use_branch
+from db import get_connection, transaction
+from reservation import ComputerReservation
+from sweeper import ReservationSweeper
+from user import User
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8420
+
+# Exceptions the reservation classes raise for bad requests, and the status each is
+# answered with. The client raises the same exception type again.
+ERROR_STATUS = {
+    "TypeError": 400,
+    "ValueError": 400,
+    "KeyError": 400,
+    "IndexError": 409,
+    "QuotaExceededError": 409,
+    "PermissionError": 401,
+    "DatabaseBusyError": 503,
+}
+
+
+class ReservationService:
+    """
+    A local JSON-over-HTTP service that owns the database for every kiosk, so
+    the kiosks no longer compete for SQLite's write lock from separate processes.
+
+    Reads run on a pool of reader threads, each with its own pooled connection.
+    Writes are queued to a single writer thread, which takes everything queued
+    while it was busy and runs it as one transaction with a savepoint per
+    request (group commit): a refused request only rolls back its own savepoint,
+    and the whole group shares one commit.
+
+    Endpoints (the session token from /login goes in an `Authorization: Bearer` header):
+    - POST /login {library_card_number, pin} -> {token, library_card_number}
+    - POST /logout
+    - GET /availability?start=YYYY-MM-DD&end=YYYY-MM-DD -> {availability: {date: mask}}
+    - GET /reservations[?after=MM/DD/YY HH:00&limit=N] -> {reservations: [[time slot, computer id], ...]}
+    - POST /reserve {time_slot} -> {status, time_slot, computer_id}
+    - POST /cancel {time_slot}
+    - POST /series {time_slot, weeks} -> {series_id, applied: {time slot: computer id}, conflicts: {time slot: reason}}
+    - POST /cancel_series {series_id} -> {cancelled}
+    - GET /stats -> {writes, commits}
+    """
+
+    def __init__(self, database: str = None, readers: int = 4, max_batch: int = 64):
+        """
+        Initializes a ReservationService instance.
+
+        Args:
+            database (str, optional): The database file (default: `ComputerReservation.database`).
+            readers (int, optional): Reader threads (default: 4).
+            max_batch (int, optional): Most writes committed together (default: 64).
+        """
+        self.database = database
+        self.max_batch = max_batch
+        self.writes = 0
+        self.commits = 0
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._queue = None
+        self._server = None
+        self._writer_task = None
+        self._loop = None
+        self._thread = None
+        self._clients = set()
+        self.routes = {
+            ("POST", "/login"): self.login,
+            ("POST", "/logout"): self.logout,
+            ("GET", "/availability"): self.availability,
+            ("GET", "/reservations"): self.reservations,
+            ("POST", "/reserve"): self.reserve,
+            ("POST", "/cancel"): self.cancel,
+            ("POST", "/series"): self.reserve_series,
+            ("POST", "/cancel_series"): self.cancel_series,
+            ("GET", "/stats"): self.stats,
+        }
+
+    async def read(self, fn, *args):
+        """
+        Runs `fn(*args)` on a reader thread.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._readers, fn, *args)
+
+    async def write(self, fn, *args):
+        """
+        Queues `fn(*args)` for the writer thread and waits for its group to commit.
+
+        Returns:
+            The return value of `fn`.
+
+        Raises:
+            Exception: Whatever `fn` raised, or the error that stopped the group committing.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((fn, args, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            outcomes = await loop.run_in_executor(self._writer, self._commit_group, batch)
+            for (_, _, future), (result, error) in zip(batch, outcomes):
+                if future.cancelled():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def _commit_group(self, batch: list) -> list:
+        # runs on the writer thread; every write in the batch shares one transaction
+        conn = get_connection(ComputerReservation.database)
+        outcomes = []
+        try:
+            with transaction(conn):
+                for fn, args, _ in batch:
+                    try:
+                        with transaction(conn):
+                            outcomes.append((fn(*args), None))
+                    except Exception as e:
+                        outcomes.append((None, e))
+        except sqlite3.Error as e:
+            # the commit itself failed, so nothing in the group was written,
+            # including what the writes already put in the reservation cache
+            ComputerReservation.cache.invalidate(ComputerReservation.database)
+            return [(None, e)] * len(batch)
+        self.writes += len(batch)
+        self.commits += 1
+        return outcomes
+
+    async def _user(self, token: str) -> User:
+        return await self.read(User.from_session, token)
+
+    async def login(self, params: dict, token: str) -> dict:
+        user = await self.read(User.login, params["library_card_number"], params["pin"])
+        return {"token": user.session.token, "library_card_number": user.library_card_number}
+
+    async def logout(self, params: dict, token: str) -> dict:
+        auth.sessions.revoke(token)
+        return {}
+
+    async def availability(self, params: dict, token: str) -> dict:
+        start, end = date.fromisoformat(params["start"]), date.fromisoformat(params["end"])
+        availability = await self.read(ComputerReservation(None, None).availability, start, end)
+        return {"availability": {day.isoformat(): mask for day, mask in availability.items()}}
+
+    async def reservations(self, params: dict, token: str) -> dict:
+        user = await self._user(token)
+        if "limit" not in params:
+            return {"reservations": await self.read(user.list_reservations)}
+        limit = int(params["limit"])
+        page = await self.read(lambda: list(islice(user.iter_reservations(params.get("after"), limit), limit)))
+        return {"reservations": page}
+
+    async def reserve(self, params: dict, token: str) -> dict:
+        user = await self._user(token)
+        result = await self.write(user.reservation.reserve_computer, params["time_slot"])
+        return {"status": result.status.name, "time_slot": result.time_slot, "computer_id": result.computer_id}
+
+    async def cancel(self, params: dict, token: str) -> dict:
+        user = await self._user(token)
+        await self.write(user.reservation.cancel_reservation, params["time_slot"])
+        return {}
+
+    async def reserve_series(self, params: dict, token: str) -> dict:
+        user = await self._user(token)
+        report = await self.write(user.reservation.reserve_series, params["time_slot"], int(params["weeks"]))
+        return {"series_id": report.series_id, "applied": report.applied, "conflicts": report.conflicts}
+
+    async def cancel_series(self, params: dict, token: str) -> dict:
+        user = await self._user(token)
+        return {"cancelled": await self.write(user.reservation.cancel_series, int(params["series_id"]))}
+
+    async def stats(self, params: dict, token: str) -> dict:
+        return {"writes": self.writes, "commits": self.commits}
+
+    async def dispatch(self, method: str, target: str, headers: dict, body: bytes):
+        """
+        Routes one request to its handler.
+
+        Returns:
+            tuple: (HTTP status, JSON-serializable payload).
+        """
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            return 404, {"error": "NotFound", "message": f"No such endpoint: {method} {url.path}"}
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+        try:
+            params = json.loads(body) if body else {}
+            params.update({name: values[-1] for name, values in parse_qs(url.query).items()})
+            return 200, await handler(params, token)
+        except Exception as e:
+            name = type(e).__name__
+            if name in ERROR_STATUS:
+                message = f"Missing field {e}" if isinstance(e, KeyError) else str(e)
+                return ERROR_STATUS[name], {"error": name, "message": message}
+            print(f"Request {method} {url.path} failed: {e}")
+            return 500, {"error": "ServiceError", "message": str(e)}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # HTTP/1.1 with keep-alive, just enough for the client and the load generator
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, headers, body)
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                        "Content-Type: application/json",
+                        f"Content-Length: {len(data)}"]
+                if not keep_alive:
+                    head.append("Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> str:
+        """
+        Starts listening on the running event loop.
+
+        Args:
+            host (str, optional): The interface to listen on (default: '127.0.0.1').
+            port (int, optional): The port, 0 for any free one (default: 8420).
+
+        Returns:
+            str: The service URL, e.g. 'http://127.0.0.1:8420'.
+        """
+        if self.database is not None:
+            ComputerReservation.database = self.database
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(self._handle, host, port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def close(self):
+        """
+        Stops listening and waits for the worker threads to finish.
+        """
+        self._server.close()
+        # idle keep-alive connections would otherwise hold the server open
+        clients = list(self._clients)
+        for task in clients:
+            task.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+        await self._server.wait_closed()
+        self._writer_task.cancel()
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+
+    def start_in_thread(self, host: str = DEFAULT_HOST, port: int = 0) -> str:
+        """
+        Runs the service on its own event loop in a background thread, e.g. for tests
+        or the load generator.
+
+        Returns:
+            str: The service URL.
+        """
+        started = threading.Event()
+        url = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            url.append(self._loop.run_until_complete(self.start(host, port)))
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="reservation-service", daemon=True)
+        self._thread.start()
+        started.wait()
+        return url[0]
+
+    def stop_thread(self):
+        """
+        Stops a service started with `start_in_thread`.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+
+async def serve(service: ReservationService, host: str, port: int):
+    url = await service.start(host, port)
+    print(f"Reservation service listening on {url}", flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve computer reservations to the kiosks over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--database", help="database file (default: LibraryMembers.db)")
+    parser.add_argument("--members", help="member database shared by several branches (default: the database file)")
+    parser.add_argument("--readers", type=int, default=4, help="reader threads")
+    parser.add_argument("--max-batch", type=int, default=64, help="most writes per group commit")
+    parser.add_argument("--no-sweep", action="store_true", help="don't expire past reservations")
+    parser.add_argument("--archive", action="store_true", help="archive past reservations instead of deleting them")
+    args = parser.parse_args()
+
+    if args.members:
+        use_branch(args.database or ComputerReservation.database, args.members)
+    service = ReservationService(args.database, args.readers, args.max_batch)
+    sweeper = ReservationSweeper(args.database, archive=args.archive)
+    if not args.no_sweep:
+        sweeper.start()
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sweeper.stop()
+
+
+if __name__ == "__main__":
+    main()
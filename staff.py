@@ -0,0 +1,27 @@
+import argparse
+import sys
+from datetime import datetime, timedelta
+from reservation import ComputerReservation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List every patron's computer reservations for a day or a week.")
+    parser.add_argument("date", help="first day, MM/DD/YY")
+    parser.add_argument("--days", type=int, default=1, help="number of days to list (7 for a week)")
+    parser.add_argument("--database", help="database file (default: LibraryMembers.db)")
+    args = parser.parse_args()
+
+    if args.database:
+        ComputerReservation.database = args.database
+    start = datetime.strptime(args.date, "%m/%d/%y")
+    res = ComputerReservation(None, None)
+    count = 0
+    # rows are streamed page by page, so even a busy week prints right away in constant memory
+    for time_slot, computer_id, library_card_number in res.iter_reservations_between(start, start + timedelta(days=args.days)):
+        sys.stdout.write(f"{time_slot}  computer {computer_id:<3} {library_card_number}\n")
+        count += 1
+    print(f"{count} reservation(s)")
+
+
+if __name__ == "__main__":
+    main()
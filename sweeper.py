@@ -0,0 +1,162 @@
+import argparse
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from archive import ArchiveResult, ReservationArchiver
+from db import get_connection
+from reservation import ComputerReservation
+from schema import ensure_schema
+from timeslot import format_slot, to_epoch
+
+
+@dataclass
+class SweepResult:
+    """
+    What one sweep removed and how long it took.
+
+    Attributes:
+        started (datetime): When the sweep ran.
+        removed (list): (time slot, computer id, library card number) of each expired reservation.
+            Empty when archiving.
+        duration (float): Seconds the sweep took.
+        archived (ArchiveResult): What was moved to the history table, when archiving.
+    """
+    started: datetime
+    removed: list = field(default_factory=list)
+    duration: float = 0.0
+    archived: Optional[ArchiveResult] = None
+
+
+class ReservationSweeper:
+    """
+    Expires past reservations on a timer, instead of scanning for them on every screen render.
+
+    Reservations are clustered by slot, so the next one to expire is the first
+    entry of the primary key. Each sweep looks at that entry only, and deletes
+    with a range delete only when something has actually expired. With
+    `archive` set, expired reservations are moved to the history table in
+    chunks by a ReservationArchiver instead of being deleted.
+    """
+
+    def __init__(self, database: str = None, interval: float = 300.0, history: int = 100,
+                 archive: bool = False, chunk_size: int = 500):
+        """
+        Initializes a ReservationSweeper instance.
+
+        Args:
+            database (str, optional): The database file (default: `ComputerReservation.database`).
+            interval (float, optional): Seconds between sweeps when started (default: 300).
+            history (int, optional): How many past sweep results to keep (default: 100).
+            archive (bool, optional): Move expired reservations to the history table instead of deleting them (default: False).
+            chunk_size (int, optional): Most reservations archived per transaction (default: 500).
+        """
+        self.database = database
+        self.interval = interval
+        self.archiver = ReservationArchiver(database, chunk_size) if archive else None
+        self.history = deque(maxlen=history)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get_db(self):
+        """
+        Returns the calling thread's pooled connection to the swept database.
+
+        Returns:
+            sqlite3.Connection: A connection object for the SQLite database.
+        """
+        conn = get_connection(self.database or ComputerReservation.database)
+        ensure_schema(conn)
+        return conn
+
+    def next_expiry(self) -> Optional[int]:
+        """
+        Finds the earliest reserved slot, which is the next reservation to expire.
+
+        Returns:
+            int or None: The slot as seconds since 1970-01-01 00:00 local time, or None if there are no reservations.
+        """
+        return self.get_db().execute("SELECT MIN(slot) FROM reservations").fetchone()[0]
+
+    def run_once(self) -> SweepResult:
+        """
+        Removes or archives every reservation whose time slot has passed.
+
+        Returns:
+            SweepResult: The reservations removed, or what was archived, and the time taken.
+        """
+        result = SweepResult(started=ComputerReservation.clock())
+        begin = time.perf_counter()
+        now = to_epoch(result.started)
+        next_expiry = self.next_expiry()
+        if next_expiry is not None and next_expiry < now and self.archiver is not None:
+            result.archived = self.archiver.run_once(result.started)
+        elif next_expiry is not None and next_expiry < now:
+            with self.get_db() as conn:
+                rows = conn.execute("DELETE FROM reservations WHERE slot < ? RETURNING slot, computer_id, library_card_number",
+                                    (now,)).fetchall()
+            result.removed = [(format_slot(slot), computer_id, library_card_number)
+                              for slot, computer_id, library_card_number in sorted(rows)]
+        result.duration = time.perf_counter() - begin
+        self.history.append(result)
+        return result
+
+    def start(self):
+        """
+        Starts sweeping every `interval` seconds on a background thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reservation-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread after its current sweep.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                # a locked database just means trying again next time
+                print(f"Failed to sweep reservations: {e}")
+            self._stop.wait(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expire past computer reservations.")
+    parser.add_argument("--database", help="database file (default: LibraryMembers.db)")
+    parser.add_argument("--interval", type=float, default=300.0, help="seconds between sweeps")
+    parser.add_argument("--once", action="store_true", help="sweep once and exit")
+    parser.add_argument("--archive", action="store_true", help="move expired reservations to the history table instead of deleting them")
+    parser.add_argument("--chunk-size", type=int, default=500, help="most reservations archived per transaction")
+    args = parser.parse_args()
+
+    sweeper = ReservationSweeper(args.database, args.interval, archive=args.archive, chunk_size=args.chunk_size)
+    while True:
+        result = sweeper.run_once()
+        archived = result.archived
+        if archived is not None:
+            print(f"{result.started:%m/%d/%y %H:%M:%S} archived {archived.archived} reservation(s) in "
+                  f"{archived.chunks} chunk(s), {archived.rows_per_sec:.0f} rows/s, "
+                  f"longest lock hold {archived.longest_hold * 1000:.1f} ms")
+        else:
+            print(f"{result.started:%m/%d/%y %H:%M:%S} removed {len(result.removed)} reservation(s) in {result.duration * 1000:.1f} ms")
+            for time_slot, computer_id, library_card_number in result.removed:
+                print(f"  {time_slot} computer {computer_id} {library_card_number}")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+import pytest
+from auth import hash_pin
+from db import manager, memory_database
+from reservation import ComputerReservation
+
+# members every test database can be seeded with, all with the PIN "0000"
+MEMBERS = [person * 14 for person in "01234"]
+
+
+def pytest_addoption(parser):
+    parser.addoption("--db-target", choices=["file", "memory"], default="file",
+                     help="give each test a temporary database file or a private in-memory database")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "on_disk: the test needs a database file even with --db-target=memory")
+
+
+class FakeClock:
+    """
+    Stands in for `ComputerReservation.clock`: the time only moves when `advance` is called.
+    """
+
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, **kwargs):
+        """
+        Moves the clock forward by a `timedelta(**kwargs)`.
+        """
+        self.now += timedelta(**kwargs)
+
+
+@pytest.fixture
+def database(request, tmp_path, monkeypatch):
+    """
+    Points ComputerReservation at a fresh database for one test, a file in the test's
+    own temporary directory or, with --db-target=memory, a private in-memory database,
+    and returns its path or URI.
+    """
+    if request.config.getoption("--db-target") == "memory" and request.node.get_closest_marker("on_disk") is None:
+        path = memory_database()
+    else:
+        path = str(tmp_path / "test.db")
+    monkeypatch.setattr(ComputerReservation, "database", path)
+    yield path
+    # also drops an in-memory database
+    manager.close_path(path)
+
+
+@pytest.fixture
+def reservation_db(database):
+    """
+    Returns a factory that registers a member in the test's database and hands back
+    their ComputerReservation.
+    """
+    def member(library_card_number: str, pin: str = "x") -> ComputerReservation:
+        res = ComputerReservation(library_card_number, pin)
+        if not res.user_exists():
+            res.add_self()
+        return res
+
+    return member
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Freezes ComputerReservation's clock at 12/01/24 09:00, a Sunday.
+    """
+    fake = FakeClock(datetime(2024, 12, 1, 9, 0))
+    monkeypatch.setattr(ComputerReservation, "clock", fake)
+    return fake
+
+
+@pytest.fixture(scope="session")
+def pin_hash():
+    # hashing is deliberately slow, so every test shares one hash of "0000"
+    return hash_pin("0000")
+
+
+@pytest.fixture
+def members(database, pin_hash):
+    """
+    Seeds the test's database with the MEMBERS and returns their library card numbers.
+    """
+    with ComputerReservation.get_db() as conn:
+        conn.executemany("INSERT INTO all_members (library_card_number, pin) VALUES (?, ?)",
+                         [(member, pin_hash) for member in MEMBERS])
+    return MEMBERS
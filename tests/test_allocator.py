@@ -0,0 +1,26 @@
+import pytest
+# running "python -m pytest tests" in the terminal works
+
+SLOT = "01/02/30 10:00"
+
+def test_allocate_fills_every_computer(reservation_db):
+    # each patron gets the next free computer until none are left
+    staff = reservation_db("staff")
+    staff.add_computer("Computer 2")
+    staff.add_computer("Computer 3")
+    seats = [reservation_db(str(n)).allocate_computer(SLOT) for n in range(4)]
+    assert seats == [1, 2, 3, None]
+
+def test_reserve_fully_booked(reservation_db):
+    # reserving when every computer is taken raises an index error
+    reservation_db("a").reserve_computer(SLOT)
+    with pytest.raises(IndexError):
+        reservation_db("b").reserve_computer(SLOT)
+
+def test_one_computer_per_patron(reservation_db):
+    # a patron can't hold two computers in the same hour
+    res = reservation_db("a")
+    res.add_computer("Computer 2")
+    res.reserve_computer(SLOT)
+    with pytest.raises(IndexError):
+        res.reserve_computer(SLOT)
@@ -0,0 +1,57 @@
+import sqlite3
+from datetime import datetime
+import pytest
+from archive import ReservationArchiver
+from reservation import ComputerReservation
+from sweeper import ReservationSweeper
+from timeslot import parse_slot
+# running "python -m pytest tests" in the terminal works
+
+PAST = ["11/29/20 10:00", "11/29/20 11:00", "11/29/20 12:00", "11/30/20 10:00", "11/30/20 11:00"]
+HISTORY = (datetime(2020, 1, 1), datetime(2021, 1, 1))
+
+def add_reservations(time_slots, library_card_number):
+    # bypasses reserve_computer(), which refuses past slots
+    conn = sqlite3.connect(ComputerReservation.database, uri=True)
+    conn.executemany("INSERT INTO reservations (slot, computer_id, library_card_number) VALUES (?, 1, ?)",
+                     [(parse_slot(time_slot), library_card_number) for time_slot in time_slots])
+    conn.commit()
+    conn.close()
+
+def test_archive_in_chunks(reservation_db):
+    # expired reservations move to the history table a chunk at a time, upcoming ones stay
+    res = reservation_db("a")
+    add_reservations(PAST, "a")
+    res.reserve_computer("01/02/30 10:00")
+    result = ReservationArchiver(chunk_size=2).run_once()
+    assert (result.archived, result.chunks) == (5, 3)
+    assert result.longest_hold > 0
+    assert res.reservations_between(*HISTORY) == []
+    assert res.held_slots() == {parse_slot("01/02/30 10:00"): 1}
+    history = list(ReservationArchiver().iter_history(*HISTORY, library_card_number="a", page_size=2))
+    assert history == [(slot, 1, "a") for slot in PAST]
+
+def test_archive_exact_chunks(reservation_db):
+    # a backlog that fills the last chunk exactly is still fully archived
+    reservation_db("a")
+    add_reservations(PAST[:4], "a")
+    assert ReservationArchiver(chunk_size=2).run_once().archived == 4
+    assert ReservationArchiver().run_once().archived == 0
+
+def test_history_is_append_only(reservation_db):
+    # archived rows can't be changed or deleted
+    reservation_db("a")
+    add_reservations(PAST[:1], "a")
+    ReservationArchiver().run_once()
+    conn = sqlite3.connect(ComputerReservation.database, uri=True)
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("DELETE FROM reservation_history")
+    conn.close()
+
+def test_sweeper_archives(reservation_db):
+    # in archive mode the sweeper moves expired reservations instead of deleting them
+    reservation_db("a")
+    add_reservations(PAST, "a")
+    result = ReservationSweeper(archive=True, chunk_size=2).run_once()
+    assert result.removed == [] and result.archived.archived == 5
+    assert len(list(ReservationArchiver().iter_history(*HISTORY))) == 5
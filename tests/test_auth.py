@@ -0,0 +1,50 @@
+import hashlib
+import pytest
+import auth
+from user import User
+# running "python -m pytest tests" in the terminal works
+
+def test_pin_hash_is_salted():
+    # the same PIN hashes differently every time but always verifies
+    first, second = auth.hash_pin("0000"), auth.hash_pin("0000")
+    assert first != second
+    assert auth.verify_pin("0000", first) and auth.verify_pin("0000", second)
+    assert not auth.verify_pin("0001", first)
+
+def test_legacy_hash_upgraded(reservation_db):
+    # unsalted SHA-256 PINs still log in and are rehashed with scrypt
+    legacy = hashlib.sha256(b"0000").hexdigest()
+    reservation_db("a", legacy)
+    user = User("a", "0000")
+    assert user.pin.startswith("scrypt$")
+    stored = user.reservation.get_db().execute("SELECT pin FROM all_members WHERE library_card_number = 'a'").fetchone()[0]
+    assert stored == user.pin
+
+def test_repeat_login_skips_hashing(reservation_db, monkeypatch):
+    # a cached verification doesn't hash the PIN again
+    User("a", "0000", 1)
+    scrypt = auth.hashlib.scrypt
+    monkeypatch.setattr(auth.hashlib, "scrypt", None)
+    assert User("a", "0000").validation == 0
+    monkeypatch.setattr(auth.hashlib, "scrypt", scrypt)
+    with pytest.raises(ValueError):
+        User("a", "1111")
+
+def test_session_round_trip(reservation_db):
+    # a session token resolves to the user until logout
+    User("a", "0000", 1)
+    user = User.login("a", "0000")
+    token = user.session.token
+    assert User.from_session(token).library_card_number == "a"
+    user.logout()
+    with pytest.raises(PermissionError):
+        User.from_session(token)
+
+def test_session_lru_eviction():
+    # the least recently used session is evicted first
+    store = auth.SessionStore(max_sessions=2)
+    first, second = store.create("a", "x"), store.create("b", "x")
+    store.resolve(first.token)
+    store.create("c", "x")
+    assert store.resolve(second.token) is None
+    assert store.resolve(first.token) is not None
@@ -0,0 +1,35 @@
+from datetime import date
+# running "python -m pytest tests" in the terminal works
+
+FRIDAY = date(2030, 1, 4)
+SATURDAY = date(2030, 1, 5)
+
+def test_open_hours_are_available(reservation_db):
+    # with no bookings every opening hour is free
+    res = reservation_db("a")
+    slots = res.available_slots(FRIDAY, SATURDAY)
+    assert slots == [f"01/04/30 {hour}:00" for hour in range(10, 18)]
+
+def test_fully_booked_hours_are_hidden(reservation_db):
+    # an hour drops out once every computer is taken
+    res = reservation_db("a")
+    res.add_computer("Computer 2")
+    reservation_db("b").reserve_computer("01/04/30 10:00")
+    assert "01/04/30 10:00" in res.available_slots(FRIDAY, SATURDAY)
+    reservation_db("c").reserve_computer("01/04/30 10:00")
+    assert "01/04/30 10:00" not in res.available_slots(FRIDAY, SATURDAY)
+
+def test_own_bookings_are_hidden(reservation_db):
+    # a patron can't book an hour they already hold
+    res = reservation_db("a")
+    res.add_computer("Computer 2")
+    res.reserve_computer("01/04/30 11:00")
+    assert "01/04/30 11:00" not in res.available_slots(FRIDAY, SATURDAY)
+
+def test_availability_bitmaps(reservation_db):
+    # closed days have an empty bitmap and past days are never available
+    res = reservation_db("a")
+    availability = res.availability(date(2030, 1, 6), date(2030, 1, 8))  # Sunday, Monday
+    assert availability[date(2030, 1, 6)] == 0
+    assert availability[date(2030, 1, 7)] != 0
+    assert res.availability(date(2020, 1, 6), date(2020, 1, 7))[date(2020, 1, 6)] == 0
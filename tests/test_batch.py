@@ -0,0 +1,44 @@
+from datetime import datetime
+# running "python -m pytest tests" in the terminal works
+
+SLOTS = ["01/02/30 10:00", "01/02/30 11:00", "01/02/30 12:00"]
+RANGE = (datetime(2030, 1, 1), datetime(2030, 1, 3))
+
+def test_reserve_many(reservation_db):
+    # every free slot is booked and the report lists each computer
+    res = reservation_db("a")
+    report = res.reserve_many(SLOTS)
+    assert report.ok
+    assert report.applied == {slot: 1 for slot in SLOTS}
+    assert len(res.reservations_between(*RANGE)) == 3
+
+def test_reserve_many_reports_conflicts(reservation_db):
+    # taken and closed slots are reported, the rest are still booked
+    reservation_db("b").reserve_computer(SLOTS[0])
+    report = reservation_db("a").reserve_many(SLOTS + ["01/06/30 10:00"])  # a Sunday
+    assert set(report.applied) == set(SLOTS[1:])
+    assert set(report.conflicts) == {SLOTS[0], "01/06/30 10:00"}
+
+def test_reserve_many_atomic(reservation_db):
+    # one conflict means nothing is booked
+    reservation_db("b").reserve_computer(SLOTS[0])
+    res = reservation_db("a")
+    report = res.reserve_many(SLOTS, atomic=True)
+    assert not report.committed and report.applied == {}
+    assert len(res.reservations_between(*RANGE)) == 1
+
+def test_cancel_many(reservation_db):
+    # held slots are cancelled, unknown ones are reported
+    res = reservation_db("a")
+    res.reserve_many(SLOTS[:2])
+    report = res.cancel_many(SLOTS)
+    assert set(report.applied) == set(SLOTS[:2])
+    assert set(report.conflicts) == {SLOTS[2]}
+    assert res.reservations_between(*RANGE) == []
+
+def test_cancel_many_atomic(reservation_db):
+    # one missing reservation means nothing is cancelled
+    res = reservation_db("a")
+    res.reserve_many(SLOTS[:2])
+    assert not res.cancel_many(SLOTS, atomic=True).committed
+    assert len(res.reservations_between(*RANGE)) == 2
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import time
+from reservation import ComputerReservation
+from user import User
+# running "python -m pytest tests" in the terminal works
+
+def test_construction_runs_no_sql(reservation_db):
+    # after the first use, constructing ComputerReservation and User touches no SQL at all
+    User("a", "1234", testing=1)
+    conn = ComputerReservation.get_db()
+    seen = []
+    conn.set_trace_callback(seen.append)
+    ComputerReservation("a", None)
+    User("a", "1234")  # a cached PIN check
+    conn.set_trace_callback(None)
+    assert seen == []
+
+def test_construction_time(reservation_db):
+    # constructing a ComputerReservation is cheap enough to do per request
+    ComputerReservation(None, None).get_db()
+    start = time.perf_counter()
+    for _ in range(10000):
+        ComputerReservation("a", None)
+    per_construction = (time.perf_counter() - start) / 10000
+    print(f"ComputerReservation(): {per_construction * 1e6:.2f} us")
+    assert per_construction < 50e-6
+
+def test_new_database_is_set_up(reservation_db):
+    # the first query on a new database still finds every table
+    assert ComputerReservation("a", None).computer_count() == 1
+
+def test_gui_startup_skips_calendar():
+    # importing the GUI doesn't load tkcalendar, which only the reserve screen needs
+    code = ("import sys, time; start = time.perf_counter(); import gui; "
+            "print(time.perf_counter() - start); sys.exit('tkcalendar' in sys.modules)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=root)
+    assert result.returncode == 0, result.stderr
+    print(f"import gui: {float(result.stdout) * 1000:.1f} ms")
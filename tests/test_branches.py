@@ -0,0 +1,47 @@
+import pytest
+from branches import BranchNetwork, use_branch
+from reservation import ComputerReservation
+from user import User
+# running "python -m pytest tests" in the terminal works
+
+SLOT = "01/02/30 10:00"
+
+@pytest.fixture
+def network(tmp_path, monkeypatch):
+    # two branches sharing one member database, with members "a" and "b"
+    members = str(tmp_path / "members.db")
+    monkeypatch.setattr(ComputerReservation, "database", members)
+    for card in ("a", "b"):
+        User(card, "1234", testing=1)
+    network = BranchNetwork({"main": str(tmp_path / "main.db"), "east": str(tmp_path / "east.db")}, members)
+    yield network
+    network.close()
+
+def test_reservations_at_every_branch(network):
+    # one patron's bookings at both branches come back merged in time order
+    network.reservation("east", "a").reserve_computer("01/02/30 11:00")
+    network.reservation("main", "a").reserve_computer(SLOT)
+    assert network.reservations("a") == [(SLOT, "main", 1), ("01/02/30 11:00", "east", 1)]
+    assert network.reservations("b") == []
+
+def test_first_free_skips_full_branches(network):
+    # the preferred branch is used until it is full
+    assert network.first_free(SLOT) == ("main", 1)
+    network.reservation("main", "b").reserve_computer(SLOT)
+    assert network.first_free(SLOT) == ("east", 1)
+    assert network.reserve_anywhere("a", SLOT)[0] == "east"
+    assert network.first_free(SLOT) is None
+    branch, result = network.reserve_anywhere("a", SLOT)
+    assert branch is None and not result.ok
+    with pytest.raises(TypeError):
+        network.reserve_anywhere("a", "01/06/30 10:00")  # a Sunday
+
+def test_kiosk_at_a_branch(network, monkeypatch):
+    # a kiosk logs patrons in against the shared members and books in its branch database
+    monkeypatch.setattr(ComputerReservation, "members_database", None)
+    use_branch(network.branches["east"], network.members)
+    user = User.login("a", "1234")
+    assert user.reservation.reserve_computer(SLOT).ok
+    assert network.reservations("a") == [(SLOT, "east", 1)]
+    with pytest.raises(ValueError):
+        User.login("a", "0000")
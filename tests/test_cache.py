@@ -0,0 +1,73 @@
+import sqlite3
+from datetime import date
+import pytest
+from cache import ReservationCache
+from reservation import ComputerReservation
+from timeslot import parse_slot
+# running "python -m pytest tests" in the terminal works
+
+SLOT = "01/02/30 10:00"
+
+@pytest.fixture
+def cache(monkeypatch):
+    # a fresh cache that never re-checks the database on its own
+    cache = ReservationCache(max_days=5, staleness=3600)
+    monkeypatch.setattr(ComputerReservation, "cache", cache)
+    return cache
+
+def statements(res, call):
+    # the SQL statements run by call() on the thread's connection
+    seen = []
+    conn = res.get_db()
+    conn.set_trace_callback(seen.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return seen
+
+def test_hits_skip_sqlite(cache, reservation_db):
+    # once loaded, a patron's reservations and the calendar are served from memory
+    res = reservation_db("a")
+    res.held_slots()
+    res.availability(date(2030, 1, 1), date(2030, 1, 4))
+    assert statements(res, res.held_slots) == []
+    assert statements(res, lambda: res.availability(date(2030, 1, 1), date(2030, 1, 4))) == []
+
+def test_write_through(cache, reservation_db):
+    # reserving and cancelling update the cached maps without reloading them
+    res = reservation_db("a")
+    res.held_slots()
+    res.availability(date(2030, 1, 2), date(2030, 1, 3))
+    res.reserve_computer(SLOT)
+    assert statements(res, res.held_slots) == []
+    assert res.held_slots() == {parse_slot(SLOT): 1}
+    assert not res.availability(date(2030, 1, 2), date(2030, 1, 3))[date(2030, 1, 2)] & 1 << 10
+    res.cancel_reservation(SLOT)
+    assert res.held_slots() == {}
+    assert res.availability(date(2030, 1, 2), date(2030, 1, 3))[date(2030, 1, 2)] & 1 << 10
+
+def test_cached_refusal(cache, reservation_db):
+    # a slot the patron already holds is refused from the cache, without a write
+    res = reservation_db("a")
+    res.reserve_computer(SLOT)
+    assert not any(sql.startswith("BEGIN") for sql in statements(res, lambda: res.try_reserve(SLOT)))
+
+def test_other_connection_invalidates(cache, reservation_db):
+    # a commit from another connection is noticed through data_version
+    res = reservation_db("a")
+    assert res.held_slots() == {}
+    other = sqlite3.connect(ComputerReservation.database, uri=True)
+    with other:
+        other.execute("INSERT INTO reservations (slot, computer_id, library_card_number) VALUES (?, 1, 'a')", (parse_slot(SLOT),))
+    other.close()
+    assert res.held_slots() == {}  # still within the staleness window
+    cache.staleness = 0
+    assert res.held_slots() == {parse_slot(SLOT): 1}
+
+def test_days_evicted(cache, reservation_db):
+    # no more than max_days days are kept
+    res = reservation_db("a")
+    res.availability(date(2030, 1, 1), date(2030, 1, 31))
+    state = cache._databases[ComputerReservation.database]
+    assert len(state.days) == 5
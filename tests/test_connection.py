@@ -0,0 +1,80 @@
+import gc
+import sqlite3
+import threading
+from db import ConnectionManager
+# running "python -m pytest tests" in the terminal works
+
+def test_connection_is_reused(tmp_path):
+    # the same thread gets the same connection back for the same database
+    manager = ConnectionManager()
+    path = str(tmp_path / "test.db")
+    assert manager.get(path) is manager.get(path)
+    manager.close_all()
+
+def test_connection_per_thread(tmp_path):
+    # every thread gets its own connection
+    manager = ConnectionManager()
+    path = str(tmp_path / "test.db")
+    other = []
+    thread = threading.Thread(target=lambda: other.append(manager.get(path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not manager.get(path)
+    manager.close_all()
+
+def test_connection_uses_wal(tmp_path):
+    # connections are opened in WAL mode
+    manager = ConnectionManager()
+    conn = manager.get(str(tmp_path / "test.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    manager.close_all()
+
+def test_close_reopens(tmp_path):
+    # closing hands out a fresh connection on the next call
+    manager = ConnectionManager()
+    path = str(tmp_path / "test.db")
+    first = manager.get(path)
+    manager.close()
+    assert manager.get(path) is not first
+    manager.close_all()
+
+def test_thread_exit_closes_connections(tmp_path):
+    # a finished thread's connection is closed instead of staying open until exit
+    manager = ConnectionManager()
+    path = str(tmp_path / "test.db")
+    opened = []
+    for _ in range(20):
+        thread = threading.Thread(target=lambda: opened.append(manager.get(path)))
+        thread.start()
+        thread.join()
+    gc.collect()
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    manager.close_all()
+
+def test_close_path_closes_every_thread(tmp_path):
+    # close_path() closes other threads' connections to the database, and only to that one
+    manager = ConnectionManager()
+    path, other = str(tmp_path / "test.db"), str(tmp_path / "other.db")
+    ready, done = threading.Event(), threading.Event()
+    opened = []
+
+    def worker():
+        opened.append(manager.get(path))
+        ready.set()
+        done.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    ready.wait()
+    mine, kept = manager.get(path), manager.get(other)
+    manager.close_path(path)
+    for conn in opened + [mine]:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert kept.execute("SELECT 1").fetchone() == (1,)
+    assert manager.get(path) is not mine
+    done.set()
+    thread.join()
+    manager.close_all()
@@ -1,28 +1,34 @@
 import pytest
 from user import User
-from initialize_users import initialize_users
 # running "python -m pytest tests" in the terminal works
 
-initialize_users()
-
-@pytest.mark.run(order=1)
-def test_user_not_in_database():
+def test_user_not_in_database(members):
     with pytest.raises(TypeError):
         # this user isn't in the database and should raise a type error
         person = User("01234550098374", "0000")
 
-@pytest.mark.run(order=2)
-def test_reserve_computer():
+def test_reserve_computer(members, clock):
     person = User("0"*14, "0000")
-    # WILL NOT WORK ONCE THIS DATE IS PASSED
+    # the clock is frozen on 12/01/24, so this date stays in the future
     reservation_date = "12/14/24 15:00"
     person.reservation.reserve_computer(reservation_date)
     assert person.list_reservations()[0][0] == "12/14/24 15:00"
 
-@pytest.mark.run(order=3)
-def test_cancel_reservation():
+def test_cancel_reservation(members, clock):
     person = User("0"*14, "0000")
-    # IF THE PREVIOUS TEST FAILED THEN THIS ONE WON'T WORK
+    # every test has its own database, so reserve before cancelling
     reservation_date = "12/14/24 15:00"
+    person.reservation.reserve_computer(reservation_date)
     person.reservation.cancel_reservation(reservation_date)
-    assert person.list_reservations() == []
\ No newline at end of file
+    assert person.list_reservations() == []
+
+def test_injected_database(members, clock, tmp_path):
+    # a user bound to another database neither sees nor touches the configured one
+    other = str(tmp_path / "other.db")
+    person = User("9"*14, "0000", testing=1, database=other)
+    person.reservation.reserve_computer("12/14/24 15:00")
+    assert person.reservation.database == other
+    assert person.list_reservations() == [("12/14/24 15:00", 1)]
+    with pytest.raises(TypeError):
+        User("9"*14, "0000")
+    assert User("0"*14, "0000").list_reservations() == []
@@ -0,0 +1,29 @@
+from auth import verify_pin
+from importer import import_members, read_csv
+from reservation import ComputerReservation
+# running "python -m pytest tests" in the terminal works
+
+def test_import_skips_duplicates(reservation_db):
+    # existing members are skipped in SQL, new ones are hashed and inserted
+    reservation_db("1")
+    report = import_members([("1", "0000"), ("2", "0000"), ("3", "1234")], batch_size=2, workers=1)
+    assert (report.read, report.inserted, report.skipped) == (3, 2, 1)
+    pin = ComputerReservation.get_db().execute("SELECT pin FROM all_members WHERE library_card_number = '3'").fetchone()[0]
+    assert verify_pin("1234", pin)
+
+def test_import_update(reservation_db):
+    # with update=True existing members get the new PIN
+    import_members([("1", "0000")], workers=1)
+    report = import_members([("1", "9999")], workers=1, update=True)
+    assert report.inserted == 1
+    pin = ComputerReservation.get_db().execute("SELECT pin FROM all_members WHERE library_card_number = '1'").fetchone()[0]
+    assert verify_pin("9999", pin)
+
+def test_import_csv_with_process_pool(reservation_db, tmp_path):
+    # a CSV with a header is streamed and hashed in worker processes
+    path = tmp_path / "members.csv"
+    path.write_text("library_card_number,pin\n" + "".join(f"{n:014d},0000\n" for n in range(20)))
+    progress = []
+    report = import_members(read_csv(str(path)), batch_size=8, workers=2, progress=progress.append)
+    assert report.inserted == 20
+    assert len(progress) == 3
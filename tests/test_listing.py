@@ -0,0 +1,52 @@
+from datetime import datetime
+from user import User
+# running "python -m pytest tests" in the terminal works
+
+DAY1 = [f"01/02/30 {hour}:00" for hour in range(10, 21)]
+
+def fill(reservation_db, computers=3):
+    # every computer booked all day on 01/02/30, each hour by a different patron
+    res = reservation_db("staff")
+    for n in range(2, computers + 1):
+        res.add_computer(f"Computer {n}")
+    for n in range(computers):
+        patron = reservation_db(f"p{n}")
+        patron.max_reservations = len(DAY1)
+        for time_slot in DAY1:
+            patron.reserve_computer(time_slot)
+    return res
+
+def test_range_pages_match_full_listing(reservation_db):
+    # any page size yields the same rows, in (slot, computer) order, within the range
+    res = fill(reservation_db)
+    start, end = datetime(2030, 1, 2, 12), datetime(2030, 1, 2, 15)
+    expected = [(f"01/02/30 {hour}:00", c, f"p{c - 1}") for hour in range(12, 15) for c in (1, 2, 3)]
+    for page_size in (1, 2, 4, 500):
+        assert list(res.iter_reservations_between(start, end, page_size)) == expected
+    assert res.reservations_between(start, end) == expected
+
+def test_range_is_lazy(reservation_db):
+    # the first row comes from the first page only
+    res = fill(reservation_db)
+    conn = res.get_db()
+    seen = []
+    conn.set_trace_callback(seen.append)
+    rows = res.iter_reservations_between(datetime(2030, 1, 1), datetime(2030, 1, 3), page_size=2)
+    assert next(rows) == ("01/02/30 10:00", 1, "p0")
+    conn.set_trace_callback(None)
+    assert len(seen) == 1
+
+def test_patron_pages(reservation_db):
+    # a patron's listing pages through their own reservations and can continue after a slot
+    fill(reservation_db)
+    res = reservation_db("p1")
+    held = [(time_slot, 2) for time_slot in DAY1]
+    assert list(res.iter_held(page_size=3)) == held
+    assert list(res.iter_held(after=DAY1[4], page_size=3)) == held[5:]
+
+def test_user_listing(reservation_db):
+    # User.iter_reservations streams what list_reservations returns
+    user = User("u", "1234", testing=1)
+    user.reservation.reserve_computer(DAY1[0])
+    user.reservation.reserve_computer(DAY1[1])
+    assert list(user.iter_reservations(page_size=1)) == user.list_reservations()
@@ -0,0 +1,59 @@
+import json
+import pytest
+import metrics
+from metrics import Histogram, format_report, instrumented
+# running "python -m pytest tests" in the terminal works
+
+@pytest.fixture
+def collecting(monkeypatch):
+    # collects from scratch for the duration of one test
+    metrics.registry.reset()
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    yield metrics.registry
+    metrics.registry.reset()
+
+def test_histogram_percentiles():
+    # percentiles come from the bucket bounds and never exceed the maximum
+    histogram = Histogram()
+    for _ in range(99):
+        histogram.record(0.001)
+    histogram.record(0.5)
+    assert histogram.count == 100
+    assert 0.001 <= histogram.percentile(50) < 0.002
+    assert histogram.percentile(100) == 0.5
+
+def test_disabled_records_nothing(reservation_db):
+    # with metrics off nothing is collected
+    metrics.registry.reset()
+    reservation_db("a").reserve_computer("01/02/30 10:00")
+    assert metrics.registry.snapshot() == {}
+
+def test_operations_and_statements(collecting, reservation_db):
+    # reserving and cancelling record the operation, its statements with rows touched, the lock wait and the commit
+    res = reservation_db("a")
+    res.reserve_computer("01/02/30 10:00")
+    res.cancel_reservation("01/02/30 10:00")
+    data = collecting.snapshot()
+    assert data["operation"]["reservation.reserve_computer"]["count"] == 1
+    assert data["lock_wait"]["BEGIN IMMEDIATE"]["count"] >= 1
+    assert data["commit"]["commit"]["count"] >= 1
+    assert any(name.startswith("DELETE FROM reservations") and h["rows"] == 1
+               for name, h in data["statement"].items())
+    assert "reservation.reserve_computer" in format_report(data)
+
+def test_errors_counted(collecting, reservation_db):
+    # exceptions raised by an operation are counted by type
+    res = reservation_db("a")
+    with pytest.raises(ValueError):
+        res.cancel_reservation("01/02/30 10:00")
+    assert collecting.snapshot()["error"]["reservation.cancel_reservation: ValueError"]["count"] == 1
+
+def test_dump_round_trip(collecting, tmp_path):
+    # a dump file can be read back by the report
+    @instrumented("test.op")
+    def op():
+        return 1
+    assert op() == 1
+    path = tmp_path / "metrics.json"
+    collecting.dump(str(path))
+    assert "test.op" in format_report(json.loads(path.read_text()))
@@ -0,0 +1,60 @@
+import threading
+from datetime import datetime
+import pytest
+from reservation import QuotaExceededError, ReserveStatus
+# running "python -m pytest tests" in the terminal works
+
+SLOTS = [f"01/02/30 {hour}:00" for hour in range(10, 18)]
+RANGE = (datetime(2030, 1, 1), datetime(2030, 1, 3))
+
+def run_in_parallel(calls):
+    # starts every call at once on its own thread (and so its own connection)
+    results = [None] * len(calls)
+    barrier = threading.Barrier(len(calls))
+
+    def run(i, call):
+        barrier.wait()
+        results[i] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_quota_enforced(reservation_db):
+    # the fourth upcoming reservation is refused
+    res = reservation_db("a")
+    res.add_computer("Computer 2")
+    for time_slot in SLOTS[:3]:
+        res.reserve_computer(time_slot)
+    assert res.try_reserve(SLOTS[3]).status is ReserveStatus.QUOTA_EXCEEDED
+    with pytest.raises(QuotaExceededError):
+        res.reserve_computer(SLOTS[3])
+
+def test_try_reserve_statuses(reservation_db):
+    # each refusal reports why
+    res = reservation_db("a")
+    assert res.try_reserve(SLOTS[0]).ok
+    assert res.try_reserve(SLOTS[0]).status is ReserveStatus.ALREADY_BOOKED
+    assert reservation_db("b").try_reserve(SLOTS[0]).status is ReserveStatus.FULLY_BOOKED
+
+def test_no_double_booking_under_parallel_writers(reservation_db):
+    # many patrons racing for one slot fill exactly the available computers
+    staff = reservation_db("staff")
+    for n in range(2, 5):
+        staff.add_computer(f"Computer {n}")
+    patrons = [reservation_db(str(n)) for n in range(12)]
+    results = run_in_parallel([lambda p=p: p.try_reserve(SLOTS[0]) for p in patrons])
+    booked = [r.computer_id for r in results if r.ok]
+    assert sorted(booked) == [1, 2, 3, 4]
+    assert len(staff.reservations_between(*RANGE)) == 4
+
+def test_no_quota_overrun_under_parallel_writers(reservation_db):
+    # one patron booking many slots at once still gets at most the quota
+    res = reservation_db("a")
+    kiosks = [reservation_db("a") for _ in SLOTS]
+    results = run_in_parallel([lambda k=k, s=s: k.try_reserve(s) for k, s in zip(kiosks, SLOTS)])
+    assert sum(r.ok for r in results) == res.max_reservations
+    assert len(res.reservations_between(*RANGE)) == res.max_reservations
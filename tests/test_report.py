@@ -0,0 +1,54 @@
+import io
+import json
+import sqlite3
+from datetime import date
+from reservation import ComputerReservation
+from report import HOURLY_COLUMNS, iter_hourly, iter_weekday, merge_branches, write_csv, write_json
+from sweeper import ReservationSweeper
+from timeslot import parse_slot
+# running "python -m pytest tests" in the terminal works
+
+JANUARY = (date(2030, 1, 1), date(2030, 2, 1))
+
+def hourly():
+    # the test database's hourly rows, without the sort key
+    rows = merge_branches([iter_hourly("main", ComputerReservation.database, *JANUARY)])
+    return [{k: row[k] for k in ("date", "hour", "bookings", "cancellations")} for row in rows]
+
+def test_totals_follow_bookings_and_cancellations(reservation_db):
+    # every booking path and cancellation updates the hourly totals in the same transaction
+    a, b = reservation_db("a"), reservation_db("b")
+    a.add_computer("Computer 2")
+    a.reserve_computer("01/02/30 10:00")
+    b.reserve_computer("01/02/30 10:00")
+    b.reserve_many(["01/02/30 11:00"])
+    a.cancel_reservation("01/02/30 10:00")
+    a.cancel_series(a.reserve_series("01/08/30 14:00", 2).series_id)
+    assert hourly() == [
+        {"date": "01/02/30", "hour": 10, "bookings": 2, "cancellations": 1},
+        {"date": "01/02/30", "hour": 11, "bookings": 1, "cancellations": 0},
+        {"date": "01/08/30", "hour": 14, "bookings": 1, "cancellations": 1},
+        {"date": "01/15/30", "hour": 14, "bookings": 1, "cancellations": 1},
+    ]
+
+def test_expiry_is_not_a_cancellation(reservation_db):
+    # removing past reservations keeps them in the totals
+    reservation_db("a")
+    conn = sqlite3.connect(ComputerReservation.database, uri=True)
+    conn.execute("INSERT INTO reservations (slot, computer_id, library_card_number) VALUES (?, 1, 'a')",
+                 (parse_slot("11/29/20 12:00"),))
+    conn.commit()
+    conn.close()
+    ReservationSweeper().run_once()
+    rows = list(iter_weekday("main", ComputerReservation.database))
+    assert [(r["weekday"], r["hour"], r["bookings"], r["cancellations"], r["days"]) for r in rows] == [("sunday", 12, 1, 0, 1)]
+
+def test_streamed_formats(reservation_db):
+    # CSV and JSON exports carry the same rows
+    reservation_db("a").reserve_computer("01/02/30 10:00")
+    out = io.StringIO()
+    write_csv(merge_branches([iter_hourly("main", ComputerReservation.database, *JANUARY)]), HOURLY_COLUMNS, out)
+    assert out.getvalue().splitlines() == [",".join(HOURLY_COLUMNS), "main,01/02/30,10,1,0,1,1,1.0"]
+    out = io.StringIO()
+    write_json(merge_branches([iter_hourly("main", ComputerReservation.database, *JANUARY)]), HOURLY_COLUMNS, out)
+    assert json.loads(out.getvalue()) == [dict(zip(HOURLY_COLUMNS, ["main", "01/02/30", 10, 1, 0, 1, 1, 1.0]))]
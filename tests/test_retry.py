@@ -0,0 +1,57 @@
+import sqlite3
+import threading
+from datetime import datetime
+import pytest
+import db
+from db import DatabaseBusyError, RetryPolicy, is_locked
+from reservation import ComputerReservation
+# running "python -m pytest tests" in the terminal works
+
+SLOT = "01/02/30 10:00"
+
+# the patron keeps reading while the other connection holds the write lock, which needs WAL on a file
+pytestmark = pytest.mark.on_disk
+
+@pytest.fixture
+def contended(reservation_db, monkeypatch):
+    # a patron whose connection gives up on a locked database almost at once, and a second connection to lock it with
+    monkeypatch.setattr(db.manager, "busy_timeout", 0.01)
+    res = reservation_db("a")
+    other = sqlite3.connect(ComputerReservation.database, uri=True, isolation_level=None, check_same_thread=False)
+    yield res, other
+    other.close()
+
+def test_gives_up_with_a_real_error(contended, monkeypatch):
+    # a lock held through every retry raises DatabaseBusyError instead of pretending to succeed
+    res, other = contended
+    monkeypatch.setattr(ComputerReservation, "retry", RetryPolicy(attempts=3, base_delay=0.001))
+    other.execute("BEGIN IMMEDIATE")
+    with pytest.raises(DatabaseBusyError):
+        res.reserve_computer(SLOT)
+    with pytest.raises(DatabaseBusyError):
+        res.cancel_reservation(SLOT)
+    other.execute("ROLLBACK")
+    assert res.reservations_between(datetime(2030, 1, 2), datetime(2030, 1, 3)) == []
+
+def test_retries_until_the_lock_is_released(contended, monkeypatch):
+    # a lock released while backing off lets the write through
+    res, other = contended
+    monkeypatch.setattr(ComputerReservation, "retry", RetryPolicy(attempts=20, base_delay=0.01, max_delay=0.05))
+    other.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.1, other.execute, args=("COMMIT",))
+    release.start()
+    assert res.reserve_computer(SLOT).ok
+    release.join()
+
+def test_backoff_is_bounded():
+    # delays grow with each attempt but never pass max_delay
+    policy = RetryPolicy(attempts=10, base_delay=0.01, max_delay=0.05)
+    assert all(0 <= policy.delay(n) <= min(0.05, 0.01 * 2 ** n) for n in range(10) for _ in range(20))
+
+def test_is_locked():
+    # only lock errors are retried
+    conn = sqlite3.connect(":memory:")
+    with pytest.raises(sqlite3.OperationalError) as error:
+        conn.execute("SELECT * FROM missing")
+    assert not is_locked(error.value)
+    assert not is_locked(ValueError("database is locked"))
@@ -0,0 +1,30 @@
+from datetime import date
+from schedule import Schedule
+# running "python -m pytest tests" in the terminal works
+
+def test_default_hours():
+    # open 10 AM - 9 PM Monday-Thursday, 10 AM - 6 PM Friday-Saturday, closed Sunday
+    schedule = Schedule()
+    assert schedule.validate_many(["12/12/24 10:00", "12/12/24 20:00", "12/12/24 21:00", "12/12/24 09:00"]) == [True, True, False, False]
+    assert schedule.validate_many(["12/13/24 17:00", "12/13/24 18:00", "12/15/24 12:00"]) == [True, False, False]
+
+def test_invalid_format():
+    # unreadable and off-the-hour slots are rejected without raising
+    schedule = Schedule()
+    assert schedule.validate_many(["not a slot", "12/12/24 10:30", None]) == [False, False, False]
+
+def test_holidays_and_closures():
+    # holidays close the whole day and closures close a range of hours
+    schedule = Schedule({
+        "hours": {"monday": ("10:00", "21:00")},
+        "holidays": ["12/23/24"],
+        "closures": [{"date": "12/30/24", "from": "12:00", "to": "14:00"}],
+    })
+    assert not schedule.is_valid("12/23/24 12:00")
+    assert schedule.validate_many(["12/30/24 11:00", "12/30/24 12:00", "12/30/24 13:00", "12/30/24 14:00"]) == [True, False, False, True]
+
+def test_open_slots():
+    # every bookable hour of a Friday, in order
+    slots = list(Schedule().open_slots(date(2024, 12, 13), date(2024, 12, 14)))
+    assert len(slots) == 8
+    assert slots == sorted(slots)
@@ -0,0 +1,51 @@
+import sqlite3
+from datetime import datetime
+from reservation import ComputerReservation
+from schema import SCHEMA_VERSION, migrate
+from timeslot import format_slot, parse_slot
+# running "python -m pytest tests" in the terminal works
+
+def make_legacy_db(path):
+    # builds a database the way the original create_tables() did
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE all_members (library_card_number TEXT PRIMARY KEY, pin TEXT NOT NULL)")
+    conn.execute("CREATE TABLE reservations (time_slot TEXT PRIMARY KEY, library_card_number TEXT)")
+    conn.execute("INSERT INTO all_members VALUES ('1', 'x')")
+    conn.executemany("INSERT INTO reservations VALUES (?, '1')", [("01/02/30 10:00",), ("12/31/29 11:00",)])
+    conn.commit()
+    return conn
+
+def test_slot_round_trip():
+    # slots survive being stored as integers and sort chronologically
+    assert format_slot(parse_slot("12/14/24 15:00")) == "12/14/24 15:00"
+    assert parse_slot("12/31/29 11:00") < parse_slot("01/02/30 10:00")
+
+def test_migrate_legacy_db(tmp_path):
+    # text slots are converted to sortable integers in place
+    conn = make_legacy_db(str(tmp_path / "legacy.db"))
+    assert migrate(conn) == SCHEMA_VERSION
+    rows = conn.execute("SELECT slot FROM reservations ORDER BY slot").fetchall()
+    assert [format_slot(row[0]) for row in rows] == ["12/31/29 11:00", "01/02/30 10:00"]
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+
+def test_reservations_between(tmp_path, monkeypatch):
+    # range queries only return slots inside the range
+    path = str(tmp_path / "legacy.db")
+    make_legacy_db(path).close()
+    monkeypatch.setattr(ComputerReservation, "database", path)
+    res = ComputerReservation("1", "x")
+    between = res.reservations_between(datetime(2030, 1, 1), datetime(2030, 1, 3))
+    assert between == [("01/02/30 10:00", 1, "1")]
+
+def test_remove_past_reservations(tmp_path, monkeypatch):
+    # past slots are deleted by one range delete, future ones are kept
+    path = str(tmp_path / "legacy.db")
+    conn = make_legacy_db(path)
+    conn.execute("INSERT INTO reservations VALUES ('11/29/20 12:00', '1')")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(ComputerReservation, "database", path)
+    res = ComputerReservation("1", "x")
+    assert res.remove_past_reservations() == 1
+    assert len(res.reservations_between(datetime(2020, 1, 1), datetime(2031, 1, 1))) == 2
@@ -0,0 +1,56 @@
+from datetime import datetime
+import pytest
+from series import SeriesRule
+from timeslot import parse_slot
+# running "python -m pytest tests" in the terminal works
+
+FIRST = "01/01/30 14:00"  # a Tuesday
+RANGE = (datetime(2030, 1, 1), datetime(2030, 4, 1))
+
+def test_rule_expands_only_the_window():
+    # occurrences start at the first one in range and stop at its end
+    rule = SeriesRule.weekly(FIRST, 12)
+    assert len(list(rule.occurrences())) == 12
+    assert list(rule.time_slots(parse_slot("01/10/30 00:00"), parse_slot("01/23/30 00:00"))) == ["01/15/30 14:00", "01/22/30 14:00"]
+    assert list(rule.occurrences(rule.last_slot + 1)) == []
+    with pytest.raises(ValueError):
+        SeriesRule.weekly(FIRST, 0)
+
+def test_reserve_series(reservation_db):
+    # every week is booked on the same computer and can be listed lazily
+    res = reservation_db("a")
+    report = res.reserve_series(FIRST, 12)
+    assert report.ok and len(report.applied) == 12 and set(report.applied.values()) == {1}
+    assert len(res.reservations_between(*RANGE)) == 12
+    assert [series_id for _, series_id in res.iter_series_between(*RANGE)] == [report.series_id] * 12
+    assert res.list_series() == {report.series_id: SeriesRule(parse_slot(FIRST), 12)}
+
+def test_reserve_series_conflicts(reservation_db):
+    # weeks the patron already holds are skipped, or nothing is booked when atomic
+    res = reservation_db("a")
+    res.reserve_computer("01/15/30 14:00")
+    assert not res.reserve_series(FIRST, 4, atomic=True).committed
+    assert len(res.reservations_between(*RANGE)) == 1
+    report = res.reserve_series(FIRST, 4)
+    assert set(report.conflicts) == {"01/15/30 14:00"} and len(report.applied) == 3
+
+def test_reserve_series_moves_computer(reservation_db):
+    # a week taken by someone else is booked on another computer
+    res = reservation_db("a")
+    res.add_computer("Computer 2")
+    reservation_db("b").reserve_computer("01/08/30 14:00")
+    report = res.reserve_series(FIRST, 3)
+    assert report.applied == {"01/01/30 14:00": 2, "01/08/30 14:00": 2, "01/15/30 14:00": 2}
+
+def test_cancel_series(reservation_db):
+    # one delete removes the rule and every upcoming occurrence
+    res = reservation_db("a")
+    res.reserve_computer("01/02/30 10:00")
+    series_id = res.reserve_series(FIRST, 5).series_id
+    assert res.cancel_series(series_id) == 5
+    assert res.reservations_between(*RANGE) == [("01/02/30 10:00", 1, "a")]
+    assert res.list_series() == {}
+    with pytest.raises(ValueError):
+        res.cancel_series(series_id)
+    with pytest.raises(ValueError):
+        reservation_db("b").cancel_series(res.reserve_series(FIRST, 1).series_id)
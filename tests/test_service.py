@@ -0,0 +1,113 @@
+import threading
+from datetime import datetime
+import pytest
+from client import ReservationClient
+from service import ReservationService
+from user import User
+# running "python -m pytest tests" in the terminal works
+
+SLOT = "01/02/30 10:00"
+
+@pytest.fixture
+def service(reservation_db):
+    # a service on a free localhost port, backed by the test database
+    service = ReservationService()
+    url = service.start_in_thread()
+    yield service, ReservationClient(url)
+    service.stop_thread()
+
+def register(*cards):
+    # members with PIN "1234"
+    for card in cards:
+        User(card, "1234", testing=1)
+
+def test_round_trip(service):
+    # log in, reserve, list, cancel and log out through the service
+    _, client = service
+    register("a")
+    user = client.login("a", "1234")
+    result = user.reservation.reserve_computer(SLOT)
+    assert result.ok and result.computer_id == 1
+    assert user.list_reservations() == [(SLOT, 1)]
+    user.reservation.cancel_reservation(SLOT)
+    assert user.list_reservations() == []
+    user.logout()
+    with pytest.raises(PermissionError):
+        user.list_reservations()
+
+def test_errors_keep_their_type(service):
+    # refusals are raised by the client as the same exceptions the local classes raise
+    _, client = service
+    register("a", "b")
+    with pytest.raises(ValueError):
+        client.login("a", "wrong")
+    with pytest.raises(TypeError):
+        client.login("nobody", "1234")
+    a, b = client.login("a", "1234"), client.login("b", "1234")
+    a.reservation.reserve_computer(SLOT)
+    with pytest.raises(IndexError):
+        b.reservation.reserve_computer(SLOT)
+    with pytest.raises(ValueError):
+        b.reservation.cancel_reservation(SLOT)
+    with pytest.raises(ValueError):
+        a.reservation.reserve_computer("01/02/20 10:00")
+
+def test_concurrent_writes_share_commits(service):
+    # parallel reservations of one computer: exactly one wins, in no more commits than writes
+    svc, client = service
+    cards = [f"c{i}" for i in range(8)]
+    register(*cards)
+    users = [client.login(card, "1234") for card in cards]
+    results = [None] * len(users)
+    barrier = threading.Barrier(len(users))
+
+    def reserve(i):
+        barrier.wait()
+        try:
+            results[i] = users[i].reservation.reserve_computer(SLOT)
+        except IndexError as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=reserve, args=(i,)) for i in range(len(users))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(not isinstance(r, Exception) for r in results) == 1
+    stats = client.request("GET", "/stats")
+    assert stats["writes"] == len(users) and stats["commits"] <= stats["writes"]
+
+def test_group_rolls_back_only_the_failed_write(reservation_db):
+    # one failing write in a group doesn't undo the others
+    a, b = reservation_db("a"), reservation_db("b")
+    service = ReservationService()
+
+    def fail():
+        a.get_db().execute("DELETE FROM reservations")
+        raise ValueError("refused")
+
+    outcomes = service._commit_group([(a.reserve_computer, (SLOT,), None), (fail, (), None),
+                                      (b.reserve_computer, ("01/02/30 11:00",), None)])
+    assert outcomes[0][0].ok and isinstance(outcomes[1][1], ValueError) and outcomes[2][0].ok
+    assert service.commits == 1
+    assert len(a.reservations_between(datetime(2030, 1, 2), datetime(2030, 1, 3))) == 2
+
+def test_paged_listing(service):
+    # the client pages through reservations like User.iter_reservations
+    _, client = service
+    register("a")
+    user = client.login("a", "1234")
+    for hour in (10, 11, 12):
+        user.reservation.reserve_computer(f"01/02/30 {hour}:00")
+    assert list(user.iter_reservations(page_size=2)) == user.list_reservations()
+    assert list(user.iter_reservations(after="01/02/30 10:00")) == user.list_reservations()[1:]
+
+def test_series(service):
+    # a weekly series is booked and cancelled through the service
+    _, client = service
+    register("a")
+    user = client.login("a", "1234")
+    report = user.reservation.reserve_series("01/01/30 14:00", 3)
+    assert report.ok and len(report.applied) == 3
+    assert user.reservation.cancel_series(report.series_id) == 3
+    assert user.list_reservations() == []
@@ -0,0 +1,29 @@
+import sqlite3
+from reservation import ComputerReservation
+from sweeper import ReservationSweeper
+from timeslot import parse_slot
+# running "python -m pytest tests" in the terminal works
+
+def add_reservation(time_slot, library_card_number):
+    # bypasses reserve_computer(), which refuses past slots
+    conn = sqlite3.connect(ComputerReservation.database, uri=True)
+    conn.execute("INSERT INTO reservations (slot, computer_id, library_card_number) VALUES (?, 1, ?)",
+                 (parse_slot(time_slot), library_card_number))
+    conn.commit()
+    conn.close()
+
+def test_sweep_removes_only_expired(reservation_db):
+    # past reservations are removed and reported, future ones are kept
+    res = reservation_db("a")
+    add_reservation("11/29/20 12:00", "a")
+    res.reserve_computer("01/02/30 10:00")
+    sweeper = ReservationSweeper()
+    result = sweeper.run_once()
+    assert result.removed == [("11/29/20 12:00", 1, "a")]
+    assert sweeper.next_expiry() == parse_slot("01/02/30 10:00")
+    assert list(sweeper.history) == [result]
+
+def test_sweep_with_nothing_expired(reservation_db):
+    # nothing to expire means nothing is deleted
+    reservation_db("a").reserve_computer("01/02/30 10:00")
+    assert ReservationSweeper().run_once().removed == []
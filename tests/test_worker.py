@@ -0,0 +1,54 @@
+import threading
+import time
+from worker import TkWorker
+# running "python -m pytest tests" in the terminal works
+
+class FakeRoot:
+    # stands in for tk.Tk: runs after() callbacks when pumped, like the event loop would
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def pump(self, timeout=2.0):
+        deadline = time.time() + timeout
+        while self.callbacks and time.time() < deadline:
+            callback = self.callbacks.pop(0)
+            time.sleep(0.001)
+            callback()
+
+def test_results_arrive_on_calling_thread():
+    # callbacks run on the thread that pumps the event loop, not the worker
+    root = FakeRoot()
+    worker = TkWorker(root)
+    results = []
+    worker.submit(lambda: threading.current_thread(), on_success=results.append)
+    root.pump()
+    assert results and results[0] is not threading.current_thread()
+    worker.shutdown()
+
+def test_errors_go_to_on_error():
+    # an exception in the call is handed to on_error instead of on_success
+    root = FakeRoot()
+    worker = TkWorker(root)
+    errors = []
+    worker.submit(lambda: 1 / 0, on_success=errors.append, on_error=errors.append)
+    root.pump()
+    assert isinstance(errors[0], ZeroDivisionError)
+    worker.shutdown()
+
+def test_duplicate_submissions_refused():
+    # a second click while a call is in flight is ignored, and the busy flag toggles
+    root = FakeRoot()
+    busy = []
+    worker = TkWorker(root, on_busy=busy.append)
+    release = threading.Event()
+    assert worker.submit(release.wait)
+    assert not worker.submit(release.wait)
+    release.set()
+    root.pump()
+    assert busy == [True, False]
+    assert worker.submit(lambda: None)
+    root.pump()
+    worker.shutdown()
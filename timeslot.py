@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# Time slots are shown to patrons as 'MM/DD/YY HH:00' but stored as whole
+# seconds since 1970-01-01 in library-local time, which sorts chronologically
+# and can be compared and range-scanned by an index.
+SLOT_FORMAT = '%m/%d/%y %H:%M'
+EPOCH = datetime(1970, 1, 1)
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def to_epoch(dt: datetime) -> int:
+    """
+    Converts a (naive, library-local) datetime to its stored slot value.
+
+    Args:
+        dt (datetime): The date and time to convert.
+
+    Returns:
+        int: Seconds since 1970-01-01 00:00 local time.
+    """
+    return (dt - EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(seconds: int) -> datetime:
+    """
+    Converts a stored slot value back to a datetime.
+
+    Args:
+        seconds (int): Seconds since 1970-01-01 00:00 local time.
+
+    Returns:
+        datetime: The corresponding naive datetime.
+    """
+    return EPOCH + timedelta(seconds=seconds)
+
+
+@lru_cache(maxsize=8192)
+def parse_slot(time_slot: str) -> int:
+    """
+    Parses a time slot string into its stored slot value. Results are memoized,
+    since the same few hundred upcoming slots are parsed over and over.
+
+    Args:
+        time_slot (str): The time slot in 'MM/DD/YY HH:00' format.
+
+    Returns:
+        int: Seconds since 1970-01-01 00:00 local time.
+
+    Raises:
+        ValueError: If the time slot is not in 'MM/DD/YY HH:00' format.
+    """
+    return to_epoch(datetime.strptime(time_slot, SLOT_FORMAT))
+
+
+def format_slot(seconds: int) -> str:
+    """
+    Formats a stored slot value as a time slot string.
+
+    Args:
+        seconds (int): Seconds since 1970-01-01 00:00 local time.
+
+    Returns:
+        str: The time slot in 'MM/DD/YY HH:00' format.
+    """
+    return from_epoch(seconds).strftime(SLOT_FORMAT)
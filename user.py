@@ -1,6 +1,8 @@
 from reservation import ComputerReservation
+from timeslot import format_slot
+from metrics import instrumented
+import auth
 import sqlite3
-import hashlib
 
 class User:
     """
@@ -8,7 +10,7 @@ class User:
     Utilizes the user's Library Card Number (LCN) and PIN for authentication.
     """
 
-    def __init__(self, library_card_number: str, pin: str, testing: int = 0) -> None:
+    def __init__(self, library_card_number: str, pin: str, testing: int = 0, database: str = None) -> None:
         """
         Initializes a User object and validates the user's credentials.
 
@@ -18,22 +20,26 @@ class User:
             testing (int, optional): Determines whether the user is in testing mode (default: 0). 
                 - 0: Normal mode (raises an error if user does not exist).
                 - 1: Testing mode (adds the user to the database if not found).
+            database (str, optional): The database file or 'file:' URI to use instead of
+                `ComputerReservation.database` (default: None).
 
         Raises:
             TypeError: If the library card number does not exist (in non-testing mode).
             ValueError: If the library card number exists but the PIN is incorrect.
         """
         self.library_card_number = library_card_number
-        self.pin = self.encrypt_pin(pin)  # Encrypt the PIN for security.
+        self.pin = None  # the stored (salted, hashed) PIN, filled in by validate_user()
+        self.session = None
+        self.reservation_class = ComputerReservation if database is None else ComputerReservation.bind(database)
 
         # edge case where no tables exist yet
         if testing == 1:
-            self.register_user_testing()
+            self.register_user_testing(pin)
 
-        self.validation = self.validate_user()
+        self.validation = self.validate_user(pin)
         if self.validation == 0:
             # Library card number exists, and the PIN is correct.
-            self.reservation = ComputerReservation(self.library_card_number, self.pin)
+            self.reservation = self.reservation_class(self.library_card_number, self.pin)
             print("ComputerReservation class enabled")
         elif self.validation == -1 and testing == 0:
             # Library card number doesn't exist (non-testing mode).
@@ -41,26 +47,92 @@ class User:
         elif self.validation == 1:
             # Library card number exists, but the PIN is incorrect.
             raise ValueError("Incorrect Pin")
-    
 
+    @classmethod
+    @instrumented("user.login")
+    def login(cls, library_card_number: str, pin: str, database: str = None) -> "User":
+        """
+        Authenticates the user and starts a session, so later requests can use
+        `from_session` with the token instead of the PIN.
+
+        Args:
+            library_card_number (str): The user's library card number.
+            pin (str): The user's PIN.
+            database (str, optional): The database to use instead of `ComputerReservation.database` (default: None).
+
+        Returns:
+            User: The authenticated user, with `session.token` set.
+
+        Raises:
+            TypeError: If the library card number does not exist.
+            ValueError: If the PIN is incorrect.
+        """
+        user = cls(library_card_number, pin, database=database)
+        user.session = auth.sessions.create(user.library_card_number, user.pin)
+        return user
+
+    @classmethod
+    def from_session(cls, token: str) -> "User":
+        """
+        Resolves a session token from `login` without touching the database.
+
+        Args:
+            token (str): The session token.
+
+        Returns:
+            User: The user the session belongs to.
+
+        Raises:
+            PermissionError: If the token is unknown or the session has expired.
+        """
+        session = auth.sessions.resolve(token)
+        if session is None:
+            raise PermissionError("Session expired, please log in again")
+        user = cls.__new__(cls)
+        user.library_card_number = session.library_card_number
+        user.pin = session.pin_hash
+        user.session = session
+        user.validation = 0
+        user.reservation_class = ComputerReservation
+        user.reservation = ComputerReservation(user.library_card_number, user.pin)
+        return user
+
+    def logout(self):
+        """
+        Ends the user's session, if they have one.
+        """
+        if self.session is not None:
+            auth.sessions.revoke(self.session.token)
+            self.session = None
+
+    @instrumented("user.list_reservations")
     def list_reservations(self):
         """
         Lists all reservations for the current user.
 
         Returns:
-            list or str: A list of reservation time slots if any exist, 
+            list or str: A list of (time slot, computer id) tuples if any exist, 
                          or [] if none are found.
         """
-        with self.reservation.get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT time_slot FROM reservations WHERE library_card_number = ?", (self.library_card_number,))
-            reservations = cursor.fetchall()
-            return reservations if reservations else []
-            
+        held = self.reservation.held_slots()
+        return [(format_slot(slot), held[slot]) for slot in sorted(held)]
+
+    def iter_reservations(self, after: str = None, page_size: int = 100):
+        """
+        Streams the current user's reservations a page at a time, for listings too long to load at once.
+
+        Args:
+            after (str, optional): Continue after this time slot in 'MM/DD/YY HH:00' format (default: from the first one).
+            page_size (int, optional): Rows fetched per query (default: 100).
+
+        Yields:
+            tuple: (time slot, computer id) in chronological order.
+        """
+        return self.reservation.iter_held(after, page_size)
 
     def encrypt_pin(self, pin: str) -> str:
         """
-        Encrypts the user's PIN for secure storage.
+        Encrypts the user's PIN for secure storage with a salted scrypt hash.
 
         Args:
             pin (str): The plaintext PIN to be encrypted.
@@ -68,30 +140,41 @@ class User:
         Returns:
             str: The encrypted (hashed) PIN.
         """
-        sha256_hash = hashlib.sha256()
-        sha256_hash.update(pin.encode('utf-8'))
-        return sha256_hash.hexdigest()
-            
+        return auth.hash_pin(pin)
 
-    def register_user_testing(self):
+    def register_user_testing(self, pin: str):
         """
         Adds the user to the database (for testing purposes only).
         Uses the `add_self` method from the ComputerReservation class.
 
+        Args:
+            pin (str): The user's plaintext PIN.
+
         Raises:
             sqlite3.IntegrityError: If the user already exists in the database.
         """
-        res = ComputerReservation(self.library_card_number, self.pin)
+        res = self.reservation_class(self.library_card_number, None)
         exists = res.user_exists()
         if not exists:
+            res.pin = self.pin = self.encrypt_pin(pin)
             res.add_self()
+            auth.verifications.put(self._member_key(), pin, self.pin)
         else:
             raise sqlite3.IntegrityError(f"{self.library_card_number} is already in the all_members table: UNIQUE constraint failed")
-    
 
-    def validate_user(self) -> int:
+    def _member_key(self) -> tuple:
+        # verification cache entries are per database, card numbers may repeat across test databases
+        return (self.reservation_class.members_database or self.reservation_class.database, self.library_card_number)
+
+    @instrumented("user.validate_user")
+    def validate_user(self, pin: str) -> int:
         """
         Validates if the library card number (LCN) and PIN match the database records.
+        A PIN verified recently is accepted from the verification cache without a query or
+        a rehash. Legacy or outdated hashes are upgraded after a successful check.
+
+        Args:
+            pin (str): The user's plaintext PIN.
 
         Returns:
             int: 
@@ -99,16 +182,28 @@ class User:
                 - 0 if the library card number exists and the PIN is correct.
                 - 1 if the library card number exists but the PIN is incorrect.
         """
-        conn = sqlite3.connect('LibraryMembers.db')
+        stored = auth.verifications.get(self._member_key(), pin)
+        if stored is not None:
+            self.pin = stored
+            return 0
+
+        conn = self.reservation_class.get_members_db()
         cursor = conn.cursor()
         cursor.execute("SELECT library_card_number, pin FROM all_members WHERE library_card_number = ?", (self.library_card_number,))
         row = cursor.fetchone()
+        cursor.close()
         if row is None:
             # Library card number doesn't exist.
             return -1
-        if self.pin == row[1]:
-            # Library card number and PIN match.
-            return 0
-        else:
+        if not auth.verify_pin(pin, row[1]):
             # Library card number exists, but PIN is incorrect.
             return 1
+
+        # Library card number and PIN match.
+        self.pin = row[1]
+        if auth.needs_rehash(self.pin):
+            self.pin = self.encrypt_pin(pin)
+            with conn:
+                conn.execute("UPDATE all_members SET pin = ? WHERE library_card_number = ?", (self.pin, self.library_card_number))
+        auth.verifications.put(self._member_key(), pin, self.pin)
+        return 0
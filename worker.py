@@ -0,0 +1,110 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TkWorker:
+    """
+    Runs blocking calls (database work) on a background thread pool and hands
+    the results back to the Tk event loop, so the window keeps redrawing and
+    responding while a query waits on a locked or slow database.
+
+    Tk widgets may only be touched from the main thread, so finished calls are
+    queued and their callbacks are run from a `root.after` poll.
+    """
+
+    def __init__(self, root, max_workers: int = 2, poll_ms: int = 30, on_busy=None):
+        """
+        Initializes a TkWorker instance.
+
+        Args:
+            root (tk.Tk): The root window whose event loop receives the results.
+            max_workers (int, optional): Background threads (default: 2).
+            poll_ms (int, optional): How often to check for finished calls while busy (default: 30).
+            on_busy (callable, optional): Called with True when a tracked call starts and
+                False when it finishes, e.g. to show a busy indicator.
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_busy = on_busy
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._done = queue.Queue()
+        self._in_flight = 0
+        self._outstanding = 0
+        self._polling = False
+
+    @property
+    def busy(self) -> bool:
+        """True while a tracked call is running."""
+        return self._in_flight > 0
+
+    def submit(self, fn, *args, on_success=None, on_error=None, **kwargs) -> bool:
+        """
+        Runs `fn(*args, **kwargs)` in the background and calls `on_success(result)` or
+        `on_error(exception)` on the Tk thread when it finishes. Only one tracked call
+        runs at a time, so repeated clicks can't submit the same request twice.
+
+        Args:
+            fn (callable): The blocking function to run.
+            on_success (callable, optional): Receives the return value.
+            on_error (callable, optional): Receives the exception if `fn` raised one.
+
+        Returns:
+            bool: False if the call was refused because another one is still in flight.
+        """
+        if self.busy:
+            return False
+        self._in_flight += 1
+        if self.on_busy is not None:
+            self.on_busy(True)
+        self._start(fn, args, kwargs, on_success, on_error, tracked=True)
+        return True
+
+    def run_in_background(self, fn, *args, on_error=None, **kwargs):
+        """
+        Runs `fn(*args, **kwargs)` in the background without blocking other submissions
+        or waiting on its result, for housekeeping the user doesn't wait for.
+
+        Args:
+            fn (callable): The blocking function to run.
+            on_error (callable, optional): Receives the exception if `fn` raised one.
+        """
+        self._start(fn, args, kwargs, None, on_error, tracked=False)
+
+    def _start(self, fn, args, kwargs, on_success, on_error, tracked):
+        self._outstanding += 1
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self._done.put((f, on_success, on_error, tracked)))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    future, on_success, on_error, tracked = self._done.get_nowait()
+                except queue.Empty:
+                    break
+                self._outstanding -= 1
+                if tracked:
+                    self._in_flight -= 1
+                    if self.on_busy is not None and not self.busy:
+                        self.on_busy(False)
+                error = future.exception()
+                if error is not None:
+                    if on_error is not None:
+                        on_error(error)
+                elif on_success is not None:
+                    on_success(future.result())
+        finally:
+            # keep polling only while something is still running
+            if self._outstanding:
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def shutdown(self):
+        """
+        Stops accepting work and waits for running calls to finish.
+        """
+        self._executor.shutdown(wait=True)